@@ -0,0 +1,109 @@
+"""Throughput and sharing check for the state backends.
+
+Phase 1 runs the same write/read/delete workload against the memory, SQLite
+and loopback-socket backends in this process. Phase 2 starts several worker
+processes that write events and guild settings for their own guilds into one
+shared SQLite file and one state server, then checks every row arrived.
+
+    python bench/bench_backends.py [--events 2000] [--processes 4]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from state_backend import MemoryBackend, SQLiteBackend, SocketBackend, StateServer, make_backend
+
+
+def make_row(message_id: int, guild_id: int) -> dict:
+    return {
+        "message_id": message_id, "guild_id": guild_id, "channel_id": guild_id * 10, "creator_id": message_id + 1,
+        "dungeon": "Ara-Kara", "difficulty": "+12", "scheduled": "Now", "comment": "",
+        "tank_id": None, "healer_id": None, "dps_ids": [message_id + 2], "expires_at": time.time() + 1800,
+        "role_pings_message_id": None,
+    }
+
+
+async def workload(label: str, backend, events: int):
+    await backend.open()
+    rows = [make_row(i, i % 50) for i in range(1, events + 1)]
+
+    start = time.perf_counter()
+    for row in rows:
+        await backend.save(row)
+    saved = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for row in rows:
+        assert (await backend.get(row["message_id"]))["dps_ids"] == row["dps_ids"]
+    read = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await backend.delete_many([row["message_id"] for row in rows])
+    deleted = time.perf_counter() - start
+    assert await backend.load_all() == []
+    await backend.close()
+    print(f"{label:<8} save {events / saved:>9,.0f}/s   get {events / read:>9,.0f}/s   "
+          f"bulk delete {deleted * 1000:>6.1f} ms")
+
+
+async def worker(url: str, worker_id: int, events: int):
+    backend = make_backend(url)
+    await backend.open()
+    guild_id = 1000 + worker_id
+    await backend.save_many([make_row(guild_id * 100000 + i, guild_id) for i in range(events)])
+    await backend.save_guild_settings(guild_id, {"channel_id": guild_id * 10, "role_pings": {}})
+    await backend.close()
+
+
+async def shared(label: str, url: str, processes: int, events: int, check_backend):
+    start = time.perf_counter()
+    workers = [await asyncio.create_subprocess_exec(sys.executable, __file__, "--worker", url, str(i), str(events))
+               for i in range(processes)]
+    codes = [await process.wait() for process in workers]
+    elapsed = time.perf_counter() - start
+    assert codes == [0] * processes, f"worker failed: {codes}"
+
+    await check_backend.open()
+    rows = await check_backend.load_all()
+    settings = await check_backend.load_guild_settings()
+    await check_backend.close()
+    assert len(rows) == processes * events, f"expected {processes * events} rows, found {len(rows)}"
+    assert sorted(settings) == [1000 + i for i in range(processes)], settings
+    print(f"{label:<8} {processes} processes wrote {len(rows)} events and {len(settings)} guild configs "
+          f"in {elapsed:.2f}s")
+
+
+async def main(events: int, processes: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        server = StateServer(MemoryBackend(), port=0)
+        await server.start()
+        await workload("memory", MemoryBackend(), events)
+        await workload("sqlite", SQLiteBackend(os.path.join(tmp, "one.db")), events)
+        await workload("tcp", SocketBackend(port=server.port), events)
+        await server.stop()
+
+        db_path = os.path.join(tmp, "shared.db")
+        await shared("sqlite", f"sqlite:{db_path}", processes, events, SQLiteBackend(db_path))
+
+        server = StateServer(SQLiteBackend(os.path.join(tmp, "served.db")), port=0)
+        await server.start()
+        await shared("tcp", f"tcp://127.0.0.1:{server.port}", processes, events, SocketBackend(port=server.port))
+        await server.stop()
+    print("✅ Every process's writes are visible to the others.")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        asyncio.run(worker(sys.argv[2], int(sys.argv[3]), int(sys.argv[4])))
+        sys.exit(0)
+
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--events", type=int, default=2000)
+    arg_parser.add_argument("--processes", type=int, default=4)
+    args = arg_parser.parse_args()
+    asyncio.run(main(args.events, args.processes))
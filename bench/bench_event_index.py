@@ -0,0 +1,109 @@
+"""Scaling benchmark for /groups searches on the live event index.
+
+Fills one guild with `--sizes` live events and times a selective search
+(joinable, one dungeon, keys 10-15, healer spot open) at each size. Groups
+fill up quickly but stay live until they expire, so only `--open` of the
+events have a spot open; the rest are full. The old search built the union of
+every level bucket in the range before intersecting, which copies every live
+event at those levels, full or not; it is timed next to the current one. Every
+search result is checked against a brute-force filter of the records.
+
+    python bench/bench_event_index.py [--sizes 1000,10000,100000] [--open 500] [--searches 2000]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_index import EventIndex, key_level  # noqa: E402
+from events import EventRecord, Role, open_slots  # noqa: E402
+
+GUILD_ID = 1
+DUNGEONS = ["Ara-Kara", "City of Threads", "The Stonevault", "The Dawnbreaker",
+            "Mists of Tirna Scithe", "The Necrotic Wake", "Siege of Boralus", "Grim Batol"]
+QUERY = {"joinable": True, "dungeon": "The Stonevault", "levels": range(10, 16), "role": Role.HEALER}
+
+
+def make_events(size: int, open_groups: int, seed: int) -> list:
+    rng = random.Random(seed)
+    events = []
+    for i in range(size):
+        base = 10 * i
+        event = EventRecord(base + 9, GUILD_ID, 2 + i % 20, base, rng.choice(DUNGEONS), str(rng.randint(2, 20)),
+                            "Now", None, "", time.time() + 3600,
+                            tank_id=base + 1, healer_id=base + 2, dps_ids=[base + 3, base + 4, base + 5])
+        if i < open_groups:  # Free one or two random spots
+            for _ in range(rng.randint(1, 2)):
+                slot = rng.choice(("tank_id", "healer_id", "dps"))
+                if slot == "dps":
+                    event.dps_ids = event.dps_ids[1:]
+                else:
+                    setattr(event, slot, None)
+        events.append(event)
+    return events
+
+
+def brute_force(events: list) -> set:
+    return {event.message_id for event in events
+            if open_slots(event) and event.dungeon == QUERY["dungeon"]
+            and key_level(event.difficulty) in QUERY["levels"] and Role.HEALER in open_slots(event)}
+
+
+def union_search(index: EventIndex) -> set:
+    """The old search: the whole level range as one union, intersected with the exact buckets."""
+    filters = [index.ids("joinable", GUILD_ID), index.ids("dungeon", GUILD_ID, QUERY["dungeon"]),
+               index.ids("open", GUILD_ID, Role.HEALER),
+               set().union(*(index.ids("level", GUILD_ID, level) for level in QUERY["levels"]))]
+    filters.sort(key=len)
+    result = set(filters[0])
+    for bucket in filters[1:]:
+        result &= bucket
+    return result
+
+
+def timed(searches: int, fn) -> float:
+    samples = []
+    for _ in range(searches):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--sizes", default="1000,10000,100000", help="Live events in the guild, comma-separated")
+    arg_parser.add_argument("--open", type=int, default=500, help="Events with a spot open; the rest are full")
+    arg_parser.add_argument("--searches", type=int, default=2000, help="Timed searches per size")
+    arg_parser.add_argument("--seed", type=int, default=7)
+    args = arg_parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    costs = []
+    for size in sizes:
+        events = make_events(size, min(args.open, size), args.seed)
+        index = EventIndex()
+        for event in events:
+            index.update(event)
+        hits = index.search(GUILD_ID, **QUERY)
+        assert hits == brute_force(events) == union_search(index), "search disagrees with a brute-force filter"
+
+        cost = timed(args.searches, lambda: index.search(GUILD_ID, **QUERY))
+        old = timed(max(1, args.searches // 10), lambda: union_search(index))
+        costs.append(cost)
+        print(f"{size:>8,} events ({len(index.ids('joinable', GUILD_ID)):,} joinable, {len(hits)} hits) | "
+              f"search {cost * 1e6:7.1f} µs | level-range union {old * 1e6:9.1f} µs ({old / cost:,.0f}x)")
+
+    growth = costs[-1] / costs[0]
+    print(f"Search cost at {sizes[-1]:,} vs {sizes[0]:,} events: {growth:.2f}x for {sizes[-1] / sizes[0]:,.0f}x the events")
+    if args.open < sizes[0]:  # Same open groups at every size, so the cost shouldn't move
+        assert growth < sizes[-1] / sizes[0] / 10, "search cost grew with the number of full events"
+        print("✅ Search cost follows the open groups, not every live event.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""Benchmark for the /queue matchmaking engine.
+
+Part 1 keeps a standing queue of N players in one guild (Tanks and DPS only,
+so nothing matches on its own) and times two kinds of enqueue: a DPS that
+can't complete a group and stays queued, and a Healer that completes one and
+takes a Tank and 3 DPS out. Neither should get slower as N grows. A naive
+matcher that walks the whole queue is timed on the no-match case next to it.
+
+Part 2 streams random players (role mix, key ranges, dungeon preferences)
+into a fresh queue, checks every group it forms (1 Tank / 1 Healer / 3 DPS,
+key level inside every member's range, dungeon wanted by everyone, nobody
+twice) and counts FIFO inversions: older compatible players of the same role
+left waiting while a newer one got the spot. Waits are counted in arrivals.
+
+    python bench/bench_matchmaking.py [--sizes 1000,10000,100000] [--ops 5000] [--players 20000]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from events import Role, ROLE_LIMITS  # noqa: E402
+from matchmaking import Matchmaker, Ticket  # noqa: E402
+
+GUILD_ID = 1
+MAX_KEY_LEVEL = 20
+DUNGEONS = ["Darkflame Cleft", "Cinderbrew Meadery", "Theater of Pain", "The Rookery",
+            "Op Floodgate", "Motherlode", "Mechagone Workshop", "Priory of the Sacred Flame"]
+ROLE_MIX = [(Role.TANK, 0.15), (Role.HEALER, 0.15), (Role.DPS, 0.70)]
+
+
+class Players:
+    """Random tickets: key ranges around a preferred level, a third with one or two favourite dungeons."""
+
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        self.next_id = 1
+
+    def ticket(self, role: Role | None = None) -> Ticket:
+        rng = self.rng
+        if role is None:
+            role = rng.choices([r for r, _ in ROLE_MIX], [w for _, w in ROLE_MIX])[0]
+        low = rng.randint(2, MAX_KEY_LEVEL - 2)
+        high = min(MAX_KEY_LEVEL, low + rng.randint(0, 5))
+        dungeons = frozenset(rng.sample(DUNGEONS, rng.randint(1, 2))) if rng.random() < 0.33 else None
+        self.next_id += 1
+        return Ticket(self.next_id, GUILD_ID, role, low, high, dungeons)
+
+
+def naive_match(queued: list, ticket: Ticket) -> list | None:
+    """Reference matcher: walks every queued ticket, oldest first, for each key level of the new one."""
+    for level in ticket.levels():
+        need = dict(ROLE_LIMITS)
+        need[ticket.role] -= 1
+        group, allowed = [ticket], ticket.dungeons
+        for other in queued:
+            if need[other.role] <= 0 or not other.min_level <= level <= other.max_level:
+                continue
+            if allowed is not None and other.dungeons is not None:
+                if not allowed & other.dungeons:
+                    continue
+                allowed = allowed & other.dungeons
+            elif other.dungeons is not None:
+                allowed = other.dungeons
+            need[other.role] -= 1
+            group.append(other)
+            if not any(need.values()):
+                return group
+    return None
+
+
+def percentile(samples: list, pct: float) -> float:
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * pct))]
+
+
+# ------------------ Part 1: enqueue cost vs queue size ------------------
+def bench_scaling(size: int, ops: int, naive_ops: int, seed: int):
+    players = Players(seed)
+    matchmaker = Matchmaker()
+    standing = [players.ticket(Role.TANK if i % 4 == 0 else Role.DPS) for i in range(size)]
+    for ticket in standing:
+        assert matchmaker.enqueue(ticket) is None
+    guild_queue = matchmaker.queue(GUILD_ID)
+
+    def timed_enqueues(role: Role) -> tuple:
+        samples, matched = [], 0
+        for _ in range(ops):
+            ticket = players.ticket(role)
+            start = time.perf_counter()
+            match = matchmaker.enqueue(ticket)
+            samples.append(time.perf_counter() - start)
+            if match:
+                matched += 1
+                for member in match.tickets()[2:]:  # Put a Tank and 3 DPS back, so the queue stays at `size`
+                    matchmaker.enqueue(players.ticket(member.role))
+                matchmaker.enqueue(players.ticket(Role.TANK))
+            else:
+                matchmaker.dequeue(GUILD_ID, ticket.user_id)  # Keep the size, and no Healer left to match later Tanks
+        return samples, matched
+
+    dps, _ = timed_enqueues(Role.DPS)
+    healer, matched = timed_enqueues(Role.HEALER)
+
+    queued = sorted(guild_queue.tickets.values(), key=lambda ticket: ticket.seq)
+    naive = []
+    for _ in range(naive_ops):
+        ticket = players.ticket(Role.DPS)
+        start = time.perf_counter()
+        naive_match(queued, ticket)
+        naive.append(time.perf_counter() - start)
+
+    print(f"{len(guild_queue):>8,} queued | DPS (no match) {statistics.median(dps) * 1e6:6.1f} µs, "
+          f"p99 {percentile(dps, 0.99) * 1e6:6.1f} µs | Healer ({matched / ops:4.0%} matched) "
+          f"{statistics.median(healer) * 1e6:6.1f} µs, p99 {percentile(healer, 0.99) * 1e6:6.1f} µs | "
+          f"naive DPS {statistics.median(naive) * 1e6:9.1f} µs")
+    return statistics.median(healer)
+
+
+# ------------------ Part 2: correctness and fairness ------------------
+def check_group(match, queued: dict):
+    members = match.tickets()
+    assert [m.role for m in members] == [Role.TANK, Role.HEALER] + [Role.DPS] * ROLE_LIMITS[Role.DPS], "bad composition"
+    assert len({m.user_id for m in members}) == len(members), "player matched twice in one group"
+    for member in members:
+        assert member.min_level <= match.level <= member.max_level, "key level outside a member's range"
+        if member.dungeons is not None:
+            assert match.dungeon in member.dungeons, "dungeon not wanted by a member"
+        assert member.user_id not in queued, "matched player still queued"
+
+
+def fifo_inversions(match, queued: dict) -> int:
+    """Older waiting players who could have taken a matched player's spot as-is."""
+    inversions = 0
+    for member in match.tickets():
+        for other in queued.values():
+            if (other.role == member.role and other.seq < member.seq
+                    and other.min_level <= match.level <= other.max_level
+                    and (other.dungeons is None or match.dungeon in other.dungeons)):
+                inversions += 1
+                break
+    return inversions
+
+
+def bench_stream(players_count: int, seed: int):
+    players = Players(seed)
+    matchmaker = Matchmaker()
+    guild_queue = matchmaker.queue(GUILD_ID)
+    waits = {role: [] for role, _ in ROLE_MIX}
+    matched_ids = set()
+    inversions = groups = 0
+    start = time.perf_counter()
+    check_time = 0.0
+    for arrival in range(players_count):
+        match = matchmaker.enqueue(players.ticket())
+        if match is None:
+            continue
+        check_start = time.perf_counter()
+        groups += 1
+        check_group(match, guild_queue.tickets)
+        inversions += fifo_inversions(match, guild_queue.tickets)
+        for member in match.tickets():
+            assert member.user_id not in matched_ids, "player matched into two groups"
+            matched_ids.add(member.user_id)
+            waits[member.role].append(arrival - member.seq)
+        check_time += time.perf_counter() - check_start
+    elapsed = time.perf_counter() - start - check_time
+
+    print(f"{players_count:,} arrivals in {elapsed * 1000:.0f} ms ({elapsed / players_count * 1e6:.1f} µs each): "
+          f"{groups:,} groups, {len(guild_queue):,} still queued "
+          f"(🛡️ {guild_queue.waiting[Role.TANK]} · 💚 {guild_queue.waiting[Role.HEALER]} · ⚔️ {guild_queue.waiting[Role.DPS]})")
+    for role, samples in waits.items():
+        if samples:
+            print(f"  {role.value:<7} wait (arrivals): median {statistics.median(samples):6.0f}, "
+                  f"p95 {percentile(samples, 0.95):6.0f}, max {max(samples):6.0f}")
+    print(f"  FIFO inversions: {inversions} of {groups * 5:,} placements")
+    return groups
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--sizes", default="1000,10000,100000", help="Standing queue sizes, comma-separated")
+    arg_parser.add_argument("--ops", type=int, default=5000, help="Timed enqueues per kind and size")
+    arg_parser.add_argument("--naive-ops", type=int, default=20, help="Timed naive-scan lookups per size")
+    arg_parser.add_argument("--players", type=int, default=20000, help="Arrivals in the fairness run")
+    arg_parser.add_argument("--seed", type=int, default=7)
+    args = arg_parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    costs = [bench_scaling(size, args.ops, args.naive_ops, args.seed) for size in sizes]
+    print(f"Matching enqueue cost at {sizes[-1]:,} vs {sizes[0]:,} queued: {costs[-1] / costs[0]:.2f}x")
+    print()
+    groups = bench_stream(args.players, args.seed)
+    print(f"✅ {groups:,} groups checked: valid composition, key levels and dungeons, nobody matched twice.")
+
+
+if __name__ == "__main__":
+    main()
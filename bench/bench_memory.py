@@ -0,0 +1,108 @@
+"""Per-event memory of the old dict events vs the slotted `EventRecord`.
+
+Builds `--events` concurrent events both ways and measures them with
+tracemalloc, each in the state the bot keeps it once the group is posted. The
+old layout held real `discord.Member` objects for the creator and every player,
+a `PartialMessage` for the role pings reply and the rendered
+(version, Embed, payload) it had just posted; those are built here too (each
+event gets its own players, as it would once the member cache has evicted
+them). The record is left exactly as `finalize_event` leaves it: IDs, the
+creator's name and avatar URL, and (version, payload digest), with the Embed
+in daddy's bounded `recent_embeds` LRU, which is measured along with it.
+
+    python bench/bench_memory.py [--events 10000]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DISCORD_BOT_TOKEN", "bench")  # daddy refuses to import without one; never used
+
+import discord  # noqa: E402
+import daddy  # noqa: E402
+from edit_coalescer import EmbedEditCoalescer  # noqa: E402
+from events import EventRecord  # noqa: E402
+
+state = daddy.bot._connection
+guild = discord.Guild(data={"id": 1, "name": "bench", "roles": [], "members": [], "channels": []}, state=state)
+wow_tz = daddy.SERVER_TZ
+
+
+def make_member(user_id: int) -> discord.Member:
+    user = {"id": user_id, "username": f"player{user_id}", "discriminator": "0",
+            "avatar": f"{user_id:032x}", "global_name": f"Player {user_id}"}
+    data = {"user": user, "roles": [], "joined_at": None, "nick": None, "deaf": False, "mute": False, "flags": 0}
+    return discord.Member(data=data, guild=guild, state=state)
+
+
+def posted_embed(n: int) -> discord.Embed:
+    """The embed a group like event `n` is posted with."""
+    return daddy.build_event_embed(record_event(n, rendered=False))
+
+
+def legacy_event(n: int) -> dict:
+    """The dict layout `active_events` used before EventRecord."""
+    base = 10 * n
+    embed = posted_embed(n)
+    return {
+        "creator": make_member(base),
+        "guild_id": 1,
+        "channel_id": 2,
+        "dungeon": "Ara-Kara",
+        "difficulty": "+12",
+        "scheduled": "Now",
+        "scheduled_dt": None,
+        "comment": "",
+        "assigned_roles": {"Tank": make_member(base + 1), "Healer": make_member(base + 2),
+                           "DPS": [make_member(base + 3), make_member(base + 4)]},
+        "expires_at": datetime.now(wow_tz) + timedelta(minutes=30),
+        "role_pings_message": daddy.event_message(base + 5, 2),
+        "version": 0,
+        "rendered": (0, embed, EmbedEditCoalescer.serialize(embed)),
+    }
+
+
+def record_event(n: int, rendered: bool = True) -> EventRecord:
+    """A record as `finalize_event` leaves it after posting."""
+    base = 10 * n
+    creator = make_member(base)
+    event = EventRecord(base + 9, 1, 2, base, "Ara-Kara", "+12", "Now", None, "", time.time() + 1800,
+                        tank_id=base + 1, healer_id=base + 2, dps_ids=[base + 3, base + 4],
+                        role_pings_message_id=base + 5,
+                        creator_name=creator.display_name, creator_avatar=creator.display_avatar.url)
+    if rendered:
+        daddy.cache_embed(event, daddy.build_event_embed(event))
+    return event
+
+
+def measure(label: str, events: int, build) -> float:
+    daddy.recent_embeds.clear()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = {n: build(n) for n in range(events)}
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    per_event = used / len(held)
+    print(f"{label:<30} {used / 1024 / 1024:>8.2f} MiB total, {per_event:>8.0f} B/event")
+    return per_event
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--events", type=int, default=10000)
+    args = arg_parser.parse_args()
+
+    print(f"{args.events} concurrent events:")
+    before = measure("dict + Member objects", args.events, legacy_event)
+    after = measure("EventRecord + embed LRU", args.events, record_event)
+    print(f"✅ {before / after:.1f}x less memory per event.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark for the versioned embed render cache.
+
+Compares rebuilding and digesting an event embed on every request (the old
+behaviour) with `render_event_embed`, which only re-renders when the event's
+version changed. A third pass bumps the version every `--change-every`
+requests to model a reaction burst where only some requests change the group.
+
+    python bench/bench_render.py [--renders 20000] [--change-every 10]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DISCORD_BOT_TOKEN", "bench")  # daddy refuses to import without one; never used
+
+import daddy  # noqa: E402
+from edit_coalescer import EmbedEditCoalescer  # noqa: E402
+from events import EventRecord  # noqa: E402
+from fakes import FakeMember  # noqa: E402
+
+
+def make_event() -> EventRecord:
+    creator = FakeMember(1)
+    return EventRecord(
+        1, 1, 1, creator.id, "Ara-Kara", "+12", "20/03/2031 19:30 (UTC)", time.time() + 7200,
+        "Timing it, bring lust", time.time() + 3600, tank_id=2, healer_id=3, dps_ids=[4, 5],
+        creator_name=creator.display_name, creator_avatar=creator.display_avatar.url,
+    )
+
+
+def uncached(event: EventRecord):
+    return EmbedEditCoalescer.digest(daddy.build_event_embed(event))
+
+
+def timed(label: str, renders: int, fn) -> float:
+    start = time.perf_counter()
+    for i in range(renders):
+        fn(i)
+    elapsed = time.perf_counter() - start
+    rate = renders / elapsed
+    print(f"{label:<34} {rate:>12,.0f} renders/s ({elapsed * 1000:.1f} ms)")
+    return rate
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--renders", type=int, default=20000)
+    arg_parser.add_argument("--change-every", type=int, default=10)
+    args = arg_parser.parse_args()
+
+    msg_id = 1
+    daddy.active_events[msg_id] = event = make_event()
+    assert daddy.render_event_embed(msg_id) == uncached(event), "cached render differs from a full build"
+
+    before = timed("rebuild every time", args.renders, lambda i: uncached(event))
+    after = timed("versioned cache, no changes", args.renders, lambda i: daddy.render_event_embed(msg_id))
+
+    def mixed(i: int):
+        if i % args.change_every == 0:
+            event.version += 1
+        daddy.render_event_embed(msg_id)
+
+    timed(f"versioned cache, 1 in {args.change_every} changed", args.renders, mixed)
+    print(f"✅ Cached renders are {after / before:,.0f}x faster when nothing changed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Startup time and memory of full vs lean intents against the offline fake Discord.
+
+Serves `--guilds` guilds of `--members` members each from bench/fake_discord.py
+(large guilds arrive without their member list, as on Discord, so full mode
+has to request every member in chunks). Then it starts the real bot once per
+mode in a fresh process and reports, once `on_ready` has fired:
+
+  ready       seconds from `bot.start()` to `on_ready`
+  members     members held in discord.py's cache
+  RSS         resident memory after import (before connecting) and peak RSS at ready
+
+    python bench/bench_startup.py [--guilds 20] [--members 5000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_discord import FakeDiscord, point_discord_at  # noqa: E402
+
+TOKEN = "startup.token.offline"
+MODES = (("full", "0"), ("lean", "1"))
+
+
+def rss_mb(peak: bool = False) -> float:
+    """Current or peak resident memory of this process, in MB (Linux only).
+
+    Read from /proc rather than getrusage: ru_maxrss survives exec, so the bot
+    process would inherit the peak of the benchmark process that forked it.
+    """
+    field = "VmHWM:" if peak else "VmRSS:"
+    with open("/proc/self/status", encoding="ascii") as f:
+        for line in f:
+            if line.startswith(field):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+async def start_bot(port: int) -> dict:
+    """Child process: starts the bot against the fake and reports its footprint at ready."""
+    point_discord_at(port)
+    import daddy
+    imported_rss = rss_mb()
+    started = time.perf_counter()
+    bot_task = asyncio.create_task(daddy.bot.start(TOKEN))
+    await asyncio.wait_for(daddy.bot.wait_until_ready(), timeout=600)
+    result = {
+        "ready_seconds": time.perf_counter() - started,
+        "guilds": len(daddy.bot.guilds),
+        "cached_members": sum(len(guild.members) for guild in daddy.bot.guilds),
+        "imported_rss_mb": imported_rss,
+        "peak_rss_mb": rss_mb(peak=True),
+    }
+    await daddy.bot.close()
+    await asyncio.gather(bot_task, return_exceptions=True)
+    return result
+
+
+def run_mode(port: int, lean: str) -> dict:
+    env = dict(os.environ, DISCORD_BOT_TOKEN=TOKEN, DD_STATE_BACKEND="memory", DEV_GUILD_ID="0",
+               DD_LEAN_INTENTS=lean)
+    workdir = tempfile.mkdtemp(prefix="dd-startup-")  # The bot reads config files from its working directory
+    child = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", str(port)], cwd=workdir, env=env,
+                           capture_output=True, text=True, timeout=900)
+    if child.returncode:
+        raise RuntimeError(f"bot process failed:\n{child.stderr[-2000:]}")
+    return json.loads(child.stdout.strip().splitlines()[-1])
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--guilds", type=int, default=20)
+    arg_parser.add_argument("--members", type=int, default=5000, help="Members per guild")
+    arg_parser.add_argument("--child", type=int, help=argparse.SUPPRESS)  # Port of the fake, in the bot process
+    args = arg_parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(start_bot(args.child))))
+        return
+
+    fake = FakeDiscord(guilds=args.guilds, members_per_guild=args.members, rate_limits=False)
+    fake.start()
+    print(f"{args.guilds} guilds x {args.members:,} members ({args.guilds * args.members:,} total):")
+    results = {}
+    for mode, lean in MODES:
+        result = results[mode] = run_mode(fake.port, lean)
+        print(f"  {mode:<4} ready in {result['ready_seconds']:6.2f}s | {result['cached_members']:>9,} cached members | "
+              f"RSS {result['imported_rss_mb']:5.0f} MB after import, peak {result['peak_rss_mb']:5.0f} MB")
+    fake.stop()
+
+    full, lean = results["full"], results["lean"]
+    print(f"✅ Lean mode: {full['ready_seconds'] / lean['ready_seconds']:.1f}x faster to ready, "
+          f"{full['peak_rss_mb'] - lean['peak_rss_mb']:.0f} MB less peak RSS.")
+
+
+if __name__ == "__main__":
+    main()
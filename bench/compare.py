@@ -0,0 +1,67 @@
+"""Compares two bench/microbench.py result files.
+
+Prints every benchmark's median time in both runs and the change, and marks
+anything slower than --threshold as a regression (exit code 1), so a PR can
+show `compare.py baseline.json latest.json` output in its description.
+
+    python bench/compare.py bench/results/baseline.json bench/results/latest.json [--threshold 0.10]
+"""
+import argparse
+import json
+import sys
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def describe(meta: dict) -> str:
+    return f"{meta.get('commit') or '?'} ({meta.get('date', '?')}, Python {meta.get('python', '?')}, {meta.get('machine', '?')})"
+
+
+def compare(before: dict, after: dict, threshold: float) -> list:
+    """Returns (name, before median, after median, change ratio or None, status) rows."""
+    rows = []
+    old, new = before["results"], after["results"]
+    for name in sorted(old.keys() | new.keys()):
+        if name not in new:
+            rows.append((name, old[name]["median"], None, None, "removed"))
+        elif name not in old:
+            rows.append((name, None, new[name]["median"], None, "new"))
+        else:
+            ratio = new[name]["median"] / old[name]["median"] - 1 if old[name]["median"] else 0.0
+            status = "REGRESSION" if ratio > threshold else "faster" if ratio < -threshold else ""
+            rows.append((name, old[name]["median"], new[name]["median"], ratio, status))
+    return rows
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("before", help="Baseline results (JSON)")
+    arg_parser.add_argument("after", help="New results (JSON)")
+    arg_parser.add_argument("--threshold", type=float, default=0.10,
+                            help="Relative slowdown that counts as a regression (default 0.10 = 10%%)")
+    args = arg_parser.parse_args()
+
+    before, after = load(args.before), load(args.after)
+    print(f"before: {describe(before.get('meta', {}))}")
+    print(f"after:  {describe(after.get('meta', {}))}\n")
+    print(f"{'benchmark':<48} {'before us':>12} {'after us':>12} {'change':>8}")
+
+    rows = compare(before, after, args.threshold)
+    for name, old, new, ratio, status in rows:
+        old_text = f"{old:12.2f}" if old is not None else f"{'-':>12}"
+        new_text = f"{new:12.2f}" if new is not None else f"{'-':>12}"
+        change = f"{ratio:+8.1%}" if ratio is not None else f"{'':>8}"
+        print(f"{name:<48} {old_text} {new_text} {change}  {status}")
+
+    regressions = [row for row in rows if row[4] == "REGRESSION"]
+    if regressions:
+        print(f"\n❌ {len(regressions)} benchmark(s) slower than {args.threshold:.0%}.")
+        sys.exit(1)
+    print(f"\n✅ No regressions beyond {args.threshold:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
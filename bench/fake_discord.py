@@ -0,0 +1,565 @@
+"""A local stand-in for Discord's gateway and REST API, for load tests.
+
+`FakeDiscord` runs an aiohttp server on a background thread with its own
+event loop. discord.py is pointed at it by `FakeDiscord.patch_discord()`:
+REST calls go to http://127.0.0.1:<port>/api/v10 and the gateway connects
+to ws://127.0.0.1:<port>/gateway. The server:
+
+* serves synthetic guilds (one text channel, Tank/Healer/DPS roles and N members each),
+* answers IDENTIFY with READY + GUILD_CREATE (large guilds without their member list, as
+  Discord does) and member queries with member chunks of up to 1000,
+* keeps the messages the bot sends, edits and deletes, including interaction responses,
+* enforces per-route rate limits with Discord's X-RateLimit-* headers and 429s,
+* counts every REST call by route, and 429s by route.
+
+The harness drives it with coroutines that run on the server's loop (`call`):
+`interact()` sends an INTERACTION_CREATE and waits for the bot's response,
+`dispatch()` sends any other gateway event and `until()` waits for the bot to
+reach some state (a follow-up sent, reactions added, messages deleted).
+See bench/loadtest.py.
+"""
+import asyncio
+import itertools
+import json
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from aiohttp import web, WSMsgType
+
+DISCORD_EPOCH_MS = 1420070400000
+API_PREFIX = "/api/v10"
+ALL_PERMISSIONS = str((1 << 50) - 1)
+ROLE_NAMES = ("Tank", "Healer", "DPS")
+
+# (method regex, path regex, bucket name, major parameter group, limit, per seconds)
+RATE_LIMITS = [
+    ("PUT|DELETE", r"/channels/(\d+)/messages/\d+/reactions/.*", "reactions", 1, 1, 0.25),
+    ("POST", r"/channels/(\d+)/messages/bulk-delete", "bulk-delete", 1, 1, 1.0),
+    ("POST", r"/channels/(\d+)/messages", "send", 1, 5, 5.0),
+    ("PATCH", r"/channels/(\d+)/messages/\d+", "edit", 1, 5, 5.0),
+    ("DELETE", r"/channels/(\d+)/messages/\d+", "delete", 1, 5, 1.0),
+    ("POST|PATCH|DELETE|GET", r"/webhooks/\d+/([^/]+).*", "webhook", 1, 5, 2.0),
+]
+GLOBAL_LIMIT = (50, 1.0)   # Requests per second across all routes (interaction callbacks are exempt)
+LARGE_THRESHOLD = 250      # Guilds above this many members are sent without members, like Discord's `large`
+CHUNK_SIZE = 1000          # Members per GUILD_MEMBERS_CHUNK
+
+
+def iso_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def point_discord_at(port: int):
+    """Points this process's discord.py REST and gateway URLs at a fake listening on `port`."""
+    import yarl
+    from discord.gateway import DiscordWebSocket
+    from discord.http import Route
+    Route.BASE = f"http://127.0.0.1:{port}{API_PREFIX}"
+    DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(f"ws://127.0.0.1:{port}/gateway")
+
+
+class RateLimiter:
+    """Fixed-window counters per (bucket, major parameter)."""
+
+    def __init__(self):
+        self._windows = {}   # key -> [window end (unix), used]
+
+    def hit(self, key, limit: int, per: float) -> tuple:
+        """Counts one request. Returns (allowed, remaining, reset_after)."""
+        now = time.time()
+        window = self._windows.get(key)
+        if window is None or now >= window[0]:
+            window = self._windows[key] = [now + per, 0]
+        reset_after = window[0] - now
+        if window[1] >= limit:
+            return False, 0, reset_after
+        window[1] += 1
+        return True, limit - window[1], reset_after
+
+
+class FakeDiscord:
+    """Fake gateway + REST server. All state lives on the server's own loop."""
+
+    def __init__(self, guilds: int = 1, members_per_guild: int = 100, rate_limits: bool = True):
+        self._ids = itertools.count(1)
+        self.rate_limits = rate_limits
+        self.bot_user = self._user(self.snowflake(), "DungeonDaddy", bot=True)
+        self.application_id = self.bot_user["id"]
+        self.guilds = {}          # guild_id -> guild payload
+        self.members = {}         # guild_id -> [member payload]
+        self.channels = {}        # channel_id -> guild_id
+        self.messages = {}        # message_id -> message payload
+        self.interactions = {}    # token -> interaction payload
+        self.rest_calls = Counter()       # "METHOD /route/template" -> count
+        self.rate_limited = Counter()     # "METHOD /route/template" -> 429s sent
+        self.unknown_routes = Counter()
+        self._limiter = RateLimiter()
+        self.reactions = {}       # message_id -> {emoji: {user ids}}
+        self.followups = {}       # interaction token -> [follow-up message payloads]
+        self.deleted_at = {}      # message_id -> unix time the bot deleted it
+        self._sessions = []       # Connected gateway sessions
+        self._callbacks = {}      # interaction_id -> Future for the bot's interaction response
+        self._conditions = []     # (predicate, Future) pairs re-checked after every REST call
+        self._command_ids = {}
+        for g in range(guilds):
+            self._make_guild(g, members_per_guild)
+
+        self.loop = asyncio.new_event_loop()
+        self.port = None
+        self._thread = None
+        self._runner = None
+
+    # -- synthetic world --
+
+    def snowflake(self) -> int:
+        """A snowflake timestamped now, so messages look recent (bulk deletes need < 14 days)."""
+        return ((int(time.time() * 1000) - DISCORD_EPOCH_MS) << 22) | (next(self._ids) & 0x3FFFFF)
+
+    @staticmethod
+    def _user(user_id: int, name: str, bot: bool = False) -> dict:
+        return {"id": str(user_id), "username": name, "discriminator": "0", "global_name": name,
+                "avatar": None, "bot": bot}
+
+    @staticmethod
+    def _member(user: dict, roles: list = ()) -> dict:
+        return {"user": user, "roles": list(roles), "joined_at": iso_now(), "deaf": False, "mute": False,
+                "flags": 0, "nick": None}
+
+    def _make_guild(self, index: int, member_count: int):
+        guild_id = self.snowflake()
+        channel_id = self.snowflake()
+        roles = [{"id": str(guild_id), "name": "@everyone", "color": 0, "hoist": False, "position": 0,
+                  "permissions": ALL_PERMISSIONS, "managed": False, "mentionable": False, "flags": 0}]
+        for position, name in enumerate(ROLE_NAMES, start=1):
+            roles.append({"id": str(self.snowflake()), "name": name, "color": 0, "hoist": False, "position": position,
+                          "permissions": "0", "managed": False, "mentionable": True, "flags": 0})
+        members = [self._member(self.bot_user)]
+        for m in range(member_count):
+            members.append(self._member(self._user(self.snowflake(), f"player{index}_{m}")))
+        self.guilds[guild_id] = {
+            "id": str(guild_id), "name": f"Guild {index}", "icon": None, "owner_id": members[-1]["user"]["id"],
+            "roles": roles, "emojis": [], "stickers": [], "features": [], "large": member_count > LARGE_THRESHOLD,
+            "unavailable": False, "member_count": len(members), "threads": [], "voice_states": [],
+            "presences": [], "stage_instances": [], "guild_scheduled_events": [], "soundboard_sounds": [],
+            "premium_tier": 0, "afk_timeout": 300, "verification_level": 0, "default_message_notifications": 0,
+            "explicit_content_filter": 0, "mfa_level": 0, "nsfw_level": 0, "system_channel_flags": 0,
+            "preferred_locale": "en-US", "joined_at": iso_now(),
+            "channels": [{"id": str(channel_id), "type": 0, "name": "dungeons", "position": 0,
+                          "guild_id": str(guild_id), "permission_overwrites": [], "parent_id": None,
+                          "nsfw": False, "topic": None, "rate_limit_per_user": 0}],
+        }
+        self.members[guild_id] = members
+        self.channels[channel_id] = guild_id
+
+    def channel_of(self, guild_id: int) -> int:
+        return int(self.guilds[guild_id]["channels"][0]["id"])
+
+    def players(self, guild_id: int) -> list:
+        """Member payloads of a guild, without the bot."""
+        return self.members[guild_id][1:]
+
+    def _guild_create(self, guild_id: int) -> dict:
+        members = self.members[guild_id]
+        return dict(self.guilds[guild_id], members=members[:1] if self.guilds[guild_id]["large"] else members)
+
+    def _message(self, channel_id: int, payload: dict, flags: int = 0, message_id: int | None = None) -> dict:
+        guild_id = self.channels.get(channel_id)
+        message = {
+            "id": str(message_id or self.snowflake()), "channel_id": str(channel_id), "author": self.bot_user,
+            "content": payload.get("content") or "", "embeds": payload.get("embeds") or [],
+            "components": payload.get("components") or [], "attachments": [], "mentions": [],
+            "mention_roles": [], "mention_everyone": False, "pinned": False, "tts": False, "type": 0,
+            "timestamp": iso_now(), "edited_timestamp": None, "flags": payload.get("flags", flags) or 0,
+        }
+        if guild_id:
+            message["guild_id"] = str(guild_id)
+        self.messages[int(message["id"])] = message
+        return message
+
+    def seed_message(self, channel_id: int, content: str = "") -> int:
+        """Adds a bot message directly (for scenarios that start from existing events)."""
+        return int(self._message(channel_id, {"content": content})["id"])
+
+    # -- lifecycle --
+
+    def start(self):
+        """Starts the server thread and waits until it is listening."""
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._serve, args=(ready,), name="fake-discord", daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def _serve(self, ready: threading.Event):
+        asyncio.set_event_loop(self.loop)
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_route("GET", "/gateway", self._gateway)
+        app.router.add_route("*", API_PREFIX + "/{tail:.*}", self._rest)
+        self._runner = web.AppRunner(app, access_log=None)
+        self.loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        self.loop.run_until_complete(site.start())
+        self.port = site._server.sockets[0].getsockname()[1]
+        ready.set()
+        self.loop.run_forever()
+
+    def stop(self):
+        async def shutdown():
+            for session in list(self._sessions):
+                await session.close()
+            await self._runner.cleanup()
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(timeout=10)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=10)
+
+    def patch_discord(self):
+        """Points discord.py's REST and gateway URLs at this server."""
+        point_discord_at(self.port)
+
+    async def call(self, coro):
+        """Runs a coroutine on the server loop and awaits it from the caller's loop."""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+    # -- waiting for the bot --
+
+    async def until(self, predicate, timeout: float = 30.0):
+        """Waits (on the server loop) until `predicate()` is truthy, re-checked after every REST call."""
+        result = predicate()
+        if result:
+            return result
+        future = self.loop.create_future()
+        self._conditions.append((predicate, future))
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            if (predicate, future) in self._conditions:
+                self._conditions.remove((predicate, future))
+
+    def _check_conditions(self):
+        for predicate, future in list(self._conditions):
+            if future.done():
+                continue
+            result = predicate()
+            if result:
+                future.set_result(result)
+
+    def bot_reactions(self, message_id: int) -> int:
+        """How many emojis the bot has reacted with on a message."""
+        bot_id = self.bot_user["id"]
+        return sum(bot_id in users for users in self.reactions.get(message_id, {}).values())
+
+    # -- gateway --
+
+    async def _gateway(self, request: web.Request):
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        session = GatewaySession(self, ws)
+        self._sessions.append(session)
+        try:
+            await session.run()
+        finally:
+            self._sessions.remove(session)
+        return ws
+
+    def _session_for(self, guild_id: int):
+        for session in self._sessions:
+            if session.owns(guild_id):
+                return session
+        raise RuntimeError(f"No gateway session for guild {guild_id}")
+
+    async def dispatch(self, guild_id: int, event: str, data: dict):
+        """Sends a gateway event to the shard that owns `guild_id`."""
+        await self._session_for(guild_id).dispatch(event, data)
+
+    def interaction_payload(self, guild_id: int, member: dict, interaction_type: int, data: dict,
+                            message: dict | None = None) -> dict:
+        channel_id = self.channel_of(guild_id)
+        payload = {
+            "id": str(self.snowflake()), "application_id": self.application_id, "type": interaction_type,
+            "data": data, "guild_id": str(guild_id), "channel_id": str(channel_id),
+            "channel": {"id": str(channel_id), "type": 0, "name": "dungeons", "guild_id": str(guild_id),
+                        "permissions": ALL_PERMISSIONS},
+            "member": dict(member, permissions=ALL_PERMISSIONS), "token": f"tok{self.snowflake()}",
+            "version": 1, "locale": "en-US", "guild_locale": "en-US", "app_permissions": ALL_PERMISSIONS,
+            "entitlements": [], "authorizing_integration_owners": {"0": str(guild_id)}, "context": 0,
+            "attachment_size_limit": 26214400,
+        }
+        if message is not None:
+            payload["message"] = message
+        return payload
+
+    async def interact(self, guild_id: int, payload: dict, timeout: float = 30.0) -> dict:
+        """Sends an INTERACTION_CREATE and returns the bot's callback body."""
+        self.interactions[payload["token"]] = payload
+        waiter = self._callbacks[int(payload["id"])] = self.loop.create_future()
+        await self.dispatch(guild_id, "INTERACTION_CREATE", payload)
+        try:
+            return await asyncio.wait_for(waiter, timeout)
+        finally:
+            self._callbacks.pop(int(payload["id"]), None)
+
+    # -- REST --
+
+    def _limit(self, method: str, path: str):
+        """Returns (allowed, headers, bucket) for a request."""
+        if not self.rate_limits or path.startswith("/interactions/"):
+            return True, {}, None
+        allowed, _, reset_after = self._limiter.hit(("global",), *GLOBAL_LIMIT)
+        if not allowed:
+            return False, {"X-RateLimit-Global": "true", "X-RateLimit-Scope": "global",
+                           "Retry-After": f"{reset_after:.3f}"}, "global"
+        for methods, pattern, bucket, group, limit, per in RATE_LIMITS:
+            match = re.fullmatch(pattern, path)
+            if match and re.fullmatch(methods, method):
+                allowed, remaining, reset_after = self._limiter.hit((bucket, match.group(group)), limit, per)
+                headers = {
+                    "X-RateLimit-Limit": str(limit), "X-RateLimit-Remaining": str(remaining),
+                    "X-RateLimit-Reset": f"{time.time() + reset_after:.3f}",
+                    "X-RateLimit-Reset-After": f"{reset_after:.3f}", "X-RateLimit-Bucket": bucket,
+                }
+                if not allowed:
+                    headers.update({"X-RateLimit-Scope": "user", "Retry-After": f"{reset_after:.3f}"})
+                return allowed, headers, bucket
+        return True, {}, None
+
+    @staticmethod
+    def route_template(method: str, path: str) -> str:
+        template = re.sub(r"/\d{5,}", "/{id}", path)
+        template = re.sub(r"/webhooks/\{id\}/[^/]+", "/webhooks/{id}/{token}", template)
+        template = re.sub(r"/interactions/\{id\}/[^/]+", "/interactions/{id}/{token}", template)
+        template = re.sub(r"/reactions/[^/]+", "/reactions/{emoji}", template)
+        return f"{method} {template}"
+
+    async def _rest(self, request: web.Request):
+        path = "/" + request.match_info["tail"]
+        method = request.method
+        route = self.route_template(method, path)
+        self.rest_calls[route] += 1
+
+        allowed, headers, bucket = self._limit(method, path)
+        if not allowed:
+            self.rate_limited[route] += 1
+            retry_after = float(headers["Retry-After"])
+            body = {"message": "You are being rate limited.", "retry_after": retry_after,
+                    "global": bucket == "global"}
+            return self._json(body, 429, headers)
+
+        body = None
+        if request.can_read_body:
+            if request.content_type == "application/json":
+                body = await request.json()
+            else:
+                form = await request.post()   # Multipart: the JSON lives in `payload_json`
+                body = json.loads(form.get("payload_json", "{}"))
+        status, data = self._handle(method, path, body or {}, request.query)
+        self._check_conditions()
+        if status == 404 and data.get("code") == 0:
+            self.unknown_routes[route] += 1
+        if status == 204:
+            return web.Response(status=204, headers=headers)
+        return self._json(data, status, headers)
+
+    @staticmethod
+    def _json(data, status: int, headers: dict) -> web.Response:
+        # discord.py only decodes bodies whose content type is exactly application/json (no charset)
+        return web.Response(body=json.dumps(data).encode(), status=status,
+                            headers=dict(headers, **{"Content-Type": "application/json"}))
+
+    def _handle(self, method: str, path: str, body: dict, query) -> tuple:
+        parts = path.strip("/").split("/")
+
+        if path == "/users/@me":
+            return 200, self.bot_user
+        if path in ("/gateway", "/gateway/bot"):
+            return 200, {"url": f"ws://127.0.0.1:{self.port}/gateway", "shards": 1,
+                         "session_start_limit": {"total": 1000, "remaining": 1000, "reset_after": 0,
+                                                 "max_concurrency": 1}}
+        if path in ("/applications/@me", "/oauth2/applications/@me"):
+            return 200, {"id": self.application_id, "name": "DungeonDaddy", "icon": None, "description": "",
+                         "bot_public": True, "bot_require_code_grant": False, "verify_key": "", "flags": 0,
+                         "owner": self._user(1, "owner")}
+
+        if parts[0] == "applications" and parts[-1] == "commands":
+            if method == "PUT":
+                for command in body:
+                    command.setdefault("id", str(self._command_ids.setdefault(command["name"], self.snowflake())))
+                    command.setdefault("application_id", self.application_id)
+                    command.setdefault("version", "1")
+                return 200, body
+            return 200, []
+
+        if parts[0] == "interactions" and parts[-1] == "callback":
+            return self._interaction_callback(int(parts[1]), parts[2], body)
+
+        if parts[0] == "webhooks":
+            return self._webhook(method, parts[2], parts[3:], body)
+
+        if parts[0] == "channels":
+            return self._channel(method, int(parts[1]), parts[2:], body)
+
+        if parts[0] == "guilds" and len(parts) == 4 and parts[2] == "members":
+            member = next((m for m in self.members.get(int(parts[1]), []) if m["user"]["id"] == parts[3]), None)
+            return (200, member) if member else (404, {"message": "Unknown Member", "code": 10007})
+
+        return 404, {"message": f"Not emulated: {method} {path}", "code": 0}
+
+    def _interaction_callback(self, interaction_id: int, token: str, body: dict) -> tuple:
+        interaction = self.interactions.get(token)
+        callback_type = body.get("type")
+        data = body.get("data") or {}
+        message = None
+        if interaction is not None and callback_type == 4:        # Channel message
+            message = self._message(int(interaction["channel_id"]), data)
+            interaction["original_message_id"] = message["id"]
+        elif interaction is not None and callback_type == 7:      # Update the component's message
+            source = interaction.get("message")
+            if source is not None:
+                message = self.messages.get(int(source["id"])) or dict(source)
+                message.update({k: v for k, v in data.items() if k in ("content", "embeds", "components", "flags")})
+                interaction["original_message_id"] = message["id"]
+        reply = {"interaction": {"id": str(interaction_id), "type": (interaction or {}).get("type", 2),
+                                 "response_message_id": message["id"] if message else None,
+                                 "response_message_loading": callback_type == 5,
+                                 "response_message_ephemeral": bool((data.get("flags") or 0) & 64)},
+                 "resource": {"type": callback_type}}
+        if message is not None:
+            reply["resource"]["message"] = message
+        waiter = self._callbacks.get(interaction_id)
+        if waiter is not None and not waiter.done():
+            waiter.set_result({"type": callback_type, "data": data, "message": message})
+        return 200, reply
+
+    def _webhook(self, method: str, token: str, rest: list, body: dict) -> tuple:
+        interaction = self.interactions.get(token)
+        channel_id = int(interaction["channel_id"]) if interaction else next(iter(self.channels))
+        if not rest and method == "POST":                          # Follow-up message
+            message = self._message(channel_id, body)
+            self.followups.setdefault(token, []).append(message)
+            return 200, message
+        if len(rest) == 2 and rest[0] == "messages":
+            message_id = rest[1]
+            if message_id == "@original":
+                message_id = (interaction or {}).get("original_message_id")
+            message = self.messages.get(int(message_id)) if message_id else None
+            if message is None:
+                return 404, {"message": "Unknown Message", "code": 10008}
+            if method == "DELETE":
+                self._delete(int(message_id))
+                return 204, None
+            if method == "PATCH":
+                message.update({k: v for k, v in body.items() if k in ("content", "embeds", "components")})
+                message["edited_timestamp"] = iso_now()
+            return 200, message
+        return 404, {"message": "Unknown Webhook route", "code": 0}
+
+    def _delete(self, message_id: int):
+        if self.messages.pop(message_id, None) is not None:
+            self.deleted_at[message_id] = time.time()
+
+    def _channel(self, method: str, channel_id: int, rest: list, body: dict) -> tuple:
+        if channel_id not in self.channels:
+            return 404, {"message": "Unknown Channel", "code": 10003}
+        if rest == ["messages"] and method == "POST":
+            return 200, self._message(channel_id, body)
+        if rest == ["messages", "bulk-delete"] and method == "POST":
+            for message_id in body.get("messages", []):
+                self._delete(int(message_id))
+            return 204, None
+        if len(rest) >= 2 and rest[0] == "messages":
+            message = self.messages.get(int(rest[1]))
+            if message is None:
+                return 404, {"message": "Unknown Message", "code": 10008}
+            if len(rest) == 2:
+                if method == "DELETE":
+                    self._delete(int(rest[1]))
+                    return 204, None
+                if method == "PATCH":
+                    message.update({k: v for k, v in body.items() if k in ("content", "embeds", "components")})
+                    message["edited_timestamp"] = iso_now()
+                return 200, message
+            if rest[2] == "reactions":
+                reactions = self.reactions.setdefault(int(rest[1]), {})
+                emoji = rest[3]
+                if method == "PUT":
+                    reactions.setdefault(emoji, set()).add(self.bot_user["id"])
+                elif method == "DELETE":
+                    reactions.get(emoji, set()).discard(rest[4] if len(rest) > 4 else self.bot_user["id"])
+                return 204, None
+        return 404, {"message": "Unknown channel route", "code": 0}
+
+
+class GatewaySession:
+    """One shard's websocket connection."""
+
+    def __init__(self, fake: FakeDiscord, ws: web.WebSocketResponse):
+        self.fake = fake
+        self.ws = ws
+        self.seq = 0
+        self.shard = (0, 1)
+        self.identified = asyncio.Event()
+
+    def owns(self, guild_id: int) -> bool:
+        return self.identified.is_set() and (guild_id >> 22) % self.shard[1] == self.shard[0]
+
+    async def send(self, op: int, data, event: str | None = None):
+        payload = {"op": op, "d": data, "s": None, "t": event}
+        if event is not None:
+            self.seq += 1
+            payload["s"] = self.seq
+        await self.ws.send_str(json.dumps(payload))
+
+    async def dispatch(self, event: str, data: dict):
+        await self.send(0, data, event)
+
+    async def close(self):
+        await self.ws.close()
+
+    async def run(self):
+        await self.send(10, {"heartbeat_interval": 41250})
+        async for msg in self.ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            payload = json.loads(msg.data)
+            op, data = payload["op"], payload.get("d")
+            if op == 1:
+                await self.send(11, None)
+            elif op == 2:
+                await self._identify(data)
+            elif op == 6:
+                self.identified.set()
+                await self.dispatch("RESUMED", {})
+            elif op == 8:
+                await self._request_members(data)
+
+    async def _identify(self, data: dict):
+        self.shard = tuple(data.get("shard") or (0, 1))
+        guild_ids = [g for g in self.fake.guilds if (g >> 22) % self.shard[1] == self.shard[0]]
+        await self.dispatch("READY", {
+            "v": 10, "user": self.fake.bot_user, "session_id": f"session{self.fake.snowflake()}",
+            "resume_gateway_url": f"ws://127.0.0.1:{self.fake.port}/gateway", "shard": list(self.shard),
+            "guilds": [{"id": str(g), "unavailable": True} for g in guild_ids],
+            "application": {"id": self.fake.application_id, "flags": 0},
+        })
+        for guild_id in guild_ids:
+            await self.dispatch("GUILD_CREATE", self.fake._guild_create(guild_id))
+        self.identified.set()
+
+    async def _request_members(self, data: dict):
+        guild_id = int(data["guild_id"])
+        members = self.fake.members.get(guild_id, [])
+        if data.get("user_ids"):
+            wanted = {str(user_id) for user_id in data["user_ids"]}
+            found = [m for m in members if m["user"]["id"] in wanted]
+        else:
+            query = (data.get("query") or "").lower()
+            found = [m for m in members if m["user"]["username"].lower().startswith(query)]
+            if data.get("limit"):
+                found = found[:data["limit"]]
+        chunks = [found[i:i + CHUNK_SIZE] for i in range(0, len(found), CHUNK_SIZE)] or [[]]
+        for index, chunk in enumerate(chunks):
+            await self.dispatch("GUILD_MEMBERS_CHUNK", {
+                "guild_id": str(guild_id), "members": chunk, "chunk_index": index, "chunk_count": len(chunks),
+                "not_found": [], "nonce": data.get("nonce"),
+            })
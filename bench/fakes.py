@@ -0,0 +1,109 @@
+"""Lightweight stand-ins for the discord.py objects the benchmarks touch.
+
+They carry only the attributes daddy.py reads, so timings measure the bot's
+own code rather than discord.py model construction or network calls.
+"""
+
+
+class FakeAvatar:
+    __slots__ = ("url",)
+
+    def __init__(self, url: str):
+        self.url = url
+
+
+class FakeMember:
+    __slots__ = ("id", "name", "global_name", "display_name", "display_avatar", "guild")
+
+    def __init__(self, member_id: int, guild=None, name: str | None = None):
+        self.id = member_id
+        self.name = name or f"player{member_id}"
+        self.global_name = f"Player{member_id}"
+        self.display_name = self.global_name
+        self.display_avatar = FakeAvatar(f"https://cdn.discordapp.com/embed/avatars/{member_id % 6}.png")
+        self.guild = guild
+
+    @property
+    def mention(self) -> str:
+        return f"<@{self.id}>"
+
+
+class FakeGuild:
+    """A guild with `size` members named player<id>. Member IDs start at 1000."""
+
+    def __init__(self, guild_id: int, size: int = 0):
+        self.id = guild_id
+        self._members = {}
+        for member_id in range(1000, 1000 + size):
+            self._members[member_id] = FakeMember(member_id, self)
+        self.queries = 0
+
+    @property
+    def members(self) -> list:
+        return list(self._members.values())
+
+    def get_member(self, user_id: int):
+        return self._members.get(user_id)
+
+    def get_role(self, role_id: int):
+        return None
+
+    async def query_members(self, query: str | None = None, *, limit: int = 5, user_ids=None, cache: bool = True):
+        """Answers like a gateway member query would, without the round trip."""
+        self.queries += 1
+        if user_ids:
+            return [self._members[i] for i in user_ids if i in self._members][:limit]
+        query = (query or "").casefold()
+        return [m for m in self._members.values() if m.name.startswith(query)][:limit]
+
+
+class FakeEmoji:
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+class FakeReaction:
+    """The fields of `discord.RawReactionActionEvent` the reaction handlers read."""
+
+    __slots__ = ("message_id", "channel_id", "guild_id", "user_id", "emoji", "member")
+
+    def __init__(self, message_id: int, channel_id: int, member: FakeMember, emoji: str):
+        self.message_id = message_id
+        self.channel_id = channel_id
+        self.guild_id = member.guild.id if member.guild else None
+        self.user_id = member.id
+        self.emoji = FakeEmoji(emoji)
+        self.member = member
+
+
+class FakeMessage:
+    """A message handle whose REST calls only count themselves."""
+
+    calls = 0
+
+    __slots__ = ("id", "channel_id")
+
+    def __init__(self, message_id: int, channel_id: int):
+        self.id = message_id
+        self.channel_id = channel_id
+
+    async def edit(self, **fields):
+        FakeMessage.calls += 1
+
+    async def delete(self):
+        FakeMessage.calls += 1
+
+    async def remove_reaction(self, emoji, member):
+        FakeMessage.calls += 1
+
+
+class FakeChannel:
+    calls = 0
+
+    def __init__(self, channel_id: int):
+        self.id = channel_id
+
+    async def delete_messages(self, messages):
+        FakeChannel.calls += 1
@@ -0,0 +1,330 @@
+"""End-to-end load test of daddy.py against the offline fake Discord.
+
+Starts the real bot (memory state backend, temp working directory) against
+bench/fake_discord.py and runs three scenarios:
+
+  create    `/dd` groups at --rate per second: slash command, dungeon, key level,
+            "Now", role modal (with a Tank typed by name), up to the bot's 3 reactions
+  reactions a storm of --reactions sign-ups and withdrawals at --reaction-rate per
+            second spread over the created groups, timed through the reaction handlers
+            (rejected sign-ups include taking the reaction back, which queues on
+            the channel's reaction bucket)
+  cleanup   --expired groups expiring over 2 seconds, timed until every message is deleted
+
+Each scenario reports latency percentiles and the REST calls the bot made,
+per route, with how many of them the fake rate limiter answered with 429.
+
+    python bench/loadtest.py [--guilds 4] [--members 200] [--groups 40] [--rate 10]
+                             [--reactions 1000] [--reaction-rate 100] [--expired 400]
+                             [--no-rate-limits] [--json results.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from fake_discord import FakeDiscord  # noqa: E402
+
+TOKEN = "loadtest.token.offline"
+REACTION_EMOJIS = ("🛡️", "💚", "⚔️")
+
+
+def percentiles(samples: list) -> dict:
+    """p50/p90/p99/max in milliseconds."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return {"count": len(ordered), "p50_ms": pick(0.50), "p90_ms": pick(0.90), "p99_ms": pick(0.99),
+            "max_ms": ordered[-1] * 1000}
+
+
+def find_custom_id(components: list) -> str | None:
+    """First interactive component's custom_id in a message or modal."""
+    for component in components or []:
+        if component.get("custom_id"):
+            return component["custom_id"]
+        nested = component.get("components") or ([component["component"]] if component.get("component") else [])
+        found = find_custom_id(nested)
+        if found:
+            return found
+    return None
+
+
+def fill_modal(components: list, values: list) -> list:
+    """Builds a modal submission from the modal the bot sent, filling text inputs in order."""
+    values = iter(values)
+
+    def fill(component: dict) -> dict:
+        if component["type"] == 4:
+            return {"type": 4, "custom_id": component["custom_id"], "value": next(values, "")}
+        if component.get("component"):
+            return {"type": component["type"], "component": fill(component["component"])}
+        return {"type": component["type"], "components": [fill(c) for c in component.get("components", [])]}
+
+    return [fill(component) for component in components]
+
+
+class LoadTest:
+    def __init__(self, fake: FakeDiscord, daddy):
+        self.fake = fake
+        self.daddy = daddy
+        self.results = {}
+        self._rest_before = Counter()
+        self._limited_before = Counter()
+
+    # -- bookkeeping --
+
+    def begin(self):
+        self._rest_before = Counter(self.fake.rest_calls)
+        self._limited_before = Counter(self.fake.rate_limited)
+
+    def finish(self, name: str, elapsed: float, latencies: dict, extra: dict | None = None):
+        calls = Counter(self.fake.rest_calls)
+        calls.subtract(self._rest_before)
+        limited = Counter(self.fake.rate_limited)
+        limited.subtract(self._limited_before)
+        result = {
+            "elapsed_s": elapsed,
+            "latency": {label: percentiles(samples) for label, samples in latencies.items()},
+            "rest_calls": {route: n for route, n in sorted(calls.items()) if n},
+            "rate_limited": {route: n for route, n in sorted(limited.items()) if n},
+            **(extra or {}),
+        }
+        self.results[name] = result
+        self.report(name, result)
+
+    @staticmethod
+    def report(name: str, result: dict):
+        print(f"\n=== {name} ({result['elapsed_s']:.1f}s) ===")
+        for label, stats in result["latency"].items():
+            if stats["count"]:
+                print(f"  {label:<22} n={stats['count']:<6} p50 {stats['p50_ms']:8.1f} ms   "
+                      f"p90 {stats['p90_ms']:8.1f} ms   p99 {stats['p99_ms']:8.1f} ms   max {stats['max_ms']:8.1f} ms")
+        for key, value in result.items():
+            if key not in ("elapsed_s", "latency", "rest_calls", "rate_limited"):
+                print(f"  {key}: {value}")
+        total = sum(result["rest_calls"].values())
+        print(f"  REST calls: {total} ({sum(result['rate_limited'].values())} answered with 429)")
+        for route, n in result["rest_calls"].items():
+            limited = result["rate_limited"].get(route, 0)
+            print(f"    {n:>6}  {route}" + (f"   ({limited} x 429)" if limited else ""))
+
+    async def settle(self, quiet: float = 2.0, timeout: float = 120.0):
+        """Waits until the bot has made no REST calls for `quiet` seconds (queued edits and retries done)."""
+        deadline = time.monotonic() + timeout
+        last, quiet_since = -1, time.monotonic()
+        while time.monotonic() < deadline:
+            total = sum(self.fake.rest_calls.values())
+            if total != last:
+                last, quiet_since = total, time.monotonic()
+            elif time.monotonic() - quiet_since >= quiet:
+                return
+            await asyncio.sleep(0.1)
+
+    # -- scenario: /dd creation --
+
+    async def create_group(self, guild_id: int, steps: dict) -> int:
+        """Runs one `/dd` flow on the fake's loop. Returns the event message ID."""
+        fake = self.fake
+        creator, tank = random.sample(fake.players(guild_id), 2)
+        command_id = fake._command_ids.get("dd", fake.snowflake())
+
+        async def step(label: str, interaction_type: int, data: dict, message: dict | None = None) -> dict:
+            payload = fake.interaction_payload(guild_id, creator, interaction_type, data, message)
+            started = time.perf_counter()
+            reply = await fake.interact(guild_id, payload)
+            steps[label].append(time.perf_counter() - started)
+            return payload, reply
+
+        started = time.perf_counter()
+        _, reply = await step("slash /dd", 2, {"id": str(command_id), "name": "dd", "type": 1})
+        prompt = reply["message"]
+        for label, value in (("dungeon select", "Ara-Kara"), ("key level select", "12"), ("schedule select", "Now")):
+            data = {"custom_id": find_custom_id(prompt["components"]), "component_type": 3, "values": [value]}
+            _, reply = await step(label, 3, data, prompt)
+            if reply["message"] is not None:
+                prompt = reply["message"]
+
+        modal = reply["data"]
+        submission = {"custom_id": modal["custom_id"],
+                      "components": fill_modal(modal["components"], [tank["user"]["username"], "", ""])}
+        payload, _ = await step("role modal submit", 5, submission, prompt)
+
+        token = payload["token"]
+        followups = await fake.until(lambda: fake.followups.get(token))
+        message_id = int(followups[0]["id"])
+        await fake.until(lambda: fake.bot_reactions(message_id) >= len(REACTION_EMOJIS))
+        steps["full flow"].append(time.perf_counter() - started)
+        return message_id
+
+    async def run_create(self, groups: int, rate: float) -> list:
+        self.begin()
+        steps = {label: [] for label in ("slash /dd", "dungeon select", "key level select", "schedule select",
+                                         "role modal submit", "full flow")}
+        guild_ids = list(self.fake.guilds)
+        started = time.perf_counter()
+        tasks = []
+        for i in range(groups):
+            coro = self.create_group(guild_ids[i % len(guild_ids)], steps)
+            tasks.append(asyncio.ensure_future(self.fake.call(coro)))
+            await asyncio.sleep(1 / rate)
+        created = [result for result in await asyncio.gather(*tasks, return_exceptions=True)
+                   if not isinstance(result, BaseException)]
+        elapsed = time.perf_counter() - started
+        await self.settle()
+        self.finish("create", elapsed, steps, {"groups_created": f"{len(created)}/{groups}"})
+        return created
+
+    # -- scenario: reaction storm --
+
+    def time_reaction_handlers(self, latencies: dict, sent: dict):
+        """Wraps the bot's raw reaction handlers to time each event from gateway send to handler return."""
+        bot = self.daddy.bot
+        for kind in ("add", "remove"):
+            handler = getattr(bot, f"on_raw_reaction_{kind}")
+
+            async def timed(payload, handler=handler, kind=kind):
+                try:
+                    await handler(payload)
+                finally:
+                    key = (kind, payload.message_id, payload.user_id, payload.emoji.name)
+                    started = sent.pop(key, None)
+                    if started is not None:
+                        latencies[f"reaction {kind}"].append(time.perf_counter() - started)
+
+            setattr(bot, f"on_raw_reaction_{kind}", timed)
+
+    async def run_reactions(self, message_ids: list, reactions: int, rate: float):
+        self.begin()
+        fake = self.fake
+        latencies = {"reaction add": [], "reaction remove": []}
+        sent = {}
+        self.time_reaction_handlers(latencies, sent)
+        events = [(message_id, fake.channels[int(fake.messages[message_id]["channel_id"])])
+                  for message_id in message_ids if message_id in fake.messages]
+        holding = set()   # (message_id, user_id, emoji) currently reacted
+
+        async def storm():
+            for _ in range(reactions):
+                message_id, guild_id = random.choice(events)
+                member = random.choice(fake.players(guild_id))
+                emoji = random.choice(REACTION_EMOJIS)
+                key = (message_id, int(member["user"]["id"]), emoji)
+                kind = "remove" if key in holding else "add"
+                (holding.discard if kind == "remove" else holding.add)(key)
+                data = {"user_id": member["user"]["id"], "message_id": str(message_id),
+                        "channel_id": fake.messages[message_id]["channel_id"], "guild_id": str(guild_id),
+                        "emoji": {"id": None, "name": emoji}, "burst": False, "type": 0}
+                if kind == "add":
+                    data["member"] = member
+                sent[(kind, *key)] = time.perf_counter()
+                await fake.dispatch(guild_id, f"MESSAGE_REACTION_{kind.upper()}", data)
+                await asyncio.sleep(1 / rate)
+
+        started = time.perf_counter()
+        await fake.call(storm())
+        deadline = time.monotonic() + 600
+        while sent and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        elapsed = time.perf_counter() - started
+        await self.settle()
+        self.finish("reactions", elapsed, latencies,
+                    {"gateway_events": reactions, "unhandled": len(sent), "groups": len(events)})
+
+    # -- scenario: expiry cleanup --
+
+    async def run_cleanup(self, expired: int):
+        self.begin()
+        fake, daddy = self.fake, self.daddy
+        guild_ids = list(fake.guilds)
+        now = time.time()
+        expires = {}   # message_id -> expiry of its event (role pings share their event's)
+        for i in range(expired):
+            guild_id = guild_ids[i % len(guild_ids)]
+            channel_id = fake.channel_of(guild_id)
+            message_id = fake.seed_message(channel_id, "expiring group")
+            event = daddy.EventRecord(message_id, guild_id, channel_id, int(fake.players(guild_id)[0]["user"]["id"]),
+                                      "Ara-Kara", "+12", "Now", None, "", now + 2 * i / expired)
+            expires[message_id] = event.expires_at
+            if i % 2:
+                event.role_pings_message_id = fake.seed_message(channel_id, "Open spots")
+                expires[event.role_pings_message_id] = event.expires_at
+            daddy.active_events[message_id] = event
+            daddy.schedule_event_expiry(message_id)
+
+        sweep_before = dict(daddy.last_sweep)
+        started = time.perf_counter()
+        await fake.call(fake.until(lambda: all(m in fake.deleted_at for m in expires), timeout=300))
+        elapsed = time.perf_counter() - started
+        deadline = time.monotonic() + 60
+        while daddy.last_sweep == sweep_before and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)  # The sweep records its stats after the last delete returns
+        delays = [fake.deleted_at[m] - expires_at for m, expires_at in expires.items()]
+        self.finish("cleanup", elapsed, {"expiry to delete": delays},
+                    {"messages_deleted": len(expires), "sweep": dict(daddy.last_sweep)})
+
+
+async def main(args):
+    fake = FakeDiscord(guilds=args.guilds, members_per_guild=args.members, rate_limits=not args.no_rate_limits)
+    fake.start()
+    fake.patch_discord()
+
+    import daddy  # Imported after the environment is set up (see below)
+    bot_task = asyncio.create_task(daddy.bot.start(TOKEN))
+    started = time.perf_counter()
+    await asyncio.wait_for(daddy.bot.wait_until_ready(), timeout=60)
+    print(f"✅ Bot ready against the fake in {time.perf_counter() - started:.2f}s "
+          f"({args.guilds} guilds x {args.members} members).")
+
+    test = LoadTest(fake, daddy)
+    await test.settle(quiet=1.0)  # Command sync and startup calls
+    created = await test.run_create(args.groups, args.rate)
+    if created and args.reactions:
+        await test.run_reactions(created, args.reactions, args.reaction_rate)
+    if args.expired:
+        await test.run_cleanup(args.expired)
+
+    if fake.unknown_routes:
+        print(f"\n⚠️ Routes the fake doesn't emulate: {dict(fake.unknown_routes)}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(test.results, f, indent=2)
+        print(f"\n✅ Results written to {args.json}")
+
+    await daddy.bot.close()
+    await asyncio.gather(bot_task, return_exceptions=True)
+    fake.stop()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--guilds", type=int, default=4)
+    arg_parser.add_argument("--members", type=int, default=200, help="Members per guild")
+    arg_parser.add_argument("--groups", type=int, default=40, help="Groups created through /dd")
+    arg_parser.add_argument("--rate", type=float, default=10.0, help="/dd flows started per second")
+    arg_parser.add_argument("--reactions", type=int, default=1000, help="Reaction events in the storm")
+    arg_parser.add_argument("--reaction-rate", type=float, default=100.0, help="Reaction events per second")
+    arg_parser.add_argument("--expired", type=int, default=400, help="Groups expired in the cleanup scenario")
+    arg_parser.add_argument("--no-rate-limits", action="store_true", help="Let the fake accept every request")
+    arg_parser.add_argument("--json", help="Write the results to this file")
+    args = arg_parser.parse_args()
+    if args.json:
+        args.json = os.path.abspath(args.json)
+
+    # The bot reads config files from the working directory; keep the repo's untouched
+    workdir = tempfile.mkdtemp(prefix="dd-loadtest-")
+    os.chdir(workdir)
+    os.environ.update({"DISCORD_BOT_TOKEN": TOKEN, "DD_STATE_BACKEND": "memory", "DEV_GUILD_ID": "0"})
+    asyncio.run(main(args))
@@ -0,0 +1,266 @@
+"""Micro-benchmarks for the bot's hot functions, written to JSON for comparison.
+
+Runs daddy.py's own code against the lightweight fakes in bench/fakes.py (no
+gateway, no REST, memory state backend) and records the median and best time
+per operation over several repeats:
+
+  build_event_embed          full render of a group with a comment and a scheduled start
+  format_schedule            a start instant as timestamp markup, and "Now"
+  parse_schedule             the DD/MM/YYYY HH:MM fast path and the dateutil fallback
+  reaction add/remove        the slot logic behind on_raw_reaction_add/remove, through the handlers
+  member lookup              RoleAssignmentModal._get_member_from_input on 1k/10k/100k member guilds
+  expiry cleanup             expire_event and one cleanup_expired_events sweep over 10k events
+  event index                re-indexing after a sign-up, and /groups-style searches over 10k events
+
+Compare two runs with bench/compare.py.
+
+    python bench/microbench.py [--out bench/results/latest.json] [--sizes 1000,10000,100000]
+                               [--events 10000] [--repeat 5] [--only member]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+os.environ.setdefault("DISCORD_BOT_TOKEN", "bench")  # daddy refuses to import without one; never used
+
+import discord  # noqa: E402
+import daddy  # noqa: E402
+from events import EventRecord, Role  # noqa: E402
+from event_index import EventIndex  # noqa: E402
+from state_backend import MemoryBackend  # noqa: E402
+from fakes import FakeChannel, FakeGuild, FakeMember, FakeMessage, FakeReaction  # noqa: E402
+
+DEFAULT_OUT = os.path.join(REPO_DIR, "bench", "results", "latest.json")
+CHANNELS = 50   # Channels the cleanup events are spread over
+
+
+def setup_fakes():
+    """Points daddy's network-facing helpers at the fakes."""
+    daddy.event_store = MemoryBackend()
+    daddy.event_message = FakeMessage
+    daddy.bot.get_channel = FakeChannel
+    daddy.bot._connection.user = FakeMember(1)   # Handlers ignore the bot's own reactions
+
+
+class Suite:
+    def __init__(self, repeat: int, only: str | None):
+        self.repeat = repeat
+        self.only = only
+        self.results = {}
+
+    def wanted(self, name: str) -> bool:
+        return not self.only or self.only in name
+
+    def record(self, name: str, samples: list, ops: int):
+        """Stores per-operation timings (microseconds) from `repeat` timed runs of `ops` operations."""
+        per_op = [s / ops * 1e6 for s in samples]
+        self.results[name] = {"unit": "us/op", "ops": ops, "median": statistics.median(per_op),
+                              "best": min(per_op), "repeat": len(per_op)}
+        print(f"{name:<48} {statistics.median(per_op):>12.2f} us/op  (best {min(per_op):.2f}, {ops} ops)")
+
+    def time(self, name: str, fn, ops: int):
+        if not self.wanted(name):
+            return
+        samples = []
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            for _ in range(ops):
+                fn()
+            samples.append(time.perf_counter() - started)
+        self.record(name, samples, ops)
+
+    async def atime(self, name: str, fn, ops: int, before=None):
+        """Times `await fn()` `ops` times per repeat; `before()` resets state outside the timing."""
+        if not self.wanted(name):
+            return
+        samples = []
+        for _ in range(self.repeat):
+            if before is not None:
+                await before()
+            started = time.perf_counter()
+            for _ in range(ops):
+                await fn()
+            samples.append(time.perf_counter() - started)
+        self.record(name, samples, ops)
+
+
+# ------------------ Rendering ------------------
+def bench_rendering(suite: Suite):
+    creator = FakeMember(2)
+    event = EventRecord(10, 1, 1, creator.id, "Ara-Kara", "+12", "20/03/2031 19:30 (UTC)", time.time() + 7200,
+                        "Timing it, bring lust", time.time() + 3600, tank_id=3, healer_id=4, dps_ids=[5, 6],
+                        creator_name=creator.display_name, creator_avatar=creator.display_avatar.url)
+    suite.time("build_event_embed", lambda: daddy.build_event_embed(event), 5000)
+
+    now = EventRecord(11, 1, 1, creator.id, "Ara-Kara", "+12", "Now", None, "", time.time() + 3600)
+    suite.time("format_schedule (start instant)", lambda: daddy.format_schedule(event), 20000)
+    suite.time("format_schedule (Now)", lambda: daddy.format_schedule(now), 20000)
+
+
+# ------------------ Time Parsing ------------------
+def bench_time_parsing(suite: Suite):
+    user_tz = daddy.tz.gettz("Europe/Berlin")
+    suite.time("parse_schedule (DD/MM/YYYY HH:MM)", lambda: daddy.parse_schedule("20/03/2031 15:00", user_tz), 20000)
+    suite.time("parse_schedule (dateutil fallback)", lambda: daddy.parse_schedule("March 20 2031 3pm", user_tz), 2000)
+
+
+# ------------------ Reactions ------------------
+async def bench_reactions(suite: Suite):
+    guild = FakeGuild(1)
+    msg_id, channel_id = 20, 2
+    event = EventRecord(msg_id, guild.id, channel_id, 2, "Ara-Kara", "+12", "Now", None, "", time.time() + 3600)
+    daddy.active_events[msg_id] = event
+    player = FakeMember(3, guild)
+    tank = FakeReaction(msg_id, channel_id, player, "🛡️")
+
+    async def sign_up_and_leave():
+        await daddy.on_raw_reaction_add(tank)
+        await daddy.on_raw_reaction_remove(tank)
+
+    await suite.atime("reaction add + remove (slot claimed and freed)", sign_up_and_leave, 2000)
+    assert event.tank_id is None, "slot wasn't freed"
+
+    event.tank_id = 4
+    await suite.atime("reaction add (slot taken, reaction removed)", lambda: daddy.on_raw_reaction_add(tank), 2000)
+
+    daddy.embed_editor.forget(msg_id)
+    daddy.active_events.pop(msg_id, None)
+
+
+# ------------------ Member Lookup ------------------
+async def bench_member_lookup(suite: Suite, sizes: list):
+    modal = daddy.RoleAssignmentModal(None, "Ara-Kara", "+12", "Now", None)
+    for size in sizes:
+        guild = FakeGuild(100 + size, size)
+        middle = 1000 + size // 2
+
+        async def rebuild():
+            daddy.member_index.drop_guild(guild.id)
+
+        async def first_lookup():
+            await modal._get_member_from_input(guild, f"player{middle}")
+
+        await suite.atime(f"member lookup, first (index build) [{size}]", first_lookup, 1, before=rebuild)
+
+        async def by_name():
+            assert await modal._get_member_from_input(guild, f"Player{middle}")
+
+        async def by_mention():
+            assert await modal._get_member_from_input(guild, f"<@{middle}>")
+
+        async def unknown():
+            await modal._get_member_from_input(guild, "nobody-by-this-name")
+
+        await suite.atime(f"member lookup, exact name [{size}]", by_name, 2000)
+        await suite.atime(f"member lookup, mention [{size}]", by_mention, 2000)
+        await suite.atime(f"member lookup, unknown name [{size}]", unknown, 20)
+        daddy.member_index.drop_guild(guild.id)
+
+
+# ------------------ Event Index ------------------
+def bench_event_index(suite: Suite, events: int):
+    index = EventIndex()
+    dungeons = daddy.DUNGEONS
+    for i in range(events):
+        event = EventRecord(i, 1, 3 + i % CHANNELS, 100 + i % 500, dungeons[i % len(dungeons)], str(i % 21),
+                            "Now", None, "", time.time() + 3600, tank_id=7 if i % 3 else None,
+                            healer_id=8 if i % 4 else None)
+        index.update(event)
+
+    event = EventRecord(events, 1, 3, 2, "Ara-Kara", "12", "Now", None, "", time.time() + 3600)
+
+    def join_and_leave():
+        event.healer_id = 9
+        index.update(event)
+        event.healer_id = None
+        index.update(event)
+
+    suite.time(f"event index update (join + leave) [{events} events]", join_and_leave, 10000)
+    suite.time(f"event index search, joinable [{events} events]",
+               lambda: index.search(1, joinable=True), 20)
+    suite.time(f"event index search, healer + dungeon + key 10-15 [{events} events]",
+               lambda: index.search(1, joinable=True, dungeon=dungeons[2], levels=range(10, 16), role=Role.HEALER), 2000)
+    suite.time(f"event index search, creator [{events} events]", lambda: index.search(1, creator_id=150), 2000)
+
+
+# ------------------ Expiry Cleanup ------------------
+async def bench_cleanup(suite: Suite, events: int):
+    first_id = discord.utils.time_snowflake(datetime.now(daddy.tz.UTC))  # Recent, so they're bulk deleted
+
+    async def populate():
+        for i in range(events):
+            msg_id = first_id + 2 * i
+            event = EventRecord(msg_id, 1, 3 + i % CHANNELS, 2, "Ara-Kara", "+12", "Now", None, "", time.time() - 1)
+            if i % 2:
+                event.role_pings_message_id = msg_id + 1
+            daddy.active_events[msg_id] = event
+
+    async def expire_all():
+        for i in range(events):
+            await daddy.expire_event(first_id + 2 * i)
+        daddy.scheduler.cancel(("sweep",))  # The sweep is timed on its own below
+
+    async def populate_and_expire():
+        await populate()
+        await expire_all()
+
+    await suite.atime(f"expire_event [{events} events]", expire_all, 1, before=populate)
+    await suite.atime(f"cleanup_expired_events sweep [{events} events]", daddy.cleanup_expired_events, 1,
+                      before=populate_and_expire)
+    assert not daddy.active_events and not daddy.pending_teardown
+
+
+async def run(args) -> dict:
+    setup_fakes()
+    suite = Suite(args.repeat, args.only)
+    bench_rendering(suite)
+    bench_time_parsing(suite)
+    await bench_reactions(suite)
+    await bench_member_lookup(suite, [int(size) for size in args.sizes.split(",")])
+    bench_event_index(suite, args.events)
+    await bench_cleanup(suite, args.events)
+    return suite.results
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--out", default=DEFAULT_OUT, help="Where to write the JSON results")
+    arg_parser.add_argument("--sizes", default="1000,10000,100000", help="Guild sizes for the member lookups")
+    arg_parser.add_argument("--events", type=int, default=10000, help="Events in the cleanup benchmark")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark")
+    arg_parser.add_argument("--only", help="Run only benchmarks whose name contains this")
+    args = arg_parser.parse_args()
+
+    results = asyncio.run(run(args))
+    report = {
+        "meta": {"commit": git_commit(), "date": datetime.now().isoformat(timespec="seconds"),
+                 "python": platform.python_version(), "discord.py": discord.__version__,
+                 "machine": f"{platform.system()} {platform.machine()}", "repeat": args.repeat},
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"✅ {len(results)} results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Check for the embed edit coalescer's "always publish the final state" guarantee.
+
+Drives `EmbedEditCoalescer` with a fake event whose state is a counter and a
+fake publish that records what reached "Discord":
+
+  burst          `--updates` changes in a row collapse into a leading and a trailing edit,
+                 and the trailing one carries the final state
+  failed edit    the first publish raises; the final state still lands on the retry
+  outage         every publish raises; the coalescer gives up after MAX_PUBLISH_RETRIES
+                 retries instead of looping, and the next change publishes again
+
+    python bench/stress_edits.py [--updates 1000] [--window 0.02]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from edit_coalescer import EmbedEditCoalescer, MAX_PUBLISH_RETRIES  # noqa: E402
+
+MSG_ID = 1
+
+
+class FakeMessage:
+    """An event whose rendered state is `version`, and the message it's published to."""
+
+    def __init__(self, failures: int = 0):
+        self.version = 0
+        self.failures = failures   # Publishes left to fail
+        self.published = []        # Versions that reached the message
+        self.attempts = 0
+
+    def render(self, msg_id: int) -> bytes:
+        return self.version.to_bytes(8, "big")
+
+    async def publish(self, msg_id: int):
+        self.attempts += 1
+        version = self.version
+        await asyncio.sleep(0)     # The REST call
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("503 Service Unavailable")
+        self.published.append(version)
+
+
+async def settle(editor: EmbedEditCoalescer, window: float):
+    while editor._tasks:
+        await asyncio.sleep(window)
+
+
+async def burst(updates: int, window: float):
+    message = FakeMessage()
+    editor = EmbedEditCoalescer(message.render, message.publish, window=window)
+    for _ in range(updates):
+        message.version += 1
+        editor.request(MSG_ID)
+        await asyncio.sleep(0)
+    await settle(editor, window)
+    assert message.published[-1] == message.version, f"final state not published: {message.published}"
+    assert len(message.published) <= 3, f"burst wasn't coalesced: {len(message.published)} edits"
+    print(f"burst: {updates} updates -> {len(message.published)} edits, final state published")
+
+
+async def failed_edit(window: float):
+    message = FakeMessage(failures=1)
+    editor = EmbedEditCoalescer(message.render, message.publish, window=window)
+    message.version = 1
+    editor.request(MSG_ID)
+    await settle(editor, window)
+    assert message.published == [1], f"final state lost after a failed edit: {message.published}"
+    assert editor.failed == 1 and editor.edits == 1
+    print(f"failed edit: first publish raised, retry published the final state ({message.attempts} attempts)")
+
+
+async def outage(window: float):
+    message = FakeMessage(failures=10 ** 6)
+    editor = EmbedEditCoalescer(message.render, message.publish, window=window)
+    message.version = 1
+    editor.request(MSG_ID)
+    await settle(editor, window)
+    assert message.attempts == MAX_PUBLISH_RETRIES + 1, f"{message.attempts} attempts during an outage"
+
+    message.failures = 0
+    message.version = 2
+    editor.request(MSG_ID)
+    await settle(editor, window)
+    assert message.published == [2], f"didn't recover after the outage: {message.published}"
+    print(f"outage: gave up after {message.attempts - 1} attempts, next change published")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--updates", type=int, default=1000)
+    arg_parser.add_argument("--window", type=float, default=0.02, help="Coalescing window in seconds")
+    args = arg_parser.parse_args()
+    logging.disable(logging.ERROR)  # The retries log on purpose
+
+    asyncio.run(burst(args.updates, args.window))
+    asyncio.run(failed_edit(args.window))
+    asyncio.run(outage(args.window))
+    print("✅ The final state was published in every case.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Stress check for per-event serialization of reaction handling.
+
+Fires thousands of concurrent "reactions" at a single event. Each sign-up
+checks for an open slot, awaits (like the real handler's reads and writes
+do), and only then takes the slot, so two sign-ups can both see the same
+free spot. Run once without `EventActors` to show the race overfills the
+group or overwrites a player, then through `EventActors`, where the group
+must never hold more than 1 tank, 1 healer and 3 DPS. A second phase runs
+slow jobs for many events at once to show different events are not
+serialized behind each other.
+
+    python bench/stress_reactions.py [--reactions 5000] [--events 200]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_actor import EventActors
+from events import ROLE_LIMITS, EventRecord, EventState, Role, holds_slot, open_slots, refresh_state, release_slot, is_full
+
+
+def empty_group() -> EventRecord:
+    return EventRecord(1, 1, 1, 0, "Ara-Kara", "+10", "Now", None, "", time.time() + 3600)
+
+
+def limit_violations(event: EventRecord) -> list:
+    members = [i for i in (event.tank_id, event.healer_id) if i] + event.dps_ids
+    problems = []
+    if len(event.dps_ids) > ROLE_LIMITS[Role.DPS]:
+        problems.append(f"DPS overfilled: {len(event.dps_ids)}")
+    if len(set(members)) != len(members):
+        problems.append("a member holds two slots")
+    if (event.state == EventState.FULL) != is_full(event):
+        problems.append("state out of sync with the roster")
+    return problems
+
+
+def take_slot(event: EventRecord, role: Role, user_id: int) -> bool:
+    """Writes the slot without re-checking it. Returns False if it overwrote another player."""
+    overwrote = False
+    if role == Role.DPS:
+        event.dps_ids.append(user_id)
+    elif role == Role.TANK:
+        overwrote = event.tank_id is not None
+        event.tank_id = user_id
+    else:
+        overwrote = event.healer_id is not None
+        event.healer_id = user_id
+    refresh_state(event)
+    return not overwrote
+
+
+async def reaction_storm(reactions: int, serialized: bool, seed: int) -> list:
+    """Runs the storm and returns every limit violation seen (empty if the slot limits held)."""
+    rng = random.Random(seed)
+    actors = EventActors()
+    event = empty_group()
+    violations = []
+
+    async def react(user_id: int, role: Role, remove: bool):
+        async def job():
+            if remove:
+                changed = release_slot(event, role, user_id)
+                await asyncio.sleep(0)  # Stand-in for the write-through
+                return changed
+            if role not in open_slots(event) or holds_slot(event, user_id):
+                return False
+            await asyncio.sleep(0)  # The real handler awaits between the check and the write
+            if not take_slot(event, role, user_id):
+                violations.append(f"{role.value} slot overwritten")
+            violations.extend(limit_violations(event))
+            return True
+
+        if serialized:
+            await actors.run(1, job)
+        else:
+            await job()
+
+    users = list(range(1, reactions // 4 + 2))
+    jobs = []
+    for _ in range(reactions):
+        role = rng.choice((Role.TANK, Role.HEALER, Role.DPS, Role.DPS))
+        jobs.append(react(rng.choice(users), role, remove=rng.random() < 0.2))
+
+    start = time.perf_counter()
+    await asyncio.gather(*jobs)
+    elapsed = time.perf_counter() - start
+
+    violations.extend(limit_violations(event))
+    assert len(actors) == 0, "mailbox left behind"
+    print(f"{'with' if serialized else 'without'} EventActors: {reactions} concurrent reactions on one event in "
+          f"{elapsed * 1000:.1f} ms ({reactions / elapsed:,.0f}/s), {len(violations)} limit violations; final group: "
+          f"tank={event.tank_id is not None} healer={event.healer_id is not None} dps={len(event.dps_ids)}")
+    return violations
+
+
+async def parallel_events(events: int, delay: float = 0.05):
+    actors = EventActors()
+
+    async def slow_job():
+        await asyncio.sleep(delay)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(actors.run(event_id, slow_job) for event_id in range(events)))
+    elapsed = time.perf_counter() - start
+    assert elapsed < delay * 5, f"events were serialized: {elapsed:.2f}s for {events} events"
+    print(f"{events} events with a {delay * 1000:.0f} ms job each finished in {elapsed * 1000:.1f} ms (run in parallel)")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--reactions", type=int, default=5000)
+    arg_parser.add_argument("--events", type=int, default=200)
+    arg_parser.add_argument("--seed", type=int, default=7)
+    args = arg_parser.parse_args()
+
+    unserialized = asyncio.run(reaction_storm(args.reactions, serialized=False, seed=args.seed))
+    assert unserialized, "the unserialized run didn't race; the check is too weak to prove anything"
+    serialized = asyncio.run(reaction_storm(args.reactions, serialized=True, seed=args.seed))
+    assert not serialized, f"slot limits broken through EventActors: {serialized[:5]}"
+    asyncio.run(parallel_events(args.events))
+    print(f"✅ Slot limits held with EventActors (and broke {len(unserialized)} times without).")
+
+
+if __name__ == "__main__":
+    main()
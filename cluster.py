@@ -0,0 +1,143 @@
+import argparse
+import asyncio
+import os
+import signal
+import sys
+import discord
+from dotenv import load_dotenv
+from state_backend import StateServer, SQLiteBackend
+from event_store import EVENT_DB_FILE
+
+# Runs the bot as several processes, each connecting a slice of the shards, so
+# gateway traffic is spread over CPU cores instead of one event loop. Events
+# and guild settings go through a shared state backend (see state_backend.py):
+# by default this launcher serves the SQLite database over loopback TCP and
+# every shard process talks to it.
+#
+#   python cluster.py --processes 4                   # shard count from Discord
+#   python cluster.py --processes 2 --shards 8
+#   python cluster.py --processes 2 --backend sqlite:events.db   # no state server
+#
+# Discord sends all of a guild's events (including interactions) to the shard
+# that owns it, so each process serves its own guilds; the shared backend lets
+# any process pick up any shard's events after a restart or re-split.
+
+IDENTIFY_INTERVAL_SECONDS = 5.0   # Discord allows `max_concurrency` shard logins per 5 seconds
+RESTART_DELAY_SECONDS = 5.0
+
+load_dotenv()
+TOKEN = os.getenv("DISCORD_BOT_TOKEN")
+
+
+async def recommended_shards() -> tuple:
+    """Asks Discord for the recommended shard count. Returns (shards, max_concurrency)."""
+    client = discord.Client(intents=discord.Intents.none())
+    async with client:
+        await client.login(TOKEN)  # REST only; no gateway connection
+        shards, _, session_start_limit = await client.http.get_bot_gateway()
+    return shards, session_start_limit.get("max_concurrency", 1)
+
+
+def split_shards(shard_count: int, processes: int) -> list:
+    """Spreads shard IDs over the processes as evenly as possible (contiguous runs)."""
+    processes = max(1, min(processes, shard_count))
+    base, extra = divmod(shard_count, processes)
+    groups, start = [], 0
+    for i in range(processes):
+        size = base + (1 if i < extra else 0)
+        groups.append(list(range(start, start + size)))
+        start += size
+    return groups
+
+
+async def run_shard_process(index: int, shard_ids: list, shard_count: int, backend_url: str,
+                            start_delay: float, stopping: asyncio.Event):
+    """Starts one shard process after `start_delay` and restarts it if it exits on its own."""
+    env = dict(os.environ, DD_SHARD_COUNT=str(shard_count),
+               DD_SHARD_IDS=",".join(map(str, shard_ids)), DD_STATE_BACKEND=backend_url)
+    if os.getenv("DD_METRICS_PORT"):
+        env["DD_METRICS_PORT"] = str(int(os.environ["DD_METRICS_PORT"]) + index)  # One endpoint per process
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "daddy.py")
+    try:
+        await asyncio.wait_for(stopping.wait(), timeout=start_delay)
+        return  # Stopped before this process was due to start
+    except asyncio.TimeoutError:
+        pass
+
+    while not stopping.is_set():
+        print(f"🟡 Starting process {index} with shards {shard_ids}...")
+        process = await asyncio.create_subprocess_exec(sys.executable, script, env=env)
+        waiter = asyncio.create_task(process.wait())
+        stopper = asyncio.create_task(stopping.wait())
+        await asyncio.wait({waiter, stopper}, return_when=asyncio.FIRST_COMPLETED)
+        stopper.cancel()
+
+        if stopping.is_set():
+            if process.returncode is None:
+                process.terminate()
+                try:
+                    await asyncio.wait_for(waiter, timeout=30)
+                except asyncio.TimeoutError:
+                    process.kill()
+                    await waiter
+            print(f"✅ Process {index} stopped.")
+            return
+
+        print(f"⚠️ Process {index} (shards {shard_ids}) exited with code {process.returncode}; "
+              f"restarting in {RESTART_DELAY_SECONDS:.0f}s")
+        try:
+            await asyncio.wait_for(stopping.wait(), timeout=RESTART_DELAY_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def main(processes: int, shard_count: int | None, backend_url: str | None, port: int):
+    max_concurrency = 1
+    if not shard_count:
+        shard_count, max_concurrency = await recommended_shards()
+        print(f"✅ Discord recommends {shard_count} shards (max concurrency {max_concurrency}).")
+    groups = split_shards(shard_count, processes)
+
+    server = None
+    if backend_url is None:
+        server = StateServer(SQLiteBackend(EVENT_DB_FILE), port=port)
+        await server.start()
+        backend_url = f"tcp://127.0.0.1:{server.port}"
+        print(f"✅ State server listening on {backend_url} ({EVENT_DB_FILE}).")
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stopping.set)
+        except NotImplementedError:
+            pass  # Windows: Ctrl+C raises KeyboardInterrupt instead
+
+    # Stagger logins so the processes don't all identify at once
+    delay, runners = 0.0, []
+    for index, shard_ids in enumerate(groups):
+        runners.append(run_shard_process(index, shard_ids, shard_count, backend_url, delay, stopping))
+        delay += IDENTIFY_INTERVAL_SECONDS * -(-len(shard_ids) // max_concurrency)
+
+    try:
+        await asyncio.gather(*runners)
+    finally:
+        if server is not None:
+            await server.stop()
+            print(f"✅ State server stopped after {server.requests} requests.")
+
+
+if __name__ == "__main__":
+    if not TOKEN:
+        print("❌ ERROR: DISCORD_BOT_TOKEN is missing! Check your .env file.")
+        exit()
+
+    arg_parser = argparse.ArgumentParser(description="Run the bot as several shard processes.")
+    arg_parser.add_argument("--processes", type=int, default=os.cpu_count() or 1,
+                            help="Number of shard processes (default: one per CPU core)")
+    arg_parser.add_argument("--shards", type=int, help="Total shard count (default: Discord's recommendation)")
+    arg_parser.add_argument("--backend", help="Shared state backend URL; default serves events.db over loopback TCP")
+    arg_parser.add_argument("--port", type=int, default=8765, help="Port for the state server")
+    args = arg_parser.parse_args()
+
+    asyncio.run(main(args.processes, args.shards, args.backend, args.port))
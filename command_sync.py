@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+
+import discord
+
+# ------------------ Hash-Gated Command Sync ------------------
+# Syncing slash commands is a rate-limited call, and `on_ready` fires again on
+# every reconnect. Instead of clearing and re-syncing each time, the command
+# tree is serialized, hashed and compared with the hash of the last successful
+# sync; Discord is only contacted when the definitions actually changed.
+
+COMMAND_HASH_FILE = ".command_sync.json"
+
+
+def tree_payload(tree, guild=None) -> list:
+    """The exact command payload Discord would receive for `tree`, sorted by name."""
+    commands = tree.get_commands(guild=guild)
+    return sorted((command.to_dict(tree) for command in commands), key=lambda c: (c.get("type", 1), c["name"]))
+
+
+def payload_hash(payload: list) -> str:
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def scope_key(application_id: int, guild_id: int | None = None) -> str:
+    return f"{application_id}:{'global' if guild_id is None else guild_id}"
+
+
+def load_hashes(path: str = COMMAND_HASH_FILE) -> dict:
+    try:
+        with open(path, "r") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_hash(key: str, digest: str, path: str = COMMAND_HASH_FILE):
+    hashes = load_hashes(path)
+    hashes[key] = digest
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as file:
+        json.dump(hashes, file, indent=4)
+    os.replace(tmp_path, path)
+
+
+async def sync_if_changed(bot, dev_guild_id: int | None = None) -> bool:
+    """Syncs the command tree only if it differs from the last sync. Returns True if it synced.
+
+    With `dev_guild_id` the global commands are copied to that guild and synced
+    there instead, which Discord applies instantly (handy for testing).
+    """
+    tree = bot.tree
+    guild = None
+    if dev_guild_id:
+        guild = discord.Object(id=dev_guild_id)
+        tree.copy_global_to(guild=guild)
+
+    payload = tree_payload(tree, guild=guild)
+    key = scope_key(bot.application_id, dev_guild_id)
+    digest = payload_hash(payload)
+    if load_hashes().get(key) == digest:
+        return False
+
+    await tree.sync(guild=guild)
+    save_hash(key, digest)
+    return True
+
+
+# ------------------ Plan / Diff ------------------
+
+def _normalize(value):
+    """Treats missing, None, False and empty collections alike so Discord's defaults don't show up as changes."""
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items() if v not in (None, False, [], {})}
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def _comparable(command: dict, fields) -> dict:
+    return _normalize({field: command.get(field) for field in fields})
+
+
+def plan(local: list, remote: list) -> dict:
+    """Compares local command payloads with what Discord has registered.
+
+    Returns {"create": [names], "update": [(name, changed fields)], "delete": [names], "unchanged": [names]}.
+    """
+    remote_by_name = {command["name"]: command for command in remote}
+    result = {"create": [], "update": [], "delete": [], "unchanged": []}
+
+    for command in local:
+        existing = remote_by_name.pop(command["name"], None)
+        if existing is None:
+            result["create"].append(command["name"])
+            continue
+        fields = [f for f in command if f not in ("contexts", "integration_types")]
+        local_view = _comparable(command, fields)
+        remote_view = _comparable(existing, fields)
+        changed = sorted(f for f in set(local_view) | set(remote_view) if local_view.get(f) != remote_view.get(f))
+        if changed:
+            result["update"].append((command["name"], changed))
+        else:
+            result["unchanged"].append(command["name"])
+
+    result["delete"] = sorted(remote_by_name)
+    return result
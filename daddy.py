@@ -1,11 +1,36 @@
 import discord
 import asyncio
+import functools
+import io
+import logging
 import os
+import time
+from collections import OrderedDict
+from typing import Literal
+from discord import app_commands
 from discord.ext import commands
 from discord.ui import View, Select, Modal, TextInput, Button
 from datetime import datetime, timedelta
-from dateutil import parser, tz
+from dateutil import tz
 from dotenv import load_dotenv
+from state_backend import make_backend, DEFAULT_BACKEND
+from scheduler import DeadlineScheduler
+from edit_coalescer import EmbedEditCoalescer
+from member_index import MemberIndex, MemberLookup, AMBIGUOUS
+from member_cache import MemberCache
+from role_index import RoleIndex
+from event_actor import EventActors
+from guild_config import GuildConfigStore
+from rest_scheduler import RestScheduler, HIGH, NORMAL, LOW
+from command_sync import sync_if_changed
+from supervisor import TaskSupervisor
+from metrics import Metrics
+from loop_monitor import LoopLagMonitor
+from structured_log import setup_logging
+from timezones import TimezoneStore, SERVER_TZ, DEFAULT_ZONE_NAME, canonical_zone, get_zone, parse_schedule, search_zones
+from event_index import EventIndex, key_level
+from matchmaking import Matchmaker, Ticket
+from events import EventRecord, EventState, Role, claim_slot, release_slot, open_slots, CLAIMED, ALREADY_ASSIGNED, SLOT_FULL
 
 # ------------------ Error Handling Utilities ------------------
 
@@ -23,27 +48,10 @@ async def send_error_embed(interaction: discord.Interaction, message: str):
         else:
             await interaction.response.send_message(embed=embed, ephemeral=True)
     except discord.HTTPException as e:
-        print(f"⚠️ Error sending embed: {e}")
+        log.warning("⚠️ Error sending embed: %s", e,
+                    extra={"guild_id": interaction.guild_id, "user_id": interaction.user.id})
 
 
-# ------------------ Load and Save Channel Data ------------------
-import json
-
-CHANNEL_FILE = "channels.json"
-
-def load_channels():
-    """Loads stored channel mappings from a JSON file."""
-    try:
-        with open(CHANNEL_FILE, "r") as file:
-            return json.load(file)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {}
-
-def save_channels():
-    """Saves the current `guild_channel_map` to a JSON file."""
-    with open(CHANNEL_FILE, "w") as file:
-        json.dump(guild_channel_map, file, indent=4)
-
 # ------------------ Load Environment Variables ------------------
 load_dotenv()
 TOKEN = os.getenv("DISCORD_BOT_TOKEN")
@@ -51,74 +59,449 @@ if not TOKEN:
     raise ValueError("Please set the DISCORD_BOT_TOKEN environment variable.")
 
 # ------------------ Global Data ------------------
-guild_channel_map = load_channels() or {}  # ✅ Ensures it always loads a dictionary
-active_events = {}      # Stores events keyed by the event message ID.
+log = logging.getLogger("dungeondaddy")  # Queued and written off-loop once `setup_logging` runs (see structured_log.py)
+guild_config = GuildConfigStore()  # Per-guild settings (bot channel, role pings), saved off-loop
+guild_config.load()
+active_events = {}      # Event message ID -> EventRecord (IDs only; members are resolved when rendering)
 EVENT_TIMEOUT_MINUTES = 60
-
-# ------------------ Simulated Timezone Storage ------------------
-creator_timezones = {
-    # Example: 123456789012345678: "America/Los_Angeles"
-}
+DEV_GUILD_ID = int(os.getenv("DEV_GUILD_ID", "0")) or None  # Sync commands to this guild only (instant, for testing)
+EMBED_EDIT_WINDOW_SECONDS = float(os.getenv("EMBED_EDIT_WINDOW_SECONDS", "1.5"))  # Min gap between embed edits per event
+EMBED_CACHE_SIZE = 256  # Recently built embeds kept for publishing; older ones are rebuilt from the record
+STATE_BACKEND = os.getenv("DD_STATE_BACKEND")  # Shared by shard processes, e.g. tcp://127.0.0.1:8765 (see cluster.py)
+event_store = make_backend(STATE_BACKEND or DEFAULT_BACKEND)  # Write-through persistence for `active_events`
+scheduler = DeadlineScheduler()  # Owns every timed action (expiry, ping deletion)
+member_cache = MemberCache(int(os.getenv("MEMBER_CACHE_SIZE", "5000")))  # Bounded LRU of members we've seen
+member_index = MemberIndex(get_member=member_cache.get, fetch_member=member_cache.fetch,
+                           remember=member_cache.remember)  # Name lookups for the role modal
+event_actors = EventActors()     # Serializes every mutation per event; events run in parallel
+rest = RestScheduler()           # Prioritized per-route queues for outbound Discord calls
+supervisor = TaskSupervisor()    # Starts background loops once and restarts them if they crash
+role_index = RoleIndex(guild_config.role_pings_for)  # Per-guild Tank/Healer/DPS roles to ping for open spots
+events_rehydrated = False   # `on_ready` fires again on reconnects; only rehydrate once
+metrics = Metrics()         # Handler latencies and REST counts, served in Prometheus format when enabled
+METRICS_PORT = int(os.getenv("DD_METRICS_PORT", "0")) or None  # e.g. 9108; unset = no endpoint
+METRICS_HOST = os.getenv("DD_METRICS_HOST", "127.0.0.1")
+loop_monitor = LoopLagMonitor(threshold=float(os.getenv("DD_STALL_THRESHOLD", "0.25")))  # Event loop lag and stall stacks
+user_timezones = TimezoneStore()  # Zones set with /timezone, read from the state backend attached in `setup_hook`
+event_index = EventIndex()  # Live events by guild, channel, creator, dungeon, key level and open role (for /groups)
+matchmaker = Matchmaker()   # Players waiting in /queue, per guild (in memory only; a restart empties the queue)
 
 # ------------------ Bot Setup ------------------
-intents = discord.Intents.all()
-bot = commands.Bot(command_prefix="!", intents=intents, reconnect=True)  # Ensures the bot reconnects
+# Lean mode only asks for the gateway events the bot actually handles and skips
+# downloading every guild's member list; members are resolved on demand instead.
+LEAN_INTENTS = os.getenv("DD_LEAN_INTENTS", "0") == "1"
+STARTUP_BEGAN = time.perf_counter()
+
+# Sharding: cluster.py starts one process per group of shards and passes them in.
+# Without these the bot runs every shard itself (one shard for small bots).
+SHARD_COUNT = int(os.getenv("DD_SHARD_COUNT", "0")) or None
+SHARD_IDS = [int(shard_id) for shard_id in os.getenv("DD_SHARD_IDS", "").split(",") if shard_id.strip()] or None
+shard_options = {"shard_count": SHARD_COUNT, "shard_ids": SHARD_IDS} if SHARD_COUNT else {}
+
+class DungeonDaddyBot(commands.AutoShardedBot):
+    """Bot whose background tasks follow its lifecycle: started once, stopped on close."""
+
+    async def setup_hook(self):
+        # Runs once before connecting, unlike `on_ready` which fires again on every reconnect
+        await event_store.open()
+        await user_timezones.attach(event_store)
+        if STATE_BACKEND:
+            # Guild settings live in the shared backend too, so every process sees the same config
+            await guild_config.attach(event_store)
+        supervisor.start("scheduler", scheduler.run)
+        supervisor.start("loop-lag", loop_monitor.run)
+        if METRICS_PORT:
+            await metrics.serve(METRICS_HOST, METRICS_PORT)
+            log.info("✅ Metrics at http://%s:%s/metrics", METRICS_HOST, METRICS_PORT)
+        supervisor.start_periodic("heartbeat", keep_alive, interval=HEARTBEAT_SECONDS, wait=self.wait_until_ready)
+        if LEAN_INTENTS:
+            self.dispatch_uncached_member_updates()
+
+    def dispatch_uncached_member_updates(self):
+        """Dispatches `raw_member_update` for GUILD_MEMBER_UPDATEs about members discord.py hasn't cached.
+
+        discord.py only dispatches `member_update` for cached members, and lean mode caches none, so
+        renames would never reach the name index. The member is built from the payload, as discord.py does.
+        """
+        state = self._connection
+        parse = state.parsers["GUILD_MEMBER_UPDATE"]
+
+        def parse_guild_member_update(data):
+            guild = state._get_guild(int(data["guild_id"]))
+            if guild is not None and guild.get_member(int(data["user"]["id"])) is None:
+                self.dispatch("raw_member_update", discord.Member(data=data, guild=guild, state=state))
+            parse(data)
+
+        state.parsers["GUILD_MEMBER_UPDATE"] = parse_guild_member_update
+
+    async def close(self):
+        await supervisor.shutdown()
+        await metrics.stop()
+        await guild_config.flush()
+        await super().close()
+        await event_store.close()
+
+if LEAN_INTENTS:
+    intents = discord.Intents.none()
+    intents.guilds = True           # Channels, roles and role updates
+    intents.guild_reactions = True  # Reaction sign-ups
+    intents.members = True          # Member queries and join/leave/rename events for the name index
+    bot = DungeonDaddyBot(
+        command_prefix="!",
+        intents=intents,
+        reconnect=True,
+        chunk_guilds_at_startup=False,
+        member_cache_flags=discord.MemberCacheFlags.none(),
+        http_trace=metrics.http_trace(),
+        **shard_options
+    )
+else:
+    intents = discord.Intents.all()
+    bot = DungeonDaddyBot(command_prefix="!", intents=intents, reconnect=True,  # Ensures the bot reconnects
+                          http_trace=metrics.http_trace(), **shard_options)
+
+def owns_guild(guild_id: int) -> bool:
+    """True if one of this process's shards receives the guild's events."""
+    if bot.shard_ids is None:
+        return True
+    return (guild_id >> 22) % bot.shard_count in bot.shard_ids
+
+# ------------------ Event Persistence ------------------
+async def persist_event(msg_id: int):
+    """Writes the current state of an event through to the event store."""
+    event = active_events.get(msg_id)
+    if not event:
+        return
+    try:
+        await event_store.save(event.to_row())
+    except Exception as e:
+        log.warning("⚠️ Failed to persist event: %s", e, extra={"event_id": msg_id, "guild_id": event.guild_id})
+
+async def forget_event(msg_id: int):
+    """Removes an event from the event store."""
+    try:
+        await event_store.delete(msg_id)
+    except Exception as e:
+        log.warning("⚠️ Failed to remove stored event: %s", e, extra={"event_id": msg_id})
+
+async def fill_creator_names(events: list):
+    """Stores the creator's name and avatar on events saved without them (one-off, for older databases).
+
+    Creators are looked up with one gateway query per 100 members per guild; creators no longer in the
+    guild are fetched as users. Events whose creator can't be found keep the generic title.
+    """
+    creators_by_guild = {}
+    for event in events:
+        creators_by_guild.setdefault(event.guild_id, set()).add(event.creator_id)
+    found = {}
+    for guild_id, creator_ids in creators_by_guild.items():
+        members = await member_cache.fetch_many(bot.get_guild(guild_id), creator_ids)
+        found.update(((guild_id, user_id), member) for user_id, member in members.items())
+
+    users = {}
+    for event in events:
+        creator = found.get((event.guild_id, event.creator_id)) or users.get(event.creator_id)
+        if creator is None:
+            try:
+                creator = users[event.creator_id] = await bot.fetch_user(event.creator_id)
+            except discord.HTTPException:
+                continue  # Deleted account
+        event.creator_name, event.creator_avatar = creator.display_name, creator.display_avatar.url
+    await event_store.save_many([event.to_row() for event in events if event.creator_name])
+
+async def rehydrate_events():
+    """Loads every stored event back into `active_events` in one pass after a restart."""
+    await event_store.open()
+    rows = await event_store.load_all()
+    stale = []
+
+    unnamed = []   # Events stored before creator names were kept
+    for row in rows:
+        if not owns_guild(row["guild_id"]):
+            continue  # Served by another shard process
+        if bot.get_guild(row["guild_id"]) is None:
+            stale.append(row["message_id"])  # Bot left the guild
+            continue
+
+        event = EventRecord.from_row(row)
+        active_events[event.message_id] = event
+        event_index.update(event)
+        if not event.creator_name:
+            unnamed.append(event)
+
+        # Re-attach the edit/delete controls to the existing message
+        bot.add_view(EventEditOptionsView(event.message_id, event.creator_id), message_id=event.message_id)
+
+        # Re-arm timers; anything already overdue fires straight away
+        schedule_event_expiry(event.message_id)
+        if event.role_pings_message_id:
+            pings_sent = discord.utils.snowflake_time(event.role_pings_message_id).timestamp()
+            schedule_role_pings_deletion(event.message_id, pings_sent + ROLE_PINGS_TTL_SECONDS)
+
+    if unnamed:
+        await fill_creator_names(unnamed)
+
+    await event_store.delete_many(stale)
+    log.info("✅ Rehydrated %d events (%d stale events dropped).", len(active_events), len(stale))
 
 # ------------------ Heartbeat Task ------------------
+HEARTBEAT_SECONDS = 300  # ✅ Still checks every 5 minutes
+
 async def keep_alive():
-    """Sends a small heartbeat to keep the bot's connection active."""
-    await bot.wait_until_ready()
-    while not bot.is_closed():
+    """Logs a small heartbeat with the bot's latency and queue health."""
+    latency = bot.latency  # ✅ Get bot latency without API call
+    stats = scheduler.stats()
+    log.info("Heartbeat sent: Bot is alive! 💓 (Latency: %.2fs, timers queued: %d, max timer lateness: %.2fs, "
+             "REST calls queued: %d, max loop lag: %.2fs, loop stalls: %d)",
+             latency, stats["queued"], stats["max_lateness"], rest.queued(), loop_monitor.take_window(),
+             loop_monitor.stall_count)
+    for route, route_stats in rest.busiest():
+        log.info("   ↳ REST route %s: %d queued, avg wait %.2fs, max wait %.2fs",
+                 route, route_stats["queued"], route_stats["avg_wait"], route_stats["max_wait"])
+    for name, task_stats in supervisor.stats().items():
+        if task_stats["last_error"]:
+            log.info("   ↳ task '%s': %d runs, %d crashes, last error: %s",
+                     name, task_stats["runs"], task_stats["crashes"], task_stats["last_error"])
+
+# ------------------ Metrics Gauges ------------------
+# Read when /metrics is scraped, so they cost nothing in between.
+metrics.gauge("dd_active_events", "Events currently open.", lambda: len(active_events))
+metrics.gauge("dd_gateway_latency_seconds", "Heartbeat latency to the Discord gateway.", lambda: bot.latency)
+metrics.gauge("dd_last_sweep_deleted_messages", "Messages deleted by the last cleanup sweep.", lambda: last_sweep["deleted"])
+metrics.gauge("dd_rest_queued_calls", "Outbound Discord calls waiting in the REST scheduler.", lambda: rest.queued())
+def rest_kind_stat(field: str):
+    return lambda: {(kind,): kind_stats[field] for kind, kind_stats in rest.stats().items()}
+
+metrics.labelled_gauge("dd_rest_route_queued_calls", "Outbound Discord calls waiting, per REST route kind.",
+                       ("kind",), rest_kind_stat("queued"))
+metrics.labelled_gauge("dd_rest_route_wait_avg_seconds", "Average time a call waited in a REST route of this kind.",
+                       ("kind",), rest_kind_stat("avg_wait"))
+metrics.labelled_gauge("dd_rest_route_wait_max_seconds", "Longest time a call waited in a REST route of this kind.",
+                       ("kind",), rest_kind_stat("max_wait"))
+metrics.gauge("dd_rest_tracked_routes", "REST routes with stats in memory (idle ones are dropped).",
+              lambda: rest.tracked_routes())
+metrics.gauge("dd_loop_lag_seconds", "How late the event loop lag probe last woke up.", lambda: loop_monitor.last_lag)
+metrics.gauge("dd_loop_stalls", "Event loop stalls over the threshold since start.", lambda: loop_monitor.stall_count)
+metrics.gauge("dd_timers_queued", "Timed actions (expiry, ping deletion) waiting in the scheduler.",
+              lambda: scheduler.stats()["queued"])
+
+# ------------------ Event Mutations ------------------
+# All changes to an event go through `event_actors`, which runs them one at a
+# time per event (see event_actor.py). Jobs must not submit to the same event again.
+
+RENDERED_FIELDS = {"creator_id", "creator_name", "creator_avatar", "dungeon", "difficulty", "scheduled", "starts_at", "comment"}
+
+def bump_version(msg_id: int):
+    """Marks an event's rendered state as changed, re-indexes it and queues an embed refresh."""
+    event = active_events[msg_id]
+    event.version += 1
+    event_index.update(event)  # Every join, leave and edit passes through here
+    request_embed_update(msg_id)
+
+async def update_event(msg_id: int, changes: dict) -> bool:
+    """Applies field changes to an event in its actor. Returns False if the event is gone."""
+    async def apply():
+        event = active_events.get(msg_id)
+        if not event:
+            return False
+        changed = {field: value for field, value in changes.items() if getattr(event, field) != value}
+        if not changed:
+            return True  # No-op (e.g. the same dungeon picked again): no render, no write, no edit
+        for field, value in changed.items():
+            setattr(event, field, value)
+        if "expires_at" in changed:
+            schedule_event_expiry(msg_id)
+        if RENDERED_FIELDS & changed.keys():
+            bump_version(msg_id)
+        await persist_event(msg_id)
+        return True
+
+    return await event_actors.run(msg_id, apply)
+
+async def remove_event(msg_id: int, keep_row: bool = False) -> EventRecord | None:
+    """Drops an event from memory, its timers and the event store. Run inside the event's actor.
+
+    With `keep_row` the stored row stays until the caller has deleted the event's messages.
+    """
+    event = active_events.pop(msg_id, None)
+    if event:
+        event.state = EventState.CLOSED
+        event_index.remove(msg_id)
+        cancel_event_timers(msg_id)
+        embed_editor.forget(msg_id)
+        recent_embeds.pop(msg_id, None)
+        if not keep_row:
+            await forget_event(msg_id)
+    return event
+
+async def delete_event_messages(event: EventRecord, priority: int = LOW) -> bool:
+    """Deletes a removed event's message and its role pings message. Returns False if a delete failed."""
+    route = message_route(event.channel_id)
+    deleted = True
+    try:
+        # Delete the event message
+        await rest.submit(route, event_message(event.message_id, event.channel_id).delete, priority=priority)
+    except discord.NotFound:
+        pass  # Message already deleted
+    except discord.HTTPException as e:
+        deleted = False
+        log.warning("Failed to delete event message: %s", e,
+                    extra={"guild_id": event.guild_id, "channel_id": event.channel_id, "event_id": event.message_id})
+
+    # Delete the role pings message if it exists
+    if event.role_pings_message_id:
         try:
-            latency = bot.latency  # ✅ Get bot latency without API call
-            print(f"Heartbeat sent: Bot is alive! 💓 (Latency: {latency:.2f}s)")
-        except Exception as e:
-            print(f"Heartbeat error: {e}")
-        await asyncio.sleep(300)  # ✅ Still checks every 5 minutes
+            await rest.submit(route, event_message(event.role_pings_message_id, event.channel_id).delete, priority=LOW)
+        except discord.NotFound:
+            pass  # Message already deleted
+        except discord.HTTPException as e:
+            deleted = False
+            log.warning("Failed to delete role pings message: %s", e,
+                        extra={"guild_id": event.guild_id, "channel_id": event.channel_id, "event_id": event.message_id})
+    return deleted
+
+# ------------------ Timed Actions ------------------
+ROLE_PINGS_TTL_SECONDS = 900  # Open-spot pings are deleted after 15 minutes
+TEARDOWN_BATCH_SECONDS = 5    # Expired events are collected for this long, then deleted together
+TEARDOWN_CONCURRENCY = 4      # Channels torn down at the same time
+BULK_DELETE_MAX_AGE_DAYS = 14
+pending_teardown = {}         # channel_id -> {message ID: ID of the event it belongs to}, waiting for the next sweep
+last_sweep = {"deleted": 0, "failed": 0, "channels": 0, "duration": 0.0}
+
+def schedule_event_expiry(msg_id: int):
+    """(Re)arms the expiry timer for an event from its current `expires_at`."""
+    event = active_events.get(msg_id)
+    if event:
+        scheduler.schedule(("expire", msg_id), event.expires_at, expire_event, msg_id)
+
+def schedule_role_pings_deletion(msg_id: int, when: float):
+    """Arms the timer that deletes an event's open-spot ping message."""
+    scheduler.schedule(("pings", msg_id), when, delete_role_pings_message, msg_id)
+
+def cancel_event_timers(msg_id: int):
+    scheduler.cancel(("expire", msg_id))
+    scheduler.cancel(("pings", msg_id))
+
+async def delete_role_pings_message(msg_id: int):
+    """Deletes the open-spot ping message for an event, if it's still around."""
+    async def detach():
+        event = active_events.get(msg_id)
+        if not event or not event.role_pings_message_id:
+            return None
+        role_pings_message = event_message(event.role_pings_message_id, event.channel_id)
+        event.role_pings_message_id = None
+        await persist_event(msg_id)
+        return role_pings_message
+
+    role_pings_message = await event_actors.run(msg_id, detach)
+    if role_pings_message:
+        try:
+            await rest.submit(message_route(role_pings_message.channel.id), role_pings_message.delete, priority=LOW)
+        except discord.NotFound:
+            pass  # Message already deleted
+
+async def expire_event(msg_id: int):
+    """Removes an event once its `expires_at` deadline has passed and queues its messages for teardown.
+
+    The stored row is only deleted once the sweep has removed the messages, so if the bot stops in
+    between, the event is loaded again on startup, expires straight away and is torn down then.
+    """
+    event = await event_actors.run(msg_id, remove_event, msg_id, True)
+    if not event:
+        return
+
+    pending = pending_teardown.setdefault(event.channel_id, {})
+    pending[msg_id] = msg_id
+    if event.role_pings_message_id:
+        pending[event.role_pings_message_id] = msg_id
+
+    # Expiries landing close together are torn down in one sweep
+    if scheduler.deadline(("sweep",)) is None:
+        scheduler.schedule(("sweep",), time.time() + TEARDOWN_BATCH_SECONDS, cleanup_expired_events)
 
-# ------------------ Background Cleanup Task ------------------
 async def cleanup_expired_events():
-    """Removes expired events every 5 minutes to prevent memory overflow."""
-    while True:
-        await asyncio.sleep(300)  # Run every 5 minutes
-        now = datetime.now(tz.tzoffset("GMT+1", 3600))
-        expired_events = [msg_id for msg_id, data in active_events.items() if now > data["expires_at"]]
-        
-        for msg_id in expired_events:
-            event_data = active_events.pop(msg_id, None)  # Remove from memory
-            if event_data:
-                guild = bot.get_guild(event_data["creator"].guild.id)
-                if guild:
-                    channel = guild.get_channel(event_data["channel_id"])  # Use the stored channel ID
-                    if channel:
-                        try:
-                            # Delete the event message
-                            msg = await channel.fetch_message(msg_id)
-                            await msg.delete()
-
-                            # Delete the role pings message if it exists
-                            role_pings_message = event_data.get("role_pings_message")
-                            if role_pings_message:
-                                try:
-                                    await role_pings_message.delete()
-                                except discord.NotFound:
-                                    pass  # Message already deleted
-                        except discord.NotFound:
-                            pass  # Message already deleted
-                        except discord.HTTPException as e:
-                            print(f"Failed to delete expired event message: {e}")
-        print("Expired events cleaned up!")
+    """Deletes every queued expired message, grouped per channel, using bulk deletes where possible."""
+    batch = dict(pending_teardown)
+    pending_teardown.clear()
+    if not batch:
+        return
+
+    started = time.perf_counter()
+    limiter = asyncio.Semaphore(TEARDOWN_CONCURRENCY)
+    results = await asyncio.gather(*(teardown_channel(channel_id, set(messages), limiter)
+                                     for channel_id, messages in batch.items()))
+
+    # Rows of events whose messages all went stay stored only if a delete failed, so a restart retries them
+    done, kept = set(), set()
+    for (channel_id, messages), (_, _, failed_ids) in zip(batch.items(), results):
+        for message_id, event_id in messages.items():
+            (kept if message_id in failed_ids else done).add(event_id)
+    try:
+        await event_store.delete_many(list(done - kept))
+    except Exception as e:
+        log.warning("⚠️ Failed to remove stored events after teardown: %s", e)
+
+    last_sweep["deleted"] = sum(deleted for deleted, _, _ in results)
+    last_sweep["failed"] = sum(failed for _, failed, _ in results)
+    last_sweep["channels"] = len(batch)
+    last_sweep["duration"] = time.perf_counter() - started
+    metrics.sweep_seconds.observe((), last_sweep["duration"])
+    log.info("Expired events cleaned up! Deleted %d messages in %d channels in %.2fs (%d failed calls).",
+             last_sweep["deleted"], last_sweep["channels"], last_sweep["duration"], last_sweep["failed"])
+
+async def teardown_channel(channel_id: int, msg_ids: set, limiter: asyncio.Semaphore) -> tuple:
+    """Deletes messages from one channel. Returns (messages deleted, failed calls, IDs that couldn't be deleted)."""
+    channel = bot.get_channel(channel_id)
+    if channel is None:
+        return 0, 0, set()  # Channel is gone, and its messages with it
+
+    # Discord only bulk-deletes messages younger than 14 days
+    cutoff = datetime.now(tz.UTC) - timedelta(days=BULK_DELETE_MAX_AGE_DAYS)
+    recent = sorted(m for m in msg_ids if discord.utils.snowflake_time(m) > cutoff)
+    old = sorted(m for m in msg_ids if discord.utils.snowflake_time(m) <= cutoff)
+    route = message_route(channel_id)
+    deleted = failed = 0
+    failed_ids = set()
+
+    async with limiter:
+        for i in range(0, len(recent), 100):
+            chunk = recent[i:i + 100]
+            if len(chunk) == 1:
+                old.extend(chunk)  # Bulk delete needs at least two messages
+                continue
+            try:
+                await rest.submit(route, channel.delete_messages, [discord.Object(id=m) for m in chunk], priority=LOW)
+                deleted += len(chunk)
+            except discord.HTTPException as e:
+                failed += 1
+                log.warning("Bulk delete failed, falling back to single deletes: %s", e, extra={"channel_id": channel_id})
+                old.extend(chunk)
+
+        for msg_id in old:
+            try:
+                await rest.submit(route, event_message(msg_id, channel_id).delete, priority=LOW)
+                deleted += 1
+            except discord.NotFound:
+                pass  # Message already deleted
+            except discord.HTTPException as e:
+                failed += 1
+                failed_ids.add(msg_id)
+                log.warning("Failed to delete expired event message: %s", e,
+                            extra={"channel_id": channel_id, "event_id": msg_id})
+
+    return deleted, failed, failed_ids
 
 # ------------------ Slash Command: /dd ------------------
 @bot.tree.command(name="dd", description="Creates a new dungeon group request.")
+@metrics.timed("command", "dd")
 async def dd(interaction: discord.Interaction):
     """Creates a dungeon event but only in the selected bot channel (if restricted)."""
 
     guild_id = interaction.guild.id if interaction.guild else None
 
     # ✅ If a channel restriction exists, enforce it
-    if guild_id in guild_channel_map:
-        allowed_channel_id = guild_channel_map[guild_id]
+    allowed_channel_id = guild_config.channel_for(guild_id)
+    if allowed_channel_id:
         if interaction.channel_id != allowed_channel_id:
             await send_error_embed(interaction, f"This command can only be used in <#{allowed_channel_id}>.")
             return
@@ -128,6 +511,7 @@ async def dd(interaction: discord.Interaction):
 
 # ------------------ Slash Command: /setchannel ------------------
 @bot.tree.command(name="setchannel", description="Set the bot's designated channel for this server. (ADMIN ONLY)")
+@metrics.timed("command", "setchannel")
 async def setchannel(interaction: discord.Interaction):
     """Slash command to set the bot's designated channel for use in the server."""
     
@@ -160,6 +544,7 @@ async def setchannel(interaction: discord.Interaction):
 
 # ------------------ Slash Command: /removechannel ------------------
 @bot.tree.command(name="removechannel", description="Removes the designated bot channel restriction. (ADMIN ONLY)")
+@metrics.timed("command", "removechannel")
 async def removechannel(interaction: discord.Interaction):
     """Allows admins to remove the bot's channel restriction so commands can be used anywhere."""
     
@@ -174,9 +559,8 @@ async def removechannel(interaction: discord.Interaction):
         return
 
     # Check if a restriction exists
-    if guild_id in guild_channel_map:
-        del guild_channel_map[guild_id]  # Remove the restriction
-        await save_channels()  # Save changes to the JSON file
+    if guild_config.channel_for(guild_id):
+        guild_config.set_channel(guild_id, None)  # Remove the restriction (saved in the background)
         
         await interaction.response.send_message(
             "✅ The bot’s channel restriction has been removed. Commands can now be used in any channel.", 
@@ -185,27 +569,301 @@ async def removechannel(interaction: discord.Interaction):
     else:
         await send_error_embed(interaction, "There is no channel restriction set for this server.")
 
+# ------------------ Slash Command: /setroleping ------------------
+@bot.tree.command(name="setroleping", description="Choose which role is pinged for an open spot. (ADMIN ONLY)")
+@app_commands.describe(slot="The group spot to configure", role="Role to ping (leave empty to match by name again)")
+@metrics.timed("command", "setroleping")
+async def setroleping(interaction: discord.Interaction, slot: Literal["Tank", "Healer", "DPS"], role: discord.Role | None = None):
+    """Maps an open-spot ping to a custom role for this server."""
+    if not interaction.guild:
+        await send_error_embed(interaction, "This command can only be used in a server.")
+        return
+
+    if not interaction.user.guild_permissions.administrator:
+        await send_error_embed(interaction, "You must be an admin to use this command.")
+        return
+
+    guild_config.set_role_ping(interaction.guild.id, slot, role.id if role else None)
+    role_index.invalidate(interaction.guild.id)
+
+    if role:
+        await interaction.response.send_message(f"✅ Open {slot} spots will now ping {role.mention}.", ephemeral=True)
+    else:
+        await interaction.response.send_message(f"✅ Open {slot} spots will ping the role named `{slot}` again.", ephemeral=True)
+
+# ------------------ Slash Command: /timezone ------------------
+TIMEZONE_UNAVAILABLE = "Your timezone settings can't be reached right now. Please try again later."
+
+def log_timezone_store_error(interaction: discord.Interaction, error: Exception):
+    log.warning("⚠️ Timezone store failed: %s", error, extra={"guild_id": interaction.guild_id, "user_id": interaction.user.id})
+
+async def zone_for_interaction(interaction: discord.Interaction):
+    """The caller's timezone, or None (after logging and telling them to retry) if the store failed."""
+    try:
+        return await user_timezones.zone_for(interaction.user.id)
+    except Exception as e:
+        log_timezone_store_error(interaction, e)
+        await send_error_embed(interaction, TIMEZONE_UNAVAILABLE)
+        return None
+
+@bot.tree.command(name="timezone", description="Set the timezone the start times you type are read in.")
+@app_commands.describe(zone="Your timezone, e.g. Europe/Berlin (leave empty to see the current one)")
+@metrics.timed("command", "timezone")
+async def timezone(interaction: discord.Interaction, zone: str | None = None):
+    """Stores the caller's timezone, used to read the start times they type."""
+    if zone is None:
+        try:
+            current = await user_timezones.name_for(interaction.user.id)
+        except Exception as e:
+            log_timezone_store_error(interaction, e)
+            await send_error_embed(interaction, TIMEZONE_UNAVAILABLE)
+            return
+        await interaction.response.send_message(
+            f"🕒 Your timezone is `{current}`." if current
+            else f"🕒 You haven't set a timezone, so times you enter are read as {DEFAULT_ZONE_NAME}.",
+            ephemeral=True)
+        return
+
+    name = canonical_zone(zone)
+    if not name:
+        await send_error_embed(interaction, f"Unknown timezone `{zone}`. Pick one from the list, e.g. `Europe/Berlin`.")
+        return
+
+    try:
+        await user_timezones.set(interaction.user.id, name)
+    except Exception as e:
+        log_timezone_store_error(interaction, e)
+        await send_error_embed(interaction, TIMEZONE_UNAVAILABLE)
+        return
+    local_now = datetime.now(get_zone(name)).strftime("%H:%M")
+    await interaction.response.send_message(f"✅ Timezone set to `{name}` (it's {local_now} there now).", ephemeral=True)
+
+@timezone.autocomplete("zone")
+async def timezone_autocomplete(interaction: discord.Interaction, current: str) -> list:
+    return [app_commands.Choice(name=name, value=name) for name in search_zones(current)]
+
+# ------------------ Slash Command: /groups ------------------
+MAX_KEY_LEVEL = 20
+GROUPS_SHOWN = 10
+
+@bot.tree.command(name="groups", description="List this server's open dungeon groups.")
+@app_commands.describe(dungeon="Only this dungeon", role="Only groups with this spot open",
+                       min_level="Lowest key level", max_level="Highest key level")
+@metrics.timed("command", "groups")
+async def groups(interaction: discord.Interaction, dungeon: str | None = None,
+                 role: Literal["Tank", "Healer", "DPS"] | None = None,
+                 min_level: app_commands.Range[int, 0, MAX_KEY_LEVEL] | None = None,
+                 max_level: app_commands.Range[int, 0, MAX_KEY_LEVEL] | None = None):
+    """Answers from the event indexes, so the cost follows the number of matches, not of open groups."""
+    if not interaction.guild:
+        await send_error_embed(interaction, "This command can only be used in a server.")
+        return
+
+    levels = None
+    if min_level is not None or max_level is not None:
+        levels = range(min_level or 0, (MAX_KEY_LEVEL if max_level is None else max_level) + 1)
+    matches = event_index.search(interaction.guild.id, joinable=True, dungeon=dungeon, levels=levels,
+                                 role=Role(role) if role else None)
+    found = sorted((active_events[msg_id] for msg_id in matches if msg_id in active_events),
+                   key=lambda event: (event.starts_at or 0, event.message_id))
+
+    if not found:
+        await interaction.response.send_message("No open groups match that. Start one with `/dd`!", ephemeral=True)
+        return
+
+    lines = []
+    for event in found[:GROUPS_SHOWN]:
+        level = key_level(event.difficulty)
+        spots = ", ".join(slot.value for slot in open_slots(event))
+        link = f"https://discord.com/channels/{event.guild_id}/{event.channel_id}/{event.message_id}"
+        lines.append(f"**[{event.dungeon} {'+' + str(level) if level is not None else event.difficulty}]({link})** "
+                     f"· open: {spots} · {format_schedule(event)} · by <@{event.creator_id}>")
+    embed = discord.Embed(title=f"🔎 Open groups ({len(found)})", description="\n".join(lines), color=discord.Color.orange())
+    if len(found) > GROUPS_SHOWN:
+        embed.set_footer(text=f"Showing the first {GROUPS_SHOWN}. Narrow it down with the filters.")
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+@groups.autocomplete("dungeon")
+async def groups_dungeon_autocomplete(interaction: discord.Interaction, current: str) -> list:
+    current = current.casefold()
+    return [app_commands.Choice(name=d, value=d) for d in DUNGEONS if current in d.casefold()][:25]
+
+# ------------------ Slash Commands: /queue, /leavequeue ------------------
+# Matching happens in matchmaking.py; these only validate input, keep the
+# queue timers and post a completed group through `finalize_event`.
+QUEUE_TIMEOUT_MINUTES = 30
+
+def parse_dungeons(text: str | None) -> tuple:
+    """Reads a comma-separated dungeon list (any case). Returns (frozenset of names or None for any, unknown names)."""
+    by_name = {d.casefold(): d for d in DUNGEONS}
+    wanted, unknown = set(), []
+    for name in (text or "").split(","):
+        name = name.strip()
+        if not name:
+            continue
+        dungeon = by_name.get(name.casefold())
+        if dungeon:
+            wanted.add(dungeon)
+        else:
+            unknown.append(name)
+    if "LFG - ANY" in wanted:
+        return None, unknown
+    return frozenset(wanted) or None, unknown
+
+async def expire_queue_ticket(guild_id: int, user_id: int):
+    """Takes a player out of the queue after QUEUE_TIMEOUT_MINUTES without a group."""
+    if matchmaker.dequeue(guild_id, user_id):
+        log.info("⌛ Queue ticket expired", extra={"guild_id": guild_id, "user_id": user_id})
+
+def schedule_queue_timeout(ticket: Ticket):
+    scheduler.schedule(("queue", ticket.guild_id, ticket.user_id), ticket.queued_at + QUEUE_TIMEOUT_MINUTES * 60,
+                       expire_queue_ticket, ticket.guild_id, ticket.user_id)
+
+@bot.tree.command(name="queue", description="Queue for a group; one is posted as soon as a Tank, a Healer and 3 DPS match.")
+@app_commands.describe(role="The role you'll play", min_level="Lowest key level you'll run",
+                       max_level="Highest key level you'll run",
+                       dungeons="Dungeons you want, comma-separated (leave empty for any)")
+@metrics.timed("command", "queue")
+async def queue(interaction: discord.Interaction, role: Literal["Tank", "Healer", "DPS"],
+                min_level: app_commands.Range[int, 0, MAX_KEY_LEVEL] = 0,
+                max_level: app_commands.Range[int, 0, MAX_KEY_LEVEL] = MAX_KEY_LEVEL,
+                dungeons: str | None = None):
+    """Queues the caller; if that completes a group, it's created at once with the caller as its creator."""
+    if not interaction.guild:
+        await send_error_embed(interaction, "This command can only be used in a server.")
+        return
+
+    guild_id, user_id = interaction.guild.id, interaction.user.id
+    allowed_channel_id = guild_config.channel_for(guild_id)
+    if allowed_channel_id and interaction.channel_id != allowed_channel_id:
+        await send_error_embed(interaction, f"This command can only be used in <#{allowed_channel_id}>.")
+        return
+
+    min_level, max_level = min(min_level, max_level), max(min_level, max_level)
+    wanted, unknown = parse_dungeons(dungeons)
+    if unknown:
+        await send_error_embed(interaction, f"Unknown dungeon: {', '.join(unknown)}. Choose from: {', '.join(DUNGEONS[1:])}.")
+        return
+
+    ticket = Ticket(user_id, guild_id, Role(role), min_level, max_level, wanted)
+    match = matchmaker.enqueue(ticket)
+    if match is None:
+        schedule_queue_timeout(ticket)
+        waiting = matchmaker.queue(guild_id).waiting
+        await interaction.response.send_message(
+            f"⏳ Queued as **{role}** for keys {min_level}-{max_level}, "
+            f"{', '.join(sorted(wanted)) if wanted else 'any dungeon'}.\n"
+            f"Waiting: 🛡️ {waiting[Role.TANK]} · 💚 {waiting[Role.HEALER]} · ⚔️ {waiting[Role.DPS]}. "
+            f"You'll be pinged when a group forms (or use `/leavequeue`); the queue drops you after {QUEUE_TIMEOUT_MINUTES} minutes.",
+            ephemeral=True)
+        return
+
+    for ticket in match.tickets():
+        scheduler.cancel(("queue", guild_id, ticket.user_id))
+    log.info("🤝 Queue matched a +%d group", match.level, extra={"guild_id": guild_id, "user_id": user_id})
+    assigned_roles = {
+        "Tank": discord.Object(id=match.tank.user_id),
+        "Healer": discord.Object(id=match.healer.user_id),
+        "DPS": [discord.Object(id=ticket.user_id) for ticket in match.dps],
+    }
+    mentions = " ".join(f"<@{ticket.user_id}>" for ticket in match.tickets())
+    posted_before = set(event_index.ids("creator", user_id))
+    try:
+        await finalize_event(interaction, interaction.user, match.dungeon or "LFG - ANY", str(match.level), "Now", None,
+                             "Matched by /queue", assigned_roles, content=f"🎉 Group found: {mentions}")
+    except Exception:
+        if event_index.ids("creator", user_id) - posted_before:
+            raise  # The group is up and tracked; only a later step (reactions, pings) failed
+        log.exception("❌ Couldn't post a matched group; putting its players back in the queue",
+                      extra={"guild_id": guild_id, "user_id": user_id})
+        matchmaker.requeue(match.tickets())
+        for ticket in match.tickets():
+            schedule_queue_timeout(ticket)
+        await send_error_embed(interaction, "A group was found but couldn't be posted, so everyone in it is back in the queue.")
+
+@bot.tree.command(name="leavequeue", description="Leave the group queue.")
+@metrics.timed("command", "leavequeue")
+async def leavequeue(interaction: discord.Interaction):
+    if not interaction.guild:
+        await send_error_embed(interaction, "This command can only be used in a server.")
+        return
+
+    scheduler.cancel(("queue", interaction.guild.id, interaction.user.id))
+    if matchmaker.dequeue(interaction.guild.id, interaction.user.id):
+        await interaction.response.send_message("👋 You left the queue.", ephemeral=True)
+    else:
+        await send_error_embed(interaction, "You aren't in the queue.")
+
+# ------------------ Startup Footprint ------------------
+def log_startup_footprint():
+    """Logs time-to-ready and peak memory so lean and full intents can be compared."""
+    elapsed = time.perf_counter() - STARTUP_BEGAN
+    try:
+        import resource
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+    except ImportError:
+        peak_mb = float("nan")  # `resource` is Unix-only
+    cached_members = sum(len(guild.members) for guild in bot.guilds)
+    shards = ",".join(str(shard_id) for shard_id in sorted(bot.shards)) or "0"
+    log.info("📊 Ready in %.1fs (%s intents, shards %s of %d): %d guilds, %d cached members, peak RSS %.0f MB",
+             elapsed, "lean" if LEAN_INTENTS else "full", shards, bot.shard_count or 1,
+             len(bot.guilds), cached_members, peak_mb)
+
+# ------------------ Slash Command: /profile ------------------
+PROFILE_MAX_SECONDS = 60
+
+@bot.tree.command(name="profile", description="Sample the bot's event loop and upload a flamegraph stack file. (ADMIN ONLY)")
+@app_commands.describe(seconds="How long to sample for (1-60 seconds)")
+@metrics.timed("command", "profile")
+async def profile(interaction: discord.Interaction, seconds: app_commands.Range[int, 1, PROFILE_MAX_SECONDS] = 10):
+    """Runs a time-boxed sampling profile of this process and returns it as a collapsed-stack file."""
+    if not interaction.guild or not interaction.user.guild_permissions.administrator:
+        await send_error_embed(interaction, "You must be an admin to use this command.")
+        return
+    if loop_monitor.profiling:
+        await send_error_embed(interaction, "A profile is already running, try again in a minute.")
+        return
+
+    # ✅ Sampling runs on a separate thread, so the bot keeps serving while it profiles
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    folded, samples = await loop_monitor.profile(seconds)
+
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    files = [discord.File(io.BytesIO(folded.encode()), filename=f"dd-profile-{stamp}.folded")]
+    if loop_monitor.stalls:
+        files.append(discord.File(io.BytesIO(loop_monitor.stall_report().encode()), filename=f"dd-stalls-{stamp}.txt"))
+    await interaction.followup.send(
+        f"✅ {samples} samples over {seconds}s. Open the `.folded` file in <https://speedscope.app> "
+        f"or run `flamegraph.pl` on it.\n"
+        f"Loop stalls over {loop_monitor.threshold:.2f}s since start: {loop_monitor.stall_count}"
+        + (" (stacks attached)" if loop_monitor.stalls else ""),
+        files=files, ephemeral=True)
+
 # ------------------ Bot Ready Event ------------------
 @bot.event
 async def on_ready():
-    print(f"✅ Logged in as {bot.user}")
-    bot.loop.create_task(keep_alive())  # Start heartbeat task
-    bot.loop.create_task(cleanup_expired_events())  # Start cleanup task
-
-    try:
-        print("🟡 Clearing all slash commands on bot startup...")
-        bot.tree.clear_commands(guild=None)  # Clears old commands
+    log.info("✅ Logged in as %s", bot.user)  # Background tasks are started once in `setup_hook`
 
-        # ✅ Explicitly add commands before syncing
-        bot.tree.add_command(dd)
-        bot.tree.add_command(setchannel)
-        bot.tree.add_command(removechannel)
+    global events_rehydrated
+    if not events_rehydrated:
+        events_rehydrated = True
+        log_startup_footprint()
+        try:
+            await rehydrate_events()
+        except Exception as e:
+            log.exception("❌ Failed to rehydrate events: %s", e)
 
-        await bot.tree.sync()  # ✅ Re-sync commands with Discord
+    if bot.shard_ids is not None and 0 not in bot.shard_ids:
+        return  # Commands are global; in a cluster only the process running shard 0 syncs them
 
-        print(f"✅ Slash commands re-registered successfully!")
+    try:
+        # Only talk to Discord when the command definitions changed since the last sync
+        if await sync_if_changed(bot, dev_guild_id=DEV_GUILD_ID):
+            log.info("✅ Slash commands synced %s.", f"to dev guild {DEV_GUILD_ID}" if DEV_GUILD_ID else "globally")
+        else:
+            log.info("✅ Slash commands unchanged, skipping sync.")
     except Exception as e:
-        print(f"❌ Failed to sync commands: {e}")
+        log.error("❌ Failed to sync commands: %s", e)
 
 # ------------------ Global Lists ------------------
 DUNGEONS = [
@@ -213,67 +871,133 @@ DUNGEONS = [
     "The Rookery", "Op Floodgate", "Motherlode", "Mechagone Workshop",
     "Priory of the Sacred Flame"
 ]
-KEY_LEVELS = ["LFG"] + [str(i) for i in range(21)]
+KEY_LEVELS = ["LFG"] + [str(i) for i in range(MAX_KEY_LEVEL + 1)]
 SCHEDULE_OPTIONS = ["Now", "Pick a Time"]
+ROLE_EMOJIS = {"🛡️": Role.TANK, "💚": Role.HEALER, "⚔️": Role.DPS}  # Reaction emoji -> role slot
 
 # ------------------ Helper Functions ------------------
-def format_schedule(dt: datetime) -> str:
-    """Format a datetime as 'Today HH:MM' if today, else as DD/MM/YYYY HH:MM."""
-    wow_tz = tz.tzoffset("GMT+1", 3600)
-    now = datetime.now(wow_tz)
-    if dt.date() == now.date():
-        return "Today " + dt.strftime("%H:%M")
+def format_schedule(event: EventRecord) -> str:
+    """The start as Discord timestamp markup: every client shows it in its own timezone and counts down to it,
+    so the embed never needs re-rendering per viewer or at midnight. Falls back to the schedule text."""
+    if event.starts_at is None:
+        return event.scheduled
+    starts_at = int(event.starts_at)
+    return f"<t:{starts_at}:F> (<t:{starts_at}:R>)"
+
+def schedule_label(dt: datetime) -> str:
+    """Plain-text UTC version of a start time, stored next to the instant."""
+    return dt.astimezone(tz.UTC).strftime("%d/%m/%Y %H:%M (UTC)")
+
+def schedule_changes(label: str, starts_at: float | None) -> dict:
+    """Event field changes for a new schedule; the group stays up until 30 minutes after its start."""
+    expires_at = time.time() + EVENT_TIMEOUT_MINUTES * 60
+    if starts_at is not None:
+        expires_at = max(expires_at, starts_at + 30 * 60)
+    return {"scheduled": label, "starts_at": starts_at, "expires_at": expires_at}
+
+def build_event_embed(event: EventRecord) -> discord.Embed:
+    """Renders an event from the record alone; players are shown as ID mentions."""
+    if event.creator_name:
+        embed = discord.Embed(title=f"{event.creator_name}'s Dungeon Group", color=discord.Color.orange())
+        embed.set_author(name=event.creator_name, icon_url=event.creator_avatar or None)
+        if event.creator_avatar:
+            embed.set_thumbnail(url=event.creator_avatar)
     else:
-        return dt.strftime("%d/%m/%Y %H:%M")
-
-def build_event_embed(
-    creator: discord.Member,
-    dungeon: str,
-    difficulty: str,
-    scheduled: str,
-    comment: str,
-    assigned_roles: dict,
-    scheduled_dt: datetime | None = None
-) -> discord.Embed:
-    embed = discord.Embed(title=f"{creator.display_name}'s Dungeon Group", color=discord.Color.orange())
-    embed.set_author(name=creator.display_name, icon_url=creator.display_avatar.url)
-    embed.set_thumbnail(url=creator.display_avatar.url)
-
-    desc = f"**Dungeon:** {dungeon}\n\n" \
-           f"**Difficulty:** {difficulty}\n\n" \
-           f"**Scheduled:** {scheduled} (Server Time)"
-    if scheduled_dt and creator.id in creator_timezones:
-        try:
-            user_tz = tz.gettz(creator_timezones[creator.id])
-            local_dt = scheduled_dt.astimezone(user_tz)
-            desc += f" (Local: {local_dt.strftime('%H:%M')})"
-        except Exception:
-            pass
-    desc += "\n\n"
+        embed = discord.Embed(title="Dungeon Group", color=discord.Color.orange())  # Creator's account is gone
+
+    desc = f"**Dungeon:** {event.dungeon}\n\n" \
+           f"**Difficulty:** {event.difficulty}\n\n" \
+           f"**Scheduled:** {format_schedule(event)}\n\n"
     embed.description = desc
 
-    if comment:
-        embed.add_field(name="Comment", value=comment, inline=False)
+    if event.comment:
+        embed.add_field(name="Comment", value=event.comment, inline=False)
 
     # Display roles
-    tank = assigned_roles["Tank"].mention if assigned_roles["Tank"] else "None"
-    healer = assigned_roles["Healer"].mention if assigned_roles["Healer"] else "None"
-    dps = ", ".join(m.mention for m in assigned_roles["DPS"]) if assigned_roles["DPS"] else "None"
+    tank = f"<@{event.tank_id}>" if event.tank_id else "None"
+    healer = f"<@{event.healer_id}>" if event.healer_id else "None"
+    dps = ", ".join(f"<@{user_id}>" for user_id in event.dps_ids) if event.dps_ids else "None"
 
     embed.add_field(name="🛡️ Tank", value=tank, inline=False)
     embed.add_field(name="💚 Healer", value=healer, inline=False)
     embed.add_field(name="⚔️ DPS", value=dps, inline=False)
 
     # Show group full status
-    if assigned_roles["Tank"] and assigned_roles["Healer"] and len(assigned_roles["DPS"]) >= 3:
+    if event.state == EventState.FULL:
         embed.add_field(name="\u200b", value="🚫 **GROUP FULL** 🚫", inline=False)
 
     return embed
 
-async def finalize_event(interaction: discord.Interaction, creator: discord.Member, dungeon: str, difficulty: str, sched_str: str, scheduled_dt: datetime | None, comment: str, assigned_roles: dict):
-    """Finalizes the event creation by sending the embed, adding reactions, updating active_events, and pinging available roles."""
-    wow_tz = tz.tzoffset("GMT+1", 3600)
-    now = datetime.now(wow_tz)
+# ------------------ Message Handles ------------------
+def event_message(msg_id: int, channel_id: int) -> discord.PartialMessage:
+    """Returns an ID-only handle for a message, so edits, deletes and reaction
+    removals go straight out without fetching the message first."""
+    return bot.get_partial_messageable(channel_id).get_partial_message(msg_id)
+
+def message_route(channel_id: int) -> tuple:
+    """Outbound queue for message sends, edits and deletes in a channel."""
+    return ("messages", channel_id)
+
+def reaction_route(channel_id: int) -> tuple:
+    """Outbound queue for adding and removing reactions in a channel."""
+    return ("reactions", channel_id)
+
+# ------------------ Coalesced Embed Edits ------------------
+# A record only keeps (version, payload digest) of its last render. The Embed
+# objects themselves live in a small LRU, since they're only needed for the
+# next publish and can always be rebuilt from the record.
+recent_embeds = OrderedDict()  # msg_id -> (version, discord.Embed), most recently built last
+
+def cache_embed(event: EventRecord, embed: discord.Embed) -> bytes:
+    """Records a freshly built embed for the event's current version. Returns its digest."""
+    digest = EmbedEditCoalescer.digest(embed)
+    event.rendered = (event.version, digest)
+    recent_embeds[event.message_id] = (event.version, embed)
+    recent_embeds.move_to_end(event.message_id)
+    if len(recent_embeds) > EMBED_CACHE_SIZE:
+        recent_embeds.popitem(last=False)
+    return digest
+
+def render_event_embed(msg_id: int) -> bytes | None:
+    """Returns the payload digest of an active event's embed, re-rendering only when its version changed."""
+    event = active_events.get(msg_id)
+    if not event:
+        return None
+    cached = event.rendered
+    if cached and cached[0] == event.version:
+        return cached[1]
+    return cache_embed(event, build_event_embed(event))
+
+def current_embed(event: EventRecord) -> discord.Embed:
+    """The embed for the event's current version, from the LRU or rebuilt."""
+    cached = recent_embeds.get(event.message_id)
+    if cached and cached[0] == event.version:
+        recent_embeds.move_to_end(event.message_id)
+        return cached[1]
+    embed = build_event_embed(event)
+    cache_embed(event, embed)
+    return embed
+
+async def publish_event_embed(msg_id: int):
+    """Pushes the event's current embed to the event message."""
+    event = active_events.get(msg_id)
+    if not event:
+        return
+    edit = functools.partial(event_message(msg_id, event.channel_id).edit, embed=current_embed(event))
+    await rest.submit(message_route(event.channel_id), edit, priority=NORMAL, collapse_key=("embed", msg_id))
+
+embed_editor = EmbedEditCoalescer(render_event_embed, publish_event_embed, window=EMBED_EDIT_WINDOW_SECONDS)
+
+def request_embed_update(msg_id: int):
+    """Queues a refresh of the event embed; bursts collapse into at most one edit per window."""
+    embed_editor.request(msg_id)
+
+async def finalize_event(interaction: discord.Interaction, creator: discord.Member, dungeon: str, difficulty: str, sched_str: str, scheduled_dt: datetime | None, comment: str, assigned_roles: dict, content: str | None = None):
+    """Finalizes the event creation by sending the embed, adding reactions, updating active_events, and pinging available roles.
+
+    Called from the /dd flow's last step or straight from a slash command (/queue); `content` is posted with the embed.
+    """
+    now = datetime.now(SERVER_TZ)
 
     # Set expiration time to 30 minutes after the event creation or the scheduled time (whichever is later)
     if scheduled_dt:
@@ -281,64 +1005,54 @@ async def finalize_event(interaction: discord.Interaction, creator: discord.Memb
     else:
         expires_at = now + timedelta(minutes=30)
 
-    await interaction.response.edit_message(content="Event created!", view=None, delete_after=5)
-    embed = build_event_embed(creator, dungeon, difficulty, sched_str, comment, assigned_roles, scheduled_dt)
+    if interaction.type == discord.InteractionType.application_command:
+        await interaction.response.send_message("Event created!", ephemeral=True)  # Nothing of ours to edit yet
+    else:
+        await interaction.response.edit_message(content="Event created!", view=None, delete_after=5)
+    event = EventRecord(
+        0, interaction.guild_id, interaction.channel_id, creator.id,
+        dungeon, difficulty, sched_str, scheduled_dt.timestamp() if scheduled_dt else None, comment, expires_at.timestamp(),
+        tank_id=assigned_roles["Tank"].id if assigned_roles["Tank"] else None,
+        healer_id=assigned_roles["Healer"].id if assigned_roles["Healer"] else None,
+        dps_ids=[member.id for member in assigned_roles["DPS"]],
+        creator_name=creator.display_name, creator_avatar=creator.display_avatar.url,
+    )
+    embed = build_event_embed(event)
     
     # First, send the message and assign it to `msg`
-    msg = await interaction.followup.send(embed=embed)
+    msg = await interaction.followup.send(content, embed=embed)
     
     # Then, edit the message to include the view
-    await msg.edit(view=EventEditOptionsView(msg.id, creator))
+    await msg.edit(view=EventEditOptionsView(msg.id, creator.id))
     
     # Store the event in `active_events`
-    active_events[msg.id] = {
-        "creator": creator,
-        "channel_id": interaction.channel_id,  # Store the channel ID
-        "dungeon": dungeon,
-        "difficulty": difficulty,
-        "scheduled": sched_str,
-        "comment": comment,
-        "assigned_roles": assigned_roles,
-        "expires_at": expires_at,
-        "role_pings_message": None  # Placeholder for the role pings message
-    }
+    event.message_id = msg.id
+    active_events[msg.id] = event
+    event_index.update(event)
+    embed_editor.seed(msg.id, cache_embed(event, embed))  # What was just posted
+    await persist_event(msg.id)
+    schedule_event_expiry(msg.id)
     
-    # Add reactions for role selection
-    await msg.add_reaction("🛡️")
-    await msg.add_reaction("💚")
-    await msg.add_reaction("⚔️")
+    # Add reactions for role selection (queued on the reactions route, they run alongside the ping below)
+    reactions = [rest.submit(reaction_route(interaction.channel_id), msg.add_reaction, emoji, priority=HIGH)
+                 for emoji in ROLE_EMOJIS]
     
     # Ping available roles
-    guild = interaction.guild
-    open_pings = []
-    if assigned_roles["Tank"] is None:
-        role_obj = discord.utils.find(lambda r: r.name.lower() == "tank", guild.roles)
-        if role_obj and role_obj.mentionable:
-            open_pings.append(role_obj.mention)
-    if assigned_roles["Healer"] is None:
-        role_obj = discord.utils.find(lambda r: r.name.lower() == "healer", guild.roles)
-        if role_obj and role_obj.mentionable:
-            open_pings.append(role_obj.mention)
-    if len(assigned_roles["DPS"]) < 3:
-        role_obj = discord.utils.find(lambda r: r.name.lower() == "dps", guild.roles)
-        if role_obj and role_obj.mentionable:
-            open_pings.append(role_obj.mention)
+    ping_roles = role_index.ping_roles(interaction.guild)
+    open_pings = [ping_roles[slot].mention for slot in open_slots(event)
+                  if slot in ping_roles and ping_roles[slot].mentionable]
     if open_pings:
         # Send a reply to the event embed message to ping the roles
-        role_pings_message = await msg.reply("Open spots: " + ", ".join(open_pings), mention_author=False)
+        reply = functools.partial(msg.reply, "Open spots: " + ", ".join(open_pings), mention_author=False)
+        role_pings_message = await rest.submit(message_route(interaction.channel_id), reply, priority=NORMAL)
         
         # Store the role pings message in the event data
-        active_events[msg.id]["role_pings_message"] = role_pings_message
+        await update_event(msg.id, {"role_pings_message_id": role_pings_message.id})
 
         # Schedule the deletion of the role pings message after 15 minutes
-        async def delete_role_pings_message():
-            await asyncio.sleep(900)  # 15 minutes
-            try:
-                await role_pings_message.delete()
-            except discord.NotFound:
-                pass  # Message already deleted
+        schedule_role_pings_deletion(msg.id, now.timestamp() + ROLE_PINGS_TTL_SECONDS)
 
-        asyncio.create_task(delete_role_pings_message())
+    await asyncio.gather(*reactions)
 
 # ------------------ Channel Selection Dropdown ------------------
 class ChannelSelect(Select):
@@ -346,13 +1060,13 @@ class ChannelSelect(Select):
         options = [discord.SelectOption(label=ch.name, value=str(ch.id)) for ch in channels]
         super().__init__(placeholder="Select a channel", options=options, min_values=1, max_values=1)
 
+    @metrics.timed("component")
     async def callback(self, interaction: discord.Interaction):
         selected_id = int(self.values[0])
         guild_id = interaction.guild.id
 
-        # Store selected channel and save it to JSON file
-        guild_channel_map[guild_id] = selected_id
-        save_channels()
+        # Store selected channel (saved to disk in the background)
+        guild_config.set_channel(guild_id, selected_id)
 
         try:
             # Check if the interaction is still valid before responding
@@ -370,9 +1084,10 @@ class ChannelSelect(Select):
                 await self.view.message.delete()
 
         except discord.NotFound:
-            print("⚠️ Interaction was no longer valid.")
-        except discord.HTTPException:
-            print("⚠️ Failed to delete the message or send a follow-up.")
+            log.warning("⚠️ Interaction was no longer valid.", extra={"guild_id": guild_id, "user_id": interaction.user.id})
+        except discord.HTTPException as e:
+            log.warning("⚠️ Failed to delete the message or send a follow-up: %s", e,
+                        extra={"guild_id": guild_id, "user_id": interaction.user.id})
 
 
 class ChannelSelectionView(View):
@@ -387,9 +1102,9 @@ class ChannelSelectionView(View):
             try:
                 await self.message.delete()
             except discord.NotFound:
-                print("⚠️ Channel selection message was already deleted.")
+                log.info("⚠️ Channel selection message was already deleted.")
             except discord.HTTPException:
-                print("⚠️ Failed to delete channel selection message. It may no longer exist.")
+                log.warning("⚠️ Failed to delete channel selection message. It may no longer exist.")
 
 
 # ------------------ Interactive Event Creation ------------------
@@ -400,6 +1115,7 @@ class DungeonSelectMenu(Select):
         options = [discord.SelectOption(label=d, value=d) for d in DUNGEONS]
         super().__init__(placeholder="Select a Dungeon", options=options)
 
+    @metrics.timed("component")
     async def callback(self, interaction: discord.Interaction):
         dungeon = self.values[0]
         await interaction.response.edit_message(content="Select key level:", view=KeyLevelSelectionView(self.creator, dungeon))
@@ -415,6 +1131,7 @@ class KeyLevelSelectMenu(Select):
         options = [discord.SelectOption(label=level, value=level) for level in KEY_LEVELS]
         super().__init__(placeholder="Select Key Level", options=options)
 
+    @metrics.timed("component")
     async def callback(self, interaction: discord.Interaction):
         parent: KeyLevelSelectionView = self.view  # type: ignore
         parent.difficulty = self.values[0]
@@ -437,6 +1154,7 @@ class ScheduleSelectMenu(Select):
         options = [discord.SelectOption(label=opt, value=opt) for opt in SCHEDULE_OPTIONS]
         super().__init__(placeholder="Select a start time", options=options)
 
+    @metrics.timed("component")
     async def callback(self, interaction: discord.Interaction):
         option = self.values[0]
         if option == "Now":
@@ -468,35 +1186,36 @@ class CustomTimeModal(Modal):
         )
         self.add_item(self.custom_time)
 
+    @metrics.timed("modal")
     async def on_submit(self, interaction: discord.Interaction):
+        # The creator's timezone (UTC if they haven't set one); store failures aren't the input's fault
+        user_tz = await zone_for_interaction(interaction)
+        if user_tz is None:
+            return
+
         try:
-            # Parse the input time
-            user_tz = tz.gettz(creator_timezones.get(interaction.user.id, "UTC"))
-            dt = parser.parse(self.custom_time.value, dayfirst=True)
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=user_tz)
-            
-            # Convert to UTC for comparison
-            now_utc = datetime.now(tz.UTC)
-            dt_utc = dt.astimezone(tz.UTC)
-
-            # Check if the time is in the past
-            if dt_utc < now_utc:
-                await interaction.response.send_message(
-                    "⚠️ The selected time is in the past. Please choose a future time.", ephemeral=True
-                )
-                return
-
-            # Format the time for display
-            sched_str = dt_utc.strftime("%d/%m/%Y %H:%M (UTC)")
-            scheduled_dt = dt_utc
-
-        except Exception:
+            dt = parse_schedule(self.custom_time.value, user_tz)
+        except ValueError:
             await interaction.response.send_message(
                 "⚠️ Invalid time format. Please use the format DD/MM/YYYY HH:MM.", ephemeral=True
             )
             return
 
+        # Convert to UTC for comparison
+        now_utc = datetime.now(tz.UTC)
+        dt_utc = dt.astimezone(tz.UTC)
+
+        # Check if the time is in the past
+        if dt_utc < now_utc:
+            await interaction.response.send_message(
+                "⚠️ The selected time is in the past. Please choose a future time.", ephemeral=True
+            )
+            return
+
+        # Format the time for display
+        sched_str = schedule_label(dt_utc)
+        scheduled_dt = dt_utc
+
         # Proceed with event creation
         await interaction.response.send_modal(RoleAssignmentModal(self.creator, self.dungeon, self.difficulty, sched_str, scheduled_dt))
 
@@ -517,6 +1236,7 @@ class CommentPromptView(View):
 class SkipCommentButton(Button):
     def __init__(self):
         super().__init__(label="Skip Comment", style=discord.ButtonStyle.primary)
+    @metrics.timed("component")
     async def callback(self, interaction: discord.Interaction):
         parent: CommentPromptView = self.view  # type: ignore
         await finalize_event(interaction, parent.creator, parent.dungeon, parent.difficulty, parent.sched_str, parent.scheduled_dt, parent.comment, parent.assigned_roles)
@@ -524,6 +1244,7 @@ class SkipCommentButton(Button):
 class AddCommentButtonPrompt(Button):
     def __init__(self):
         super().__init__(label="Add Comment", style=discord.ButtonStyle.secondary)
+    @metrics.timed("component")
     async def callback(self, interaction: discord.Interaction):
         await interaction.response.send_modal(CommentModalForPrompt(self.view))
         
@@ -538,6 +1259,7 @@ class CommentModalForPrompt(Modal):
             required=True
         )
         self.add_item(self.comment_input)
+    @metrics.timed("modal")
     async def on_submit(self, interaction: discord.Interaction):
         self.parent_view.comment = self.comment_input.value
         await finalize_event(interaction, self.parent_view.creator, self.parent_view.dungeon, self.parent_view.difficulty, self.parent_view.sched_str, self.parent_view.scheduled_dt, self.parent_view.comment, self.parent_view.assigned_roles)
@@ -547,12 +1269,13 @@ class EditDungeonButton(Button):
     def __init__(self, event_id: int):
         super().__init__(label="Edit Dungeon", style=discord.ButtonStyle.primary)
         self.event_id = event_id
+    @metrics.timed("component")
     async def callback(self, interaction: discord.Interaction):
-        event_data = active_events.get(self.event_id)
-        if not event_data:
+        event = active_events.get(self.event_id)
+        if not event:
             await interaction.response.send_message("Event not found.", ephemeral=True)
             return
-        if interaction.user != event_data["creator"]:
+        if interaction.user.id != event.creator_id:
             await interaction.response.send_message("Only the event creator can edit this event.", ephemeral=True)
             return
         await interaction.response.send_message("Select new dungeon:", view=EditDungeonView(self.event_id), ephemeral=True)
@@ -562,18 +1285,15 @@ class EditDungeonSelect(Select):
         self.event_id = event_id
         options = [discord.SelectOption(label=d, value=d) for d in DUNGEONS]
         super().__init__(placeholder="Select new dungeon", options=options)
+    @metrics.timed("component")
     async def callback(self, interaction: discord.Interaction):
-        event_data = active_events.get(self.event_id)
-        if not event_data:
+        event = active_events.get(self.event_id)
+        if not event:
+            await interaction.response.send_message("Event not found.", ephemeral=True)
+            return
+        if not await update_event(self.event_id, {"dungeon": self.values[0]}):
             await interaction.response.send_message("Event not found.", ephemeral=True)
             return
-        event_data["dungeon"] = self.values[0]
-        embed = build_event_embed(event_data["creator"], event_data["dungeon"], event_data["difficulty"],
-                                  event_data["scheduled"], event_data["comment"], event_data["assigned_roles"])
-        guild = interaction.guild
-        channel = guild.get_channel(interaction.channel.id)
-        msg = await channel.fetch_message(self.event_id)
-        await msg.edit(embed=embed)
         await interaction.response.send_message("Dungeon updated.", ephemeral=True)
 
 class EditDungeonView(View):
@@ -585,12 +1305,13 @@ class EditKeyLevelButton(Button):
     def __init__(self, event_id: int):
         super().__init__(label="Edit Key Level", style=discord.ButtonStyle.primary)
         self.event_id = event_id
+    @metrics.timed("component")
     async def callback(self, interaction: discord.Interaction):
-        event_data = active_events.get(self.event_id)
-        if not event_data:
+        event = active_events.get(self.event_id)
+        if not event:
             await interaction.response.send_message("Event not found.", ephemeral=True)
             return
-        if interaction.user != event_data["creator"]:
+        if interaction.user.id != event.creator_id:
             await interaction.response.send_message("Only the event creator can edit this event.", ephemeral=True)
             return
         await interaction.response.send_message("Select new key level:", view=EditKeyLevelView(self.event_id), ephemeral=True)
@@ -600,18 +1321,15 @@ class EditKeyLevelSelect(Select):
         self.event_id = event_id
         options = [discord.SelectOption(label=level, value=level) for level in KEY_LEVELS]
         super().__init__(placeholder="Select new key level", options=options)
+    @metrics.timed("component")
     async def callback(self, interaction: discord.Interaction):
-        event_data = active_events.get(self.event_id)
-        if not event_data:
+        event = active_events.get(self.event_id)
+        if not event:
+            await interaction.response.send_message("Event not found.", ephemeral=True)
+            return
+        if not await update_event(self.event_id, {"difficulty": self.values[0]}):
             await interaction.response.send_message("Event not found.", ephemeral=True)
             return
-        event_data["difficulty"] = self.values[0]
-        embed = build_event_embed(event_data["creator"], event_data["dungeon"], event_data["difficulty"],
-                                  event_data["scheduled"], event_data["comment"], event_data["assigned_roles"])
-        guild = interaction.guild
-        channel = guild.get_channel(interaction.channel.id)
-        msg = await channel.fetch_message(self.event_id)
-        await msg.edit(embed=embed)
         await interaction.response.send_message("Key level updated.", ephemeral=True)
 
 class EditKeyLevelView(View):
@@ -623,12 +1341,13 @@ class EditScheduleButton(Button):
     def __init__(self, event_id: int):
         super().__init__(label="Edit Schedule", style=discord.ButtonStyle.primary)
         self.event_id = event_id
+    @metrics.timed("component")
     async def callback(self, interaction: discord.Interaction):
-        event_data = active_events.get(self.event_id)
-        if not event_data:
+        event = active_events.get(self.event_id)
+        if not event:
             await interaction.response.send_message("Event not found.", ephemeral=True)
             return
-        if interaction.user != event_data["creator"]:
+        if interaction.user.id != event.creator_id:
             await interaction.response.send_message("Only the event creator can edit this event.", ephemeral=True)
             return
         await interaction.response.send_message("Select new schedule:", view=EditScheduleView(self.event_id), ephemeral=True)
@@ -638,25 +1357,17 @@ class EditScheduleSelect(Select):
         self.event_id = event_id
         options = [discord.SelectOption(label=opt, value=opt) for opt in SCHEDULE_OPTIONS]
         super().__init__(placeholder="Select new schedule", options=options)
+    @metrics.timed("component")
     async def callback(self, interaction: discord.Interaction):
-        event_data = active_events.get(self.event_id)
-        if not event_data:
+        event = active_events.get(self.event_id)
+        if not event:
             await interaction.response.send_message("Event not found.", ephemeral=True)
             return
-        if self.values[0] == "Now":
-            new_sched_str = "Now"
-            new_scheduled_dt = None
-        else:
+        if self.values[0] != "Now":
             return await interaction.response.send_modal(EditScheduleModal(self.event_id))
-        event_data["scheduled"] = new_sched_str
-        wow_tz = tz.tzoffset("GMT+1", 3600)
-        event_data["expires_at"] = datetime.now(wow_tz) + timedelta(minutes=EVENT_TIMEOUT_MINUTES)
-        embed = build_event_embed(event_data["creator"], event_data["dungeon"], event_data["difficulty"],
-                                  new_sched_str, event_data["comment"], event_data["assigned_roles"])
-        guild = interaction.guild
-        channel = guild.get_channel(interaction.channel.id)
-        msg = await channel.fetch_message(self.event_id)
-        await msg.edit(embed=embed)
+        if not await update_event(self.event_id, schedule_changes("Now", None)):
+            await interaction.response.send_message("Event not found.", ephemeral=True)
+            return
         await interaction.response.send_message("Schedule updated.", ephemeral=True)
 
 class EditScheduleView(View):
@@ -675,29 +1386,24 @@ class EditScheduleModal(Modal):
             required=True
         )
         self.add_item(self.new_time)
+    @metrics.timed("modal")
     async def on_submit(self, interaction: discord.Interaction):
-        event_data = active_events.get(self.event_id)
-        if not event_data:
+        event = active_events.get(self.event_id)
+        if not event:
             await interaction.response.send_message("Event not found.", ephemeral=True)
             return
-        wow_tz = tz.tzoffset("GMT+1", 3600)
+        # Read in the editor's timezone (UTC if they haven't set one), like a new group's start time
+        user_tz = await zone_for_interaction(interaction)
+        if user_tz is None:
+            return
         try:
-            dt = parser.parse(self.new_time.value, dayfirst=True)
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=wow_tz)
-            new_sched_str = format_schedule(dt)
-            new_scheduled_dt = dt
-        except Exception:
-            new_sched_str = self.new_time.value
-            new_scheduled_dt = None
-        event_data["scheduled"] = new_sched_str
-        event_data["expires_at"] = datetime.now(wow_tz) + timedelta(minutes=EVENT_TIMEOUT_MINUTES)
-        embed = build_event_embed(event_data["creator"], event_data["dungeon"], event_data["difficulty"],
-                                  new_sched_str, event_data["comment"], event_data["assigned_roles"], scheduled_dt=new_scheduled_dt)
-        guild = interaction.guild
-        channel = guild.get_channel(interaction.channel.id)
-        msg = await channel.fetch_message(self.event_id)
-        await msg.edit(embed=embed)
+            dt = parse_schedule(self.new_time.value, user_tz)
+            changes = schedule_changes(schedule_label(dt), dt.timestamp())
+        except ValueError:
+            changes = schedule_changes(self.new_time.value, None)  # Shown as typed
+        if not await update_event(self.event_id, changes):
+            await interaction.response.send_message("Event not found.", ephemeral=True)
+            return
         await interaction.response.send_message("Schedule updated.", ephemeral=True)
 
 class EditCommentModal(Modal):
@@ -711,18 +1417,15 @@ class EditCommentModal(Modal):
             required=True
         )
         self.add_item(self.new_comment)
+    @metrics.timed("modal")
     async def on_submit(self, interaction: discord.Interaction):
-        event_data = active_events.get(self.event_id)
-        if not event_data:
+        event = active_events.get(self.event_id)
+        if not event:
+            await interaction.response.send_message("Event not found.", ephemeral=True)
+            return
+        if not await update_event(self.event_id, {"comment": self.new_comment.value.strip()}):
             await interaction.response.send_message("Event not found.", ephemeral=True)
             return
-        event_data["comment"] = self.new_comment.value.strip()
-        embed = build_event_embed(event_data["creator"], event_data["dungeon"], event_data["difficulty"],
-                                  event_data["scheduled"], event_data["comment"], event_data["assigned_roles"])
-        guild = interaction.guild
-        channel = guild.get_channel(interaction.channel.id)
-        msg = await channel.fetch_message(self.event_id)
-        await msg.edit(embed=embed)
         await interaction.response.send_message("Comment updated.", ephemeral=True)
 
 class EditEventSelectMenu(Select):
@@ -734,14 +1437,15 @@ class EditEventSelectMenu(Select):
             discord.SelectOption(label="Edit Schedule", value="edit_schedule"),
             discord.SelectOption(label="Edit Comment", value="edit_comment"),
         ]
-        super().__init__(placeholder="Select an option to edit", options=options)
+        super().__init__(placeholder="Select an option to edit", options=options, custom_id=f"dd:edit:{event_id}")
 
+    @metrics.timed("component")
     async def callback(self, interaction: discord.Interaction):
-        event_data = active_events.get(self.event_id)
-        if not event_data:
+        event = active_events.get(self.event_id)
+        if not event:
             await interaction.response.send_message("Event not found.", ephemeral=True)
             return
-        if interaction.user != event_data["creator"]:
+        if interaction.user.id != event.creator_id:
             await interaction.response.send_message("Only the event creator can edit this event.", ephemeral=True)
             return
 
@@ -782,32 +1486,21 @@ class ConfirmDeleteButton(Button):
         super().__init__(label="Confirm Delete", style=discord.ButtonStyle.danger)
         self.event_id = event_id
 
+    @metrics.timed("component")
     async def callback(self, interaction: discord.Interaction):
-        event_data = active_events.get(self.event_id)
-        if not event_data:
+        # Remove the event from active_events; its stored row stays until the messages are gone
+        event = await event_actors.run(self.event_id, remove_event, self.event_id, True)
+        if not event:
             await interaction.response.send_message("Event not found.", ephemeral=True)
             return
 
-        # Delete the event message
-        guild = interaction.guild
-        channel = guild.get_channel(event_data["channel_id"])  # Use the stored channel ID
-        if channel:
-            try:
-                msg = await channel.fetch_message(self.event_id)
-                await msg.delete()
-            except discord.NotFound:
-                pass  # Message already deleted
-
-        # Delete the role pings message if it exists
-        role_pings_message = event_data.get("role_pings_message")
-        if role_pings_message:
-            try:
-                await role_pings_message.delete()
-            except discord.NotFound:
-                pass  # Message already deleted
-
-        # Remove the event from active_events
-        active_events.pop(self.event_id, None)
+        # Delete the event message and its role pings message (the creator is waiting on this one).
+        # If that fails or the bot stops first, the row brings the event back on restart to be torn down again.
+        if not await delete_event_messages(event, priority=HIGH):
+            await interaction.response.send_message("⚠️ The event is closed, but its message couldn't be deleted.",
+                                                    ephemeral=True)
+            return
+        await forget_event(self.event_id)
 
         await interaction.response.send_message("✅ Event deleted successfully.", ephemeral=True)
 
@@ -819,6 +1512,7 @@ class CancelDeleteButton(Button):
         self.event_id = event_id
         self.creator = creator
 
+    @metrics.timed("component")
     async def callback(self, interaction: discord.Interaction):
         # Ensure only the creator can cancel the deletion
         if interaction.user.id != self.creator.id:
@@ -832,15 +1526,16 @@ class CancelDeleteButton(Button):
 class DeleteEventButton(Button):
     """Button to initiate event deletion with confirmation."""
     def __init__(self, event_id: int):
-        super().__init__(label="Delete Event", style=discord.ButtonStyle.danger)
+        super().__init__(label="Delete Event", style=discord.ButtonStyle.danger, custom_id=f"dd:delete:{event_id}")
         self.event_id = event_id
 
+    @metrics.timed("component")
     async def callback(self, interaction: discord.Interaction):
-        event_data = active_events.get(self.event_id)
-        if not event_data:
+        event = active_events.get(self.event_id)
+        if not event:
             await interaction.response.send_message("Event not found.", ephemeral=True)
             return
-        if interaction.user != event_data["creator"]:
+        if interaction.user.id != event.creator_id:
             await interaction.response.send_message("Only the event creator can delete this event.", ephemeral=True)
             return
 
@@ -849,9 +1544,9 @@ class DeleteEventButton(Button):
 
 
 class EventEditOptionsView(View):
-    def __init__(self, event_id: int, creator: discord.Member):
+    def __init__(self, event_id: int, creator_id: int):
         super().__init__(timeout=None)
-        self.creator_id = creator.id
+        self.creator_id = creator_id
         self.add_item(EditEventSelectMenu(event_id))  # Dropdown for editing options
         self.add_item(DeleteEventButton(event_id))   # Red delete button
 
@@ -864,135 +1559,87 @@ class EventEditOptionsView(View):
 # ------------------ Reaction Role Handlers ------------------
 
 @bot.event
+@metrics.timed("reaction", "on_raw_reaction_add")
 async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
     """Handles when a user reacts to an event message."""
-    allowed_emojis = {"🛡️", "💚", "⚔️"}  # Define allowed reaction emojis
+    # Cheap rejections first: none of these need a network call
+    if payload.user_id == bot.user.id:
+        return  # Ignore the bot's own reactions
 
-    # Check if the message is part of an active event
-    if payload.message_id not in active_events:
+    event = active_events.get(payload.message_id)
+    if not event:
         return  # Ignore reactions on non-event messages
 
-    guild = bot.get_guild(payload.guild_id)
-    if not guild:
-        return
-    channel = guild.get_channel(payload.channel_id)
-    if not channel:
-        return
-    message = await channel.fetch_message(payload.message_id)
-    user = guild.get_member(payload.user_id)
-    if not user:
-        return
-
-    # Ignore the bot's own reactions
-    if payload.user_id == bot.user.id:
-        return
-
     # Check if the emoji is allowed
-    if payload.emoji.name not in allowed_emojis:
-        try:
-            await message.remove_reaction(payload.emoji, user)  # Remove non-allowed reactions
-        except Exception as e:
-            print(f"Error removing reaction: {e}")
+    role = ROLE_EMOJIS.get(payload.emoji.name)
+    if not role:
+        await remove_user_reaction(payload)  # Remove non-allowed reactions
         return
 
-    # Process the reaction for the event
-    event_data = active_events[payload.message_id]
-    wow_tz = tz.tzoffset("GMT+1", 3600)
-    if datetime.now(wow_tz) > event_data["expires_at"]:
-        return  # Event timed out.
-
-    emoji_to_role = {"🛡️": "Tank", "💚": "Healer", "⚔️": "DPS"}
-    role_name = emoji_to_role.get(payload.emoji.name)
-    if not role_name:
-        return  # If the emoji is not in the role mapping, exit
-
-    assigned = event_data["assigned_roles"]
+    if not payload.member:
+        return  # Reactions outside a guild carry no member
+    member_cache.remember(payload.member)
 
-    # Prevent double assignment for roles
-    if (assigned["Tank"] and assigned["Tank"].id == user.id) or \
-       (assigned["Healer"] and assigned["Healer"].id == user.id) or \
-       any(member.id == user.id for member in assigned["DPS"]):
-        try:
-            await message.remove_reaction(payload.emoji, user)  # Remove the reaction if already assigned
-        except Exception as e:
-            print(f"Error removing reaction: {e}")
-        return
-
-    # Assign the user to the appropriate role if it’s available
-    if role_name in ["Tank", "Healer"]:
-        if assigned[role_name]:
-            try:
-                await message.remove_reaction(payload.emoji, user)  # Remove if role is already assigned
-            except Exception as e:
-                print(f"Error removing reaction: {e}")
-            return
-        else:
-            assigned[role_name] = user
-    elif role_name == "DPS":
-        if len(assigned["DPS"]) >= 3:
-            try:
-                await message.remove_reaction(payload.emoji, user)  # Remove reaction if the DPS slots are full
-            except Exception as e:
-                print(f"Error removing reaction: {e}")
-            return
-        else:
-            assigned["DPS"].append(user)
+    # Check and take the slot inside the event's actor so concurrent reactions can't overfill it
+    outcome = await event_actors.run(payload.message_id, claim_reaction_slot, payload.message_id, role, payload.user_id)
+    if outcome in (ALREADY_ASSIGNED, SLOT_FULL):
+        await remove_user_reaction(payload)  # Already in the group, or the slot is taken
 
-    # Rebuild the event embed after role assignment
-    embed = build_event_embed(event_data["creator"], event_data["dungeon"], event_data["difficulty"],
-                              event_data["scheduled"], event_data["comment"], assigned)
-    await message.edit(embed=embed)
+async def remove_user_reaction(payload: discord.RawReactionActionEvent):
+    """Takes a user's reaction back off an event message. Cosmetic, so it's sent at low priority."""
+    message = event_message(payload.message_id, payload.channel_id)
+    try:
+        await rest.submit(reaction_route(payload.channel_id), message.remove_reaction,
+                          payload.emoji, discord.Object(id=payload.user_id), priority=LOW)
+    except Exception as e:
+        log.warning("Error removing reaction: %s", e,
+                    extra={"guild_id": payload.guild_id, "event_id": payload.message_id, "user_id": payload.user_id})
+
+async def claim_reaction_slot(msg_id: int, role: Role, user_id: int) -> str | None:
+    """Assigns a reacting member to a slot. Runs inside the event's actor."""
+    event = active_events.get(msg_id)
+    if not event:
+        return None  # Deleted while the reaction was queued
+    if event.is_expired():
+        return None  # Event timed out.
+
+    outcome = claim_slot(event, role, user_id)
+    if outcome == CLAIMED:
+        # New version queues an embed refresh; bursts of reactions collapse into one edit
+        bump_version(msg_id)
+        await persist_event(msg_id)
+    return outcome
 
 @bot.event
+@metrics.timed("reaction", "on_raw_reaction_remove")
 async def on_raw_reaction_remove(payload: discord.RawReactionActionEvent):
     """Handles when a user removes their reaction from an event message."""
     if payload.user_id == bot.user.id:
         return  # Ignore the bot’s own reactions
 
-    if payload.message_id not in active_events:
+    event = active_events.get(payload.message_id)
+    if not event:
         return  # If the message is not associated with an active event, exit
-    
-    event_data = active_events[payload.message_id]
-    wow_tz = tz.tzoffset("GMT+1", 3600)
-    if datetime.now(wow_tz) > event_data["expires_at"]:
-        return  # Event timed out.
-    
-    guild = bot.get_guild(payload.guild_id)
-    if not guild:
-        return
-    channel = guild.get_channel(payload.channel_id)
-    if not channel:
-        return
-    message = await channel.fetch_message(payload.message_id)
-    user = guild.get_member(payload.user_id)
-    if not user:
-        return
 
-    emoji_to_role = {"🛡️": "Tank", "💚": "Healer", "⚔️": "DPS"}
-    if payload.emoji.name not in emoji_to_role:
+    role = ROLE_EMOJIS.get(payload.emoji.name)
+    if not role:
         return  # If the emoji is not in the role mapping, exit
-    
-    role_name = emoji_to_role[payload.emoji.name]
-    assigned = event_data["assigned_roles"]
-    
-    # Remove the user from the appropriate role
-    if role_name in ["Tank", "Healer"]:
-        if assigned[role_name] == user:
-            assigned[role_name] = None
-    elif role_name == "DPS":
-        if user in assigned["DPS"]:
-            assigned["DPS"].remove(user)
-
-    # Rebuild the event embed after role removal
-    embed = build_event_embed(
-        event_data["creator"],
-        event_data["dungeon"],
-        event_data["difficulty"],
-        event_data["scheduled"],
-        event_data["comment"],
-        assigned
-    )
-    await message.edit(embed=embed)
+
+    await event_actors.run(payload.message_id, release_reaction_slot, payload.message_id, role, payload.user_id)
+
+async def release_reaction_slot(msg_id: int, role: Role, user_id: int):
+    """Frees the slot a member un-reacted from. Runs inside the event's actor."""
+    event = active_events.get(msg_id)
+    if not event:
+        return
+    if event.is_expired():
+        return  # Event timed out.
+
+    # Remove the user from the appropriate role (compared by ID, no member lookup needed)
+    if release_slot(event, role, user_id):
+        # New version queues an embed refresh; bursts of reactions collapse into one edit
+        bump_version(msg_id)
+        await persist_event(msg_id)
 
 # ------------------ Role Assignment Modal ------------------
 class RoleAssignmentModal(Modal):
@@ -1029,30 +1676,38 @@ class RoleAssignmentModal(Modal):
         self.add_item(self.healer_input)
         self.add_item(self.dps_input)
 
+    @metrics.timed("modal")
     async def on_submit(self, interaction: discord.Interaction):
         # Parse the input for each role
         guild = interaction.guild
         assigned_roles = {"Tank": None, "Healer": None, "DPS": []}
+        problems = []
 
         # Parse Tank
         if self.tank_input.value:
             tank = await self._get_member_from_input(guild, self.tank_input.value)
             if tank:
-                assigned_roles["Tank"] = tank
+                assigned_roles["Tank"] = tank.member
+            else:
+                problems.append(describe_failed_lookup("Tank", self.tank_input.value, tank))
 
         # Parse Healer
         if self.healer_input.value:
             healer = await self._get_member_from_input(guild, self.healer_input.value)
             if healer:
-                assigned_roles["Healer"] = healer
+                assigned_roles["Healer"] = healer.member
+            else:
+                problems.append(describe_failed_lookup("Healer", self.healer_input.value, healer))
 
         # Parse DPS
         if self.dps_input.value:
-            dps_mentions = [d.strip() for d in self.dps_input.value.split(",")]
-            for mention in dps_mentions:
+            dps_mentions = [d.strip() for d in self.dps_input.value.split(",") if d.strip()]
+            for mention in dps_mentions[:3]:
                 dps_member = await self._get_member_from_input(guild, mention)
-                if dps_member and len(assigned_roles["DPS"]) < 3:
-                    assigned_roles["DPS"].append(dps_member)
+                if dps_member:
+                    assigned_roles["DPS"].append(dps_member.member)
+                else:
+                    problems.append(describe_failed_lookup("DPS", mention, dps_member))
 
         # Proceed to finalize the event
         await finalize_event(
@@ -1066,11 +1721,68 @@ class RoleAssignmentModal(Modal):
             assigned_roles=assigned_roles
         )
 
-    async def _get_member_from_input(self, guild: discord.Guild, input_str: str) -> discord.Member | None:
-        """Helper to parse a member from a mention or username."""
-        if input_str.startswith("<@") and input_str.endswith(">"):
-            member_id = int(input_str.strip("<@!>"))
-            return guild.get_member(member_id)
-        return discord.utils.find(lambda m: m.name == input_str or m.display_name == input_str, guild.members)
+        # Tell the creator which names couldn't be assigned instead of silently dropping them
+        if problems:
+            await interaction.followup.send("⚠️ Some players weren't added:\n" + "\n".join(problems), ephemeral=True)
+
+    async def _get_member_from_input(self, guild: discord.Guild, input_str: str) -> MemberLookup:
+        """Helper to resolve a member from a mention or name via the guild's name index."""
+        return await member_index.resolve(guild, input_str)
+
+def describe_failed_lookup(role_name: str, input_str: str, lookup: MemberLookup) -> str:
+    """One-line explanation of why a typed name wasn't assigned."""
+    if lookup.status == AMBIGUOUS:
+        names = ", ".join(m.display_name for m in lookup.candidates[:5])
+        return f"• {role_name}: `{input_str}` matches several members ({names})."
+    return f"• {role_name}: `{input_str}` was not found in this server."
+
+# ------------------ Member Index Updates ------------------
+@bot.event
+async def on_member_join(member: discord.Member):
+    member_index.member_added(member)
+    member_cache.remember(member)
+
+@bot.event
+async def on_raw_member_remove(payload: discord.RawMemberRemoveEvent):
+    member_index.member_removed(payload.guild_id, payload.user.id)
+    member_cache.forget(payload.guild_id, payload.user.id)
+
+@bot.event
+async def on_member_update(before: discord.Member, after: discord.Member):
+    if before.nick != after.nick:
+        member_index.member_added(after)
+
+@bot.event
+async def on_raw_member_update(member: discord.Member):
+    # Lean mode only: updates for members discord.py doesn't cache (see DungeonDaddyBot.dispatch_uncached_member_updates)
+    member_index.member_updated(member)
+    member_cache.refresh(member)
+
+@bot.event
+async def on_user_update(before: discord.User, after: discord.User):
+    if before.name != after.name or before.global_name != after.global_name:
+        member_index.user_renamed(after.id, after.mutual_guilds)
+
+@bot.event
+async def on_guild_remove(guild: discord.Guild):
+    member_index.drop_guild(guild.id)
+    role_index.invalidate(guild.id)
+    for ticket in matchmaker.drop_guild(guild.id):
+        scheduler.cancel(("queue", guild.id, ticket.user_id))
+
+# ------------------ Role Index Updates ------------------
+@bot.event
+async def on_guild_role_create(role: discord.Role):
+    role_index.invalidate(role.guild.id)
+
+@bot.event
+async def on_guild_role_update(before: discord.Role, after: discord.Role):
+    role_index.invalidate(after.guild.id)
+
+@bot.event
+async def on_guild_role_delete(role: discord.Role):
+    role_index.invalidate(role.guild.id)
 
-bot.run(TOKEN)
\ No newline at end of file
+if __name__ == "__main__":
+    setup_logging()
+    bot.run(TOKEN, log_handler=None)  # discord.py's own logs go through the same queue
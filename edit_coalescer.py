@@ -0,0 +1,104 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+
+log = logging.getLogger(__name__)
+
+# ------------------ Embed Edit Coalescer ------------------
+# Reaction bursts used to cost one message PATCH per reaction. Instead, callers
+# mark an event message as dirty and a single flush task per message publishes
+# the latest rendered embed at most once per window. A digest of the last
+# published payload is remembered so an edit that wouldn't change anything is
+# skipped entirely, without building or holding the embed itself. A failed
+# edit is retried after the window (up to MAX_PUBLISH_RETRIES times in a row),
+# so the final state still lands after a transient error.
+
+MAX_PUBLISH_RETRIES = 3
+
+
+class EmbedEditCoalescer:
+    """Collapses bursts of embed updates into at most one edit per `window` seconds per message."""
+
+    def __init__(self, render, publish, window: float = 1.5):
+        self.render = render      # render(msg_id) -> payload digest | None
+        self.publish = publish    # async publish(msg_id), builds the embed it sends
+        self.window = window
+        self._dirty = set()
+        self._tasks = {}          # msg_id -> flush task
+        self._posted = {}         # msg_id -> digest of the payload currently on Discord
+        self._last_edit = {}      # msg_id -> monotonic time of the last edit
+        self._failures = {}       # msg_id -> publish failures in a row
+        self.edits = 0
+        self.skipped = 0
+        self.failed = 0
+
+    @staticmethod
+    def serialize(embed) -> bytes:
+        return json.dumps(embed.to_dict(), sort_keys=True, separators=(",", ":")).encode()
+
+    @classmethod
+    def digest(cls, embed) -> bytes:
+        """A 16-byte fingerprint of the serialized embed, cheap to keep per message."""
+        return hashlib.blake2b(cls.serialize(embed), digest_size=16).digest()
+
+    def seed(self, msg_id: int, digest: bytes):
+        """Records the digest of the embed posted with the message, so identical edits are skipped."""
+        self._posted[msg_id] = digest
+
+    def request(self, msg_id: int):
+        """Marks a message as needing its embed re-rendered and published."""
+        self._dirty.add(msg_id)
+        task = self._tasks.get(msg_id)
+        if task is None or task.done():
+            self._tasks[msg_id] = asyncio.create_task(self._flush(msg_id))
+
+    def forget(self, msg_id: int):
+        """Drops all state for a message (e.g. once its event is deleted)."""
+        self._dirty.discard(msg_id)
+        self._posted.pop(msg_id, None)
+        self._last_edit.pop(msg_id, None)
+        self._failures.pop(msg_id, None)
+        task = self._tasks.pop(msg_id, None)
+        if task and task is not asyncio.current_task():
+            task.cancel()
+
+    async def _flush(self, msg_id: int):
+        try:
+            while msg_id in self._dirty:
+                # Leading edge publishes straight away; anything arriving inside the
+                # window is folded into one trailing edit with the final state.
+                wait = self._last_edit.get(msg_id, float("-inf")) + self.window - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._dirty.discard(msg_id)
+
+                digest = self.render(msg_id)
+                if digest is None:
+                    break  # Event is gone
+                if digest == self._posted.get(msg_id):
+                    self.skipped += 1
+                    continue
+
+                self._last_edit[msg_id] = time.monotonic()
+                try:
+                    await self.publish(msg_id)
+                except Exception as e:
+                    self.failed += 1
+                    failures = self._failures[msg_id] = self._failures.get(msg_id, 0) + 1
+                    if failures <= MAX_PUBLISH_RETRIES:
+                        log.warning("⚠️ Failed to update event embed, retrying (%d/%d): %s", failures,
+                                    MAX_PUBLISH_RETRIES, e, extra={"event_id": msg_id})
+                        self._dirty.add(msg_id)  # Try the latest state again after the window
+                    else:
+                        log.error("❌ Giving up on updating event embed after %d attempts: %s", failures, e,
+                                  extra={"event_id": msg_id})
+                        del self._failures[msg_id]
+                    continue
+                self._failures.pop(msg_id, None)
+                self._posted[msg_id] = digest
+                self.edits += 1
+        finally:
+            if self._tasks.get(msg_id) is asyncio.current_task():
+                del self._tasks[msg_id]
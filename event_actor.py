@@ -0,0 +1,57 @@
+import asyncio
+from collections import deque
+
+# ------------------ Per-Event Actors ------------------
+# Every change to an event (reactions, edits, deletion, expiry) is submitted to
+# that event's mailbox and applied one at a time, so a "check slot, then take it"
+# sequence can't interleave with another change to the same event even when it
+# awaits in between. Different events have separate mailboxes and run fully in
+# parallel; there is no global lock. A mailbox's worker exits as soon as it is
+# drained, so idle events cost nothing.
+
+
+class EventActors:
+    """Serializes coroutine jobs per key (event message ID)."""
+
+    def __init__(self):
+        self._mailboxes = {}  # key -> deque of (fn, args, future)
+        self._workers = set()  # Running drain tasks; the loop only keeps weak references
+
+    def pending(self, key) -> int:
+        return len(self._mailboxes.get(key, ()))
+
+    def __len__(self):
+        """Number of events with queued or running work."""
+        return len(self._mailboxes)
+
+    async def run(self, key, fn, *args):
+        """Runs `await fn(*args)` after every earlier job for `key` has finished and returns its result."""
+        future = asyncio.get_running_loop().create_future()
+        mailbox = self._mailboxes.get(key)
+        if mailbox is None:
+            mailbox = self._mailboxes[key] = deque()
+            mailbox.append((fn, args, future))
+            worker = asyncio.create_task(self._drain(key, mailbox))
+            self._workers.add(worker)
+            worker.add_done_callback(self._workers.discard)
+        else:
+            mailbox.append((fn, args, future))
+        return await future
+
+    async def _drain(self, key, mailbox: deque):
+        try:
+            while mailbox:
+                fn, args, future = mailbox[0]
+                if not future.cancelled():
+                    try:
+                        result = await fn(*args)
+                    except Exception as e:
+                        if not future.cancelled():
+                            future.set_exception(e)
+                    else:
+                        if not future.cancelled():
+                            future.set_result(result)
+                mailbox.popleft()
+        finally:
+            if self._mailboxes.get(key) is mailbox:
+                del self._mailboxes[key]
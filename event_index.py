@@ -0,0 +1,114 @@
+from events import EventRecord, open_slots
+
+# ------------------ Live Event Indexes ------------------
+# Secondary indexes over `active_events`: sets of event message IDs per guild,
+# channel and creator, and per guild by dungeon, key level, open role and
+# whether any spot is open. Each event remembers which buckets it sits in, so
+# re-indexing after a change only touches the buckets that differ. A filtered
+# lookup intersects the exact-match buckets starting from the smallest one and
+# only then checks the key level range on what's left, so its cost follows the
+# smallest matching bucket rather than the number of live events.
+
+EMPTY = frozenset()
+
+
+def key_level(difficulty: str) -> int | None:
+    """The numeric key level of a difficulty like "12" or "+12"; None for "LFG" and other text."""
+    try:
+        return int(difficulty.lstrip("+"))
+    except ValueError:
+        return None
+
+
+def index_keys(event: EventRecord) -> frozenset:
+    """Every bucket an event belongs in."""
+    guild_id = event.guild_id
+    keys = {
+        ("guild", guild_id),
+        ("channel", event.channel_id),
+        ("creator", event.creator_id),
+        ("dungeon", guild_id, event.dungeon),
+        ("level", guild_id, key_level(event.difficulty)),
+    }
+    slots = open_slots(event)
+    keys.update(("open", guild_id, role) for role in slots)
+    if slots:
+        keys.add(("joinable", guild_id))
+    return frozenset(keys)
+
+
+class EventIndex:
+    """Incrementally maintained lookups from event attributes to event message IDs."""
+
+    def __init__(self):
+        self._buckets = {}   # bucket key -> set of message IDs
+        self._keys = {}      # message ID -> frozenset of bucket keys it's in
+        self._levels = {}    # message ID -> key level (None for "LFG" and other text)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def update(self, event: EventRecord):
+        """Indexes a new event or re-indexes a changed one."""
+        msg_id = event.message_id
+        self._levels[msg_id] = key_level(event.difficulty)
+        old = self._keys.get(msg_id, EMPTY)
+        new = index_keys(event)
+        if new == old:
+            return
+        for key in old - new:
+            self._discard(key, msg_id)
+        for key in new - old:
+            self._buckets.setdefault(key, set()).add(msg_id)
+        self._keys[msg_id] = new
+
+    def remove(self, msg_id: int):
+        self._levels.pop(msg_id, None)
+        for key in self._keys.pop(msg_id, EMPTY):
+            self._discard(key, msg_id)
+
+    def _discard(self, key: tuple, msg_id: int):
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket.discard(msg_id)
+            if not bucket:
+                del self._buckets[key]  # Keeps one-off creators and channels from piling up
+
+    def ids(self, *key) -> set | frozenset:
+        """The message IDs in one bucket, e.g. `ids("open", guild_id, Role.HEALER)`. Treat as read-only."""
+        return self._buckets.get(key, EMPTY)
+
+    def search(self, guild_id: int, *, joinable: bool = False, dungeon: str | None = None, levels=None,
+               role=None, channel_id: int | None = None, creator_id: int | None = None) -> set:
+        """Message IDs of the guild's events matching every given filter.
+
+        `joinable` keeps only groups with a spot open; `levels` is an iterable of key levels.
+        """
+        filters = [self.ids("joinable" if joinable else "guild", guild_id)]
+        if dungeon is not None:
+            filters.append(self.ids("dungeon", guild_id, dungeon))
+        if role is not None:
+            filters.append(self.ids("open", guild_id, role))
+        if channel_id is not None:
+            filters.append(self.ids("channel", channel_id))
+        if creator_id is not None:
+            filters.append(self.ids("creator", creator_id))
+
+        # Set intersection walks the smaller operand, so starting from the smallest bucket keeps it proportional to that
+        filters.sort(key=len)
+        if levels is not None:
+            levels = levels if isinstance(levels, (range, set, frozenset)) else frozenset(levels)
+            level_buckets = [self.ids("level", guild_id, level) for level in levels]
+            if sum(map(len, level_buckets)) < len(filters[0]):  # An event sits in one level bucket, so this is exact
+                filters.insert(0, set().union(*level_buckets))  # The range alone is the most selective filter
+                levels = None
+
+        result = set(filters[0])
+        for bucket in filters[1:]:
+            if not result:
+                break
+            result &= bucket
+        if levels is not None:
+            key_levels = self._levels
+            result = {msg_id for msg_id in result if key_levels[msg_id] is not None and key_levels[msg_id] in levels}
+        return result
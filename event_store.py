@@ -0,0 +1,169 @@
+import asyncio
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+# ------------------ Persistent Event Store ------------------
+# Events are kept in a small SQLite database (WAL mode) so open groups survive
+# restarts. Every query runs on a single worker thread, so the event loop never
+# blocks on disk I/O and the connection is only ever touched from one thread.
+
+EVENT_DB_FILE = "events.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    message_id            INTEGER PRIMARY KEY,
+    guild_id              INTEGER NOT NULL,
+    channel_id            INTEGER NOT NULL,
+    creator_id            INTEGER NOT NULL,
+    creator_name          TEXT NOT NULL DEFAULT '',
+    creator_avatar        TEXT NOT NULL DEFAULT '',
+    dungeon               TEXT NOT NULL,
+    difficulty            TEXT NOT NULL,
+    scheduled             TEXT NOT NULL,
+    starts_at             REAL,
+    comment               TEXT NOT NULL DEFAULT '',
+    tank_id               INTEGER,
+    healer_id             INTEGER,
+    dps_ids               TEXT NOT NULL DEFAULT '[]',
+    expires_at            REAL NOT NULL,
+    role_pings_message_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_events_guild ON events (guild_id);
+CREATE INDEX IF NOT EXISTS idx_events_channel ON events (channel_id);
+CREATE INDEX IF NOT EXISTS idx_events_expires ON events (expires_at);
+"""
+
+COLUMNS = (
+    "message_id", "guild_id", "channel_id", "creator_id", "creator_name", "creator_avatar", "dungeon", "difficulty",
+    "scheduled", "starts_at", "comment", "tank_id", "healer_id", "dps_ids", "expires_at",
+    "role_pings_message_id",
+)
+
+ADDED_COLUMNS = {   # Columns added after the first release, with their definitions for older databases
+    "starts_at": "REAL",
+    "creator_name": "TEXT NOT NULL DEFAULT ''",
+    "creator_avatar": "TEXT NOT NULL DEFAULT ''",
+}
+
+
+class EventStore:
+    """Async wrapper around the SQLite events table.
+
+    Rows are plain dicts of primitives (IDs, strings, unix timestamps for
+    `starts_at` and `expires_at` and a list of IDs for `dps_ids`); turning them
+    into live event data is up to the caller.
+    """
+
+    def __init__(self, path: str = EVENT_DB_FILE):
+        self.path = path
+        self._conn = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="event-store")
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    # -- worker thread helpers --
+
+    def _connect(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            columns = {info[1] for info in conn.execute("PRAGMA table_info(events)")}
+            for column, definition in ADDED_COLUMNS.items():
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE events ADD COLUMN {column} {definition}")
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _to_params(row: dict) -> tuple:
+        params = dict(row)
+        params["dps_ids"] = json.dumps(list(row.get("dps_ids") or []))
+        params.setdefault("starts_at", None)
+        params.setdefault("creator_name", "")
+        params.setdefault("creator_avatar", "")
+        params.setdefault("comment", "")
+        params.setdefault("tank_id", None)
+        params.setdefault("healer_id", None)
+        params.setdefault("role_pings_message_id", None)
+        return tuple(params[col] for col in COLUMNS)
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> dict:
+        data = dict(row)
+        data["dps_ids"] = json.loads(data["dps_ids"])
+        return data
+
+    def _upsert_sync(self, rows: list):
+        conn = self._connect()
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        with conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO events ({', '.join(COLUMNS)}) VALUES ({placeholders})",
+                [self._to_params(row) for row in rows],
+            )
+
+    def _delete_sync(self, message_ids: list):
+        conn = self._connect()
+        with conn:
+            conn.executemany("DELETE FROM events WHERE message_id = ?", [(mid,) for mid in message_ids])
+
+    def _select_sync(self, where: str = "", params: tuple = ()) -> list:
+        conn = self._connect()
+        cur = conn.execute(f"SELECT * FROM events {where}", params)
+        return [self._from_row(row) for row in cur.fetchall()]
+
+    def _close_sync(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # -- async API --
+
+    async def open(self):
+        """Opens the database and makes sure the schema exists."""
+        await self._run(self._connect)
+
+    async def save(self, row: dict):
+        """Inserts or replaces a single event row."""
+        await self._run(self._upsert_sync, [row])
+
+    async def save_many(self, rows: list):
+        """Inserts or replaces several event rows in one transaction."""
+        if rows:
+            await self._run(self._upsert_sync, list(rows))
+
+    async def delete(self, message_id: int):
+        """Removes an event by its message ID."""
+        await self._run(self._delete_sync, [message_id])
+
+    async def delete_many(self, message_ids: list):
+        """Removes several events in one transaction."""
+        if message_ids:
+            await self._run(self._delete_sync, list(message_ids))
+
+    async def get(self, message_id: int) -> dict | None:
+        rows = await self._run(self._select_sync, "WHERE message_id = ?", (message_id,))
+        return rows[0] if rows else None
+
+    async def by_channel(self, channel_id: int) -> list:
+        return await self._run(self._select_sync, "WHERE channel_id = ?", (channel_id,))
+
+    async def by_guild(self, guild_id: int) -> list:
+        return await self._run(self._select_sync, "WHERE guild_id = ?", (guild_id,))
+
+    async def expiring_before(self, timestamp: float) -> list:
+        return await self._run(self._select_sync, "WHERE expires_at <= ? ORDER BY expires_at", (timestamp,))
+
+    async def load_all(self) -> list:
+        """Returns every stored event in one query (used to rehydrate on startup)."""
+        return await self._run(self._select_sync)
+
+    async def close(self):
+        await self._run(self._close_sync)
+        self._executor.shutdown(wait=True)
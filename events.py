@@ -0,0 +1,169 @@
+import enum
+import time
+
+# ------------------ Event Records ------------------
+# An active event is a small slotted record of IDs and primitives. It never holds
+# `discord.Member` or `Message` objects, so an event doesn't pin a member's
+# whole object graph for its lifetime and players are always compared by ID.
+# Players are rendered as ID mentions; only the creator's display name and
+# avatar URL are kept, as two strings, so the embed never depends on a cache.
+
+
+class Role(str, enum.Enum):
+    """A group slot. Values are the slot names used in reactions, pings and settings."""
+    TANK = "Tank"
+    HEALER = "Healer"
+    DPS = "DPS"
+
+
+class EventState(enum.IntEnum):
+    OPEN = 0
+    FULL = 1
+    CLOSED = 2   # Deleted or expired
+
+
+ROLE_LIMITS = {Role.TANK: 1, Role.HEALER: 1, Role.DPS: 3}
+
+
+class EventRecord:
+    """One active dungeon group, keyed by its event message ID."""
+
+    __slots__ = (
+        "message_id", "guild_id", "channel_id", "creator_id", "creator_name", "creator_avatar",
+        "dungeon", "difficulty", "scheduled", "starts_at", "comment",
+        "tank_id", "healer_id", "dps_ids", "expires_at", "role_pings_message_id",
+        "state", "version", "rendered",
+    )
+
+    def __init__(self, message_id: int, guild_id: int, channel_id: int, creator_id: int,
+                 dungeon: str, difficulty: str, scheduled: str, starts_at: float | None,
+                 comment: str, expires_at: float, tank_id: int | None = None,
+                 healer_id: int | None = None, dps_ids: list | None = None,
+                 role_pings_message_id: int | None = None, creator_name: str = "", creator_avatar: str = ""):
+        self.message_id = message_id
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.creator_id = creator_id
+        self.creator_name = creator_name        # Display name when the group was posted ("" if unknown)
+        self.creator_avatar = creator_avatar    # Avatar URL when the group was posted ("" if unknown)
+        self.dungeon = dungeon
+        self.difficulty = difficulty
+        self.scheduled = scheduled              # Text shown when there's no start instant ("Now", unparsed input)
+        self.starts_at = starts_at              # Unix timestamp of the scheduled start, or None
+        self.comment = comment
+        self.tank_id = tank_id
+        self.healer_id = healer_id
+        self.dps_ids = dps_ids or []
+        self.expires_at = expires_at            # Unix timestamp
+        self.role_pings_message_id = role_pings_message_id
+        self.version = 0                        # Bumped on every change that affects the embed
+        self.rendered = None                    # (version, payload digest) of the last render
+        self.state = EventState.OPEN
+        refresh_state(self)
+
+    def is_expired(self, now: float | None = None) -> bool:
+        return (time.time() if now is None else now) > self.expires_at
+
+    def to_row(self) -> dict:
+        """Flattens the record into a row for the event store."""
+        return {
+            "message_id": self.message_id,
+            "guild_id": self.guild_id,
+            "channel_id": self.channel_id,
+            "creator_id": self.creator_id,
+            "creator_name": self.creator_name,
+            "creator_avatar": self.creator_avatar,
+            "dungeon": self.dungeon,
+            "difficulty": self.difficulty,
+            "scheduled": self.scheduled,
+            "starts_at": self.starts_at,
+            "comment": self.comment,
+            "tank_id": self.tank_id,
+            "healer_id": self.healer_id,
+            "dps_ids": list(self.dps_ids),
+            "expires_at": self.expires_at,
+            "role_pings_message_id": self.role_pings_message_id,
+        }
+
+    @classmethod
+    def from_row(cls, row: dict) -> "EventRecord":
+        return cls(
+            row["message_id"], row["guild_id"], row["channel_id"], row["creator_id"],
+            row["dungeon"], row["difficulty"], row["scheduled"], row.get("starts_at"), row["comment"],
+            row["expires_at"], tank_id=row["tank_id"], healer_id=row["healer_id"],
+            dps_ids=list(row["dps_ids"]), role_pings_message_id=row["role_pings_message_id"],
+            creator_name=row.get("creator_name") or "", creator_avatar=row.get("creator_avatar") or "",
+        )
+
+
+# ------------------ Group Slot Rules ------------------
+# Pure slot-assignment logic shared by the reaction handlers and the stress
+# benchmark. Players are identified by user ID only.
+
+CLAIMED = "claimed"
+ALREADY_ASSIGNED = "already_assigned"
+SLOT_FULL = "slot_full"
+
+
+def holds_slot(event: EventRecord, user_id: int) -> bool:
+    """True if the user already has any slot in the group."""
+    return user_id == event.tank_id or user_id == event.healer_id or user_id in event.dps_ids
+
+
+def is_full(event: EventRecord) -> bool:
+    return bool(event.tank_id and event.healer_id and len(event.dps_ids) >= ROLE_LIMITS[Role.DPS])
+
+
+def open_slots(event: EventRecord) -> list:
+    """The roles that still have room, in display order."""
+    slots = []
+    if event.tank_id is None:
+        slots.append(Role.TANK)
+    if event.healer_id is None:
+        slots.append(Role.HEALER)
+    if len(event.dps_ids) < ROLE_LIMITS[Role.DPS]:
+        slots.append(Role.DPS)
+    return slots
+
+
+def refresh_state(event: EventRecord):
+    if event.state != EventState.CLOSED:
+        event.state = EventState.FULL if is_full(event) else EventState.OPEN
+
+
+def claim_slot(event: EventRecord, role: Role, user_id: int) -> str:
+    """Tries to put the user into `role`. Returns CLAIMED, ALREADY_ASSIGNED or SLOT_FULL."""
+    if holds_slot(event, user_id):
+        return ALREADY_ASSIGNED
+    if role == Role.DPS:
+        if len(event.dps_ids) >= ROLE_LIMITS[Role.DPS]:
+            return SLOT_FULL
+        event.dps_ids.append(user_id)
+    elif role == Role.TANK:
+        if event.tank_id is not None:
+            return SLOT_FULL
+        event.tank_id = user_id
+    else:
+        if event.healer_id is not None:
+            return SLOT_FULL
+        event.healer_id = user_id
+    refresh_state(event)
+    return CLAIMED
+
+
+def release_slot(event: EventRecord, role: Role, user_id: int) -> bool:
+    """Removes the user from `role`. Returns True if they held it."""
+    if role == Role.DPS:
+        if user_id not in event.dps_ids:
+            return False
+        event.dps_ids.remove(user_id)
+    elif role == Role.TANK:
+        if event.tank_id != user_id:
+            return False
+        event.tank_id = None
+    else:
+        if event.healer_id != user_id:
+            return False
+        event.healer_id = None
+    refresh_state(event)
+    return True
@@ -0,0 +1,170 @@
+import asyncio
+import json
+import logging
+import os
+import tempfile
+from dataclasses import dataclass, field
+
+log = logging.getLogger(__name__)
+
+# ------------------ Guild Configuration Store ------------------
+# Per-guild settings live in a typed in-memory cache keyed by integer guild ID.
+# Changes mark the store dirty; a single flush shortly afterwards writes the
+# whole file off the event loop (temp file + rename), so a burst of changes
+# costs one write and a crash mid-write never leaves a truncated file behind.
+# When shard processes share a state backend (see state_backend.py) the store
+# is attached to it instead, and only the guilds that changed are written.
+
+CONFIG_FILE = "channels.json"
+FLUSH_DELAY_SECONDS = 1.0
+
+
+@dataclass
+class GuildSettings:
+    channel_id: int | None = None                        # Channel `/dd` is restricted to
+    role_pings: dict = field(default_factory=dict)       # slot -> role ID for open-spot pings
+
+    def to_dict(self) -> dict:
+        return {"channel_id": self.channel_id, "role_pings": dict(self.role_pings)}
+
+    @classmethod
+    def from_dict(cls, data) -> "GuildSettings":
+        if not isinstance(data, dict):
+            return cls(channel_id=int(data))  # Legacy format: {guild_id: channel_id}
+        channel_id = data.get("channel_id")
+        return cls(
+            channel_id=int(channel_id) if channel_id is not None else None,
+            role_pings={slot: int(role_id) for slot, role_id in (data.get("role_pings") or {}).items()},
+        )
+
+    def is_empty(self) -> bool:
+        return self.channel_id is None and not self.role_pings
+
+
+def _write_atomic(path: str, data: dict):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as file:
+            json.dump(data, file, indent=4)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+class GuildConfigStore:
+    """Typed, write-coalescing store for per-guild settings."""
+
+    def __init__(self, path: str = CONFIG_FILE, flush_delay: float = FLUSH_DELAY_SECONDS):
+        self.path = path
+        self.flush_delay = flush_delay
+        self.backend = None     # Shared state backend, once attached
+        self._guilds = {}       # guild_id (int) -> GuildSettings
+        self._flush_task = None
+        self._dirty = False
+        self._dirty_guilds = set()
+        self._write_lock = asyncio.Lock()  # Keeps an older snapshot from landing after a newer one
+        self.writes = 0
+
+    # -- loading (startup only, before the event loop is busy) --
+
+    def load(self):
+        """Reads the config file, normalizing keys to ints and upgrading the legacy {guild_id: channel_id} format."""
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {}
+        self._guilds = {int(guild_id): GuildSettings.from_dict(value) for guild_id, value in data.items()}
+
+    async def attach(self, backend):
+        """Switches to a shared state backend and loads the settings stored there.
+
+        An empty backend is seeded once from what was loaded from the local file.
+        """
+        stored = await backend.load_guild_settings()
+        if stored:
+            self._guilds = {int(guild_id): GuildSettings.from_dict(data) for guild_id, data in stored.items()}
+        else:
+            for guild_id, settings in self._guilds.items():
+                await backend.save_guild_settings(guild_id, settings.to_dict())
+        self.backend = backend
+
+    # -- reads --
+
+    def get(self, guild_id: int) -> GuildSettings:
+        """Returns the guild's settings (defaults if nothing is stored). Treat as read-only."""
+        return self._guilds.get(guild_id) or GuildSettings()
+
+    def channel_for(self, guild_id: int | None) -> int | None:
+        settings = self._guilds.get(guild_id)
+        return settings.channel_id if settings else None
+
+    def role_pings_for(self, guild_id: int) -> dict:
+        settings = self._guilds.get(guild_id)
+        return settings.role_pings if settings else {}
+
+    # -- writes --
+
+    def set_channel(self, guild_id: int, channel_id: int | None):
+        self._edit(guild_id).channel_id = channel_id
+        self._changed(guild_id)
+
+    def set_role_ping(self, guild_id: int, slot: str, role_id: int | None):
+        role_pings = self._edit(guild_id).role_pings
+        if role_id:
+            role_pings[slot] = role_id
+        else:
+            role_pings.pop(slot, None)
+        self._changed(guild_id)
+
+    def _edit(self, guild_id: int) -> GuildSettings:
+        return self._guilds.setdefault(guild_id, GuildSettings())
+
+    def _changed(self, guild_id: int):
+        if self._guilds[guild_id].is_empty():
+            del self._guilds[guild_id]
+        self._dirty = True
+        self._dirty_guilds.add(guild_id)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    def _snapshot(self) -> dict:
+        return {str(guild_id): settings.to_dict() for guild_id, settings in self._guilds.items()}
+
+    async def _delayed_flush(self):
+        await asyncio.sleep(self.flush_delay)  # Let a burst of changes pile up
+        await self.flush()
+
+    async def flush(self):
+        """Writes pending changes now (also used on shutdown)."""
+        async with self._write_lock:
+            while self._dirty:
+                self._dirty = False
+                try:
+                    if self.backend is not None:
+                        await self._write_changed_guilds()
+                    else:
+                        await asyncio.to_thread(_write_atomic, self.path, self._snapshot())
+                    self.writes += 1
+                except Exception as e:
+                    self._dirty = True  # Retried with the next change or flush
+                    log.warning("⚠️ Failed to save guild config: %s", e)
+                    return
+
+    async def _write_changed_guilds(self):
+        # Per guild, so processes serving different guilds never overwrite each other
+        while self._dirty_guilds:
+            guild_id = self._dirty_guilds.pop()
+            settings = self._guilds.get(guild_id)
+            try:
+                await self.backend.save_guild_settings(guild_id, settings.to_dict() if settings else None)
+            except Exception:
+                self._dirty_guilds.add(guild_id)
+                raise
@@ -0,0 +1,152 @@
+import asyncio
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+log = logging.getLogger(__name__)
+
+# ------------------ Event Loop Lag Monitor ------------------
+# A probe coroutine sleeps for a short interval and measures how late it wakes
+# up: that lateness is time the loop spent on synchronous work instead of
+# serving Discord. A watchdog thread notices when the probe is overdue and
+# captures the loop thread's stack *while* it is stuck, so each stall comes
+# with the code that caused it. The heartbeat reports the worst lag since the
+# previous heartbeat.
+#
+# `profile()` samples the loop thread's stack from another thread for a few
+# seconds and returns the samples in collapsed-stack format ("a;b;c 12" per
+# line), which flamegraph.pl and speedscope.app read directly.
+
+LAG_PROBE_INTERVAL = 0.1   # Seconds between probe wake-ups
+STALL_THRESHOLD = 0.25     # Lag (seconds) that counts as a stall and gets its stack captured
+KEEP_STALLS = 20           # Most recent stalls kept for /profile
+
+
+class Stall:
+    __slots__ = ("at", "duration", "stack")
+
+    def __init__(self, at: float, duration: float, stack: str | None):
+        self.at = at              # Unix time the stall ended
+        self.duration = duration
+        self.stack = stack        # Loop thread's stack during the stall, if the watchdog caught it
+
+    def location(self) -> str:
+        """The innermost frame of the captured stack, e.g. `guild_config.py:123 in _write_atomic`."""
+        for line in reversed((self.stack or "").splitlines()):
+            line = line.strip()
+            if line.startswith('File "'):  # File "/path/module.py", line 12, in func
+                path, _, rest = line[6:].partition('", line ')
+                lineno, _, func = rest.partition(", in ")
+                return f"{os.path.basename(path)}:{lineno} in {func}"
+        return "unknown location"
+
+
+def collapse(frame) -> str:
+    """One stack as `outer;...;inner`, each frame as file:function:line."""
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{code.co_firstlineno}")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+def sample_stacks(thread_id: int, duration: float, interval: float) -> collections.Counter:
+    """Samples a thread's stack every `interval` seconds for `duration` seconds. Blocking; run off-loop."""
+    counts = collections.Counter()
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        frame = sys._current_frames().get(thread_id)
+        if frame is not None:
+            counts[collapse(frame)] += 1
+        del frame
+        time.sleep(interval)
+    return counts
+
+
+class LoopLagMonitor:
+    """Measures event loop lag, captures stacks of stalls and runs on-demand sampling profiles."""
+
+    def __init__(self, interval: float = LAG_PROBE_INTERVAL, threshold: float = STALL_THRESHOLD,
+                 keep: int = KEEP_STALLS):
+        self.interval = interval
+        self.threshold = threshold
+        self.stalls = collections.deque(maxlen=keep)
+        self.stall_count = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0          # Worst lag since the last `take_window()`
+        self.profiling = False
+        self._loop_thread = None
+        self._tick = 0              # Probe wake-ups so far; the watchdog captures at most once per tick
+        self._tick_started = time.monotonic()
+        self._captured = None       # (tick, stack) grabbed by the watchdog for the current stall
+        self._stop = threading.Event()
+
+    async def run(self):
+        """The probe loop. Run under the task supervisor; starts the watchdog thread."""
+        self._loop_thread = threading.get_ident()
+        self._stop.clear()
+        watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        watchdog.start()
+        try:
+            while True:
+                self._tick_started = time.monotonic()
+                await asyncio.sleep(self.interval)
+                lag = max(0.0, time.monotonic() - self._tick_started - self.interval)
+                self._record(lag)
+                self._tick += 1
+        finally:
+            self._stop.set()
+
+    def _record(self, lag: float):
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        if lag < self.threshold:
+            return
+        captured = self._captured
+        stack = captured[1] if captured and captured[0] == self._tick else None
+        stall = Stall(time.time(), lag, stack)
+        self.stalls.append(stall)
+        self.stall_count += 1
+        log.warning("⚠️ Event loop stalled for %.2fs (%s)", lag, stall.location())
+
+    def _watch(self):
+        """Watchdog thread: grabs the loop thread's stack once the probe is overdue by `threshold`."""
+        while not self._stop.wait(self.threshold / 2):
+            tick = self._tick
+            overdue = time.monotonic() - self._tick_started - self.interval
+            if overdue < self.threshold or (self._captured and self._captured[0] == tick):
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is not None:
+                self._captured = (tick, "".join(traceback.format_stack(frame)))
+            del frame
+
+    def take_window(self) -> float:
+        """Returns the worst lag since the previous call and starts a new window (used by the heartbeat)."""
+        worst, self.max_lag = self.max_lag, 0.0
+        return worst
+
+    async def profile(self, seconds: float, interval: float = 0.005) -> tuple:
+        """Samples the event loop thread for `seconds`. Returns (collapsed stacks text, sample count)."""
+        if self.profiling:
+            raise RuntimeError("A profile is already running.")
+        self.profiling = True
+        try:
+            counts = await asyncio.to_thread(sample_stacks, threading.get_ident(), seconds, interval)
+        finally:
+            self.profiling = False
+        lines = [f"{stack} {count}" for stack, count in counts.most_common()]
+        return "\n".join(lines) + "\n", sum(counts.values())
+
+    def stall_report(self) -> str:
+        """The kept stalls with their stacks, newest first."""
+        parts = []
+        for stall in reversed(self.stalls):
+            when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(stall.at))
+            parts.append(f"=== {when}: stalled {stall.duration:.3f}s ===\n{stall.stack or '(stack not captured)'}")
+        return "\n".join(parts)
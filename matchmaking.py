@@ -0,0 +1,197 @@
+import itertools
+import time
+from collections import OrderedDict
+
+from events import Role, ROLE_LIMITS
+
+# ------------------ Matchmaking Queue ------------------
+# Players queued with /queue wait in FIFO buckets per (role, key level): a
+# ticket for keys 10-15 sits in the six buckets for levels 10 to 15. A group
+# can only become possible when someone joins, so each enqueue only tries to
+# complete a group *around the new ticket*: for every level in its range it
+# takes the oldest compatible tickets for the missing roles from that level's
+# buckets, and keeps whichever candidate group has waited longest. Only the
+# first MATCH_SCAN_LIMIT tickets of a bucket are looked at, so the work per
+# enqueue depends on the key range and group size, not on how many players are
+# queued. Buckets are OrderedDicts, so leaving the queue is O(levels) and the
+# oldest ticket is always at the front.
+
+MATCH_SCAN_LIMIT = 32   # Tickets inspected per bucket when filling a slot
+GROUP_ROLES = (Role.TANK, Role.HEALER, Role.DPS)
+
+
+class Ticket:
+    """One queued player: their role, the key levels they'll run and the dungeons they want (None = any)."""
+
+    __slots__ = ("user_id", "guild_id", "role", "min_level", "max_level", "dungeons", "seq", "queued_at")
+
+    def __init__(self, user_id: int, guild_id: int, role: Role, min_level: int, max_level: int,
+                 dungeons: frozenset | None = None):
+        self.user_id = user_id
+        self.guild_id = guild_id
+        self.role = role
+        self.min_level = min_level
+        self.max_level = max_level
+        self.dungeons = dungeons or None   # None = any dungeon
+        self.seq = 0                       # Queue order, set on enqueue; lower waited longer
+        self.queued_at = time.time()
+
+    def levels(self) -> range:
+        return range(self.min_level, self.max_level + 1)
+
+
+class Match:
+    """A formed group: the key level, the dungeon (None = any) and the tickets per role."""
+
+    __slots__ = ("guild_id", "level", "dungeon", "tank", "healer", "dps")
+
+    def __init__(self, guild_id: int, level: int, dungeon: str | None, tank: Ticket, healer: Ticket, dps: list):
+        self.guild_id = guild_id
+        self.level = level
+        self.dungeon = dungeon
+        self.tank = tank
+        self.healer = healer
+        self.dps = dps
+
+    def tickets(self) -> list:
+        return [self.tank, self.healer, *self.dps]
+
+
+def _narrow(allowed: frozenset | None, dungeons: frozenset | None) -> frozenset | None:
+    """The dungeons both sides accept (None = any), or an empty set if none."""
+    if allowed is None:
+        return dungeons
+    if dungeons is None:
+        return allowed
+    return allowed & dungeons
+
+
+class GuildQueue:
+    """One guild's queued players."""
+
+    def __init__(self, guild_id: int, scan_limit: int = MATCH_SCAN_LIMIT):
+        self.guild_id = guild_id
+        self.scan_limit = scan_limit
+        self.tickets = {}    # user_id -> Ticket
+        self.waiting = dict.fromkeys(GROUP_ROLES, 0)  # Queued players per role
+        self._buckets = {}   # (role, level) -> OrderedDict(user_id -> Ticket), oldest first
+
+    def __len__(self) -> int:
+        return len(self.tickets)
+
+    def add(self, ticket: Ticket):
+        for level in ticket.levels():
+            self._buckets.setdefault((ticket.role, level), OrderedDict())[ticket.user_id] = ticket
+        self.tickets[ticket.user_id] = ticket
+        self.waiting[ticket.role] += 1
+
+    def remove(self, user_id: int) -> Ticket | None:
+        ticket = self.tickets.pop(user_id, None)
+        if ticket:
+            self.waiting[ticket.role] -= 1
+            for level in ticket.levels():
+                bucket = self._buckets[(ticket.role, level)]
+                del bucket[user_id]
+                if not bucket:
+                    del self._buckets[(ticket.role, level)]
+        return ticket
+
+    def find_group(self, ticket: Ticket) -> Match | None:
+        """The longest-waiting complete group that includes `ticket`, if any (the queue is left unchanged)."""
+        best, best_age = None, None
+        for level in ticket.levels():
+            match = self._group_at(ticket, level)
+            if match is None:
+                continue
+            age = sorted(t.seq for t in match.tickets())  # Compared oldest member first
+            if best is None or age < best_age:
+                best, best_age = match, age
+        return best
+
+    def _group_at(self, ticket: Ticket, level: int) -> Match | None:
+        chosen = {Role.TANK: [], Role.HEALER: [], Role.DPS: []}
+        chosen[ticket.role].append(ticket)
+        taken = {ticket.user_id}
+        allowed = ticket.dungeons
+        for role in GROUP_ROLES:
+            need = ROLE_LIMITS[role] - len(chosen[role])
+            if need <= 0:
+                continue
+            bucket = self._buckets.get((role, level))
+            if not bucket or len(bucket) < need:
+                return None
+            for candidate in itertools.islice(bucket.values(), self.scan_limit):
+                if candidate.user_id in taken:
+                    continue
+                narrowed = _narrow(allowed, candidate.dungeons)
+                if narrowed is not None and not narrowed:
+                    continue  # No dungeon both want
+                allowed = narrowed
+                chosen[role].append(candidate)
+                taken.add(candidate.user_id)
+                need -= 1
+                if not need:
+                    break
+            if need:
+                return None
+        dungeon = min(allowed) if allowed else None  # Any shared dungeon; sorted for a stable pick
+        return Match(self.guild_id, level, dungeon, chosen[Role.TANK][0], chosen[Role.HEALER][0], chosen[Role.DPS])
+
+
+class Matchmaker:
+    """Per-guild queues; `enqueue` either forms a group around the new ticket or leaves it waiting."""
+
+    def __init__(self, scan_limit: int = MATCH_SCAN_LIMIT):
+        self.scan_limit = scan_limit
+        self._guilds = {}                # guild_id -> GuildQueue
+        self._seq = itertools.count()
+        self.matched = 0
+
+    def queue(self, guild_id: int) -> GuildQueue:
+        guild_queue = self._guilds.get(guild_id)
+        if guild_queue is None:
+            guild_queue = self._guilds[guild_id] = GuildQueue(guild_id, self.scan_limit)
+        return guild_queue
+
+    def queued(self) -> int:
+        return sum(len(guild_queue) for guild_queue in self._guilds.values())
+
+    def enqueue(self, ticket: Ticket) -> Match | None:
+        """Queues a ticket (replacing the player's previous one). Returns the group it completed, if any.
+
+        Matched tickets are taken out of the queue before returning.
+        """
+        guild_queue = self.queue(ticket.guild_id)
+        guild_queue.remove(ticket.user_id)
+        ticket.seq = next(self._seq)
+        match = guild_queue.find_group(ticket)
+        if match is None:
+            guild_queue.add(ticket)
+            return None
+        for member in match.tickets():
+            guild_queue.remove(member.user_id)
+        self.matched += 1
+        return match
+
+    def requeue(self, tickets):
+        """Puts matched tickets back without matching them (their group couldn't be posted).
+
+        They keep their `seq`, so they still count as having waited since they first queued.
+        """
+        for ticket in sorted(tickets, key=lambda ticket: ticket.seq):
+            guild_queue = self.queue(ticket.guild_id)
+            guild_queue.remove(ticket.user_id)
+            guild_queue.add(ticket)
+        self.matched -= 1
+
+    def dequeue(self, guild_id: int, user_id: int) -> Ticket | None:
+        guild_queue = self._guilds.get(guild_id)
+        ticket = guild_queue.remove(user_id) if guild_queue else None
+        if guild_queue is not None and not guild_queue.tickets:
+            del self._guilds[guild_id]
+        return ticket
+
+    def drop_guild(self, guild_id: int) -> list:
+        """Empties a guild's queue (e.g. the bot left it). Returns the tickets that were waiting."""
+        guild_queue = self._guilds.pop(guild_id, None)
+        return list(guild_queue.tickets.values()) if guild_queue else []
@@ -0,0 +1,86 @@
+import logging
+from collections import OrderedDict
+
+log = logging.getLogger(__name__)
+
+# ------------------ Bounded Member Cache ------------------
+# In lean mode the bot doesn't download every guild's member list, so members
+# are resolved on demand: from reaction/interaction payloads, from discord.py's
+# own cache when it has them, or through a gateway member query. Whatever we
+# learn is kept in a size-bounded LRU so memory stays flat however big the
+# guilds are.
+
+MEMBER_CACHE_SIZE = 5000
+
+
+class MemberCache:
+    """LRU of (guild_id, user_id) -> discord.Member."""
+
+    def __init__(self, maxsize: int = MEMBER_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._members = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._members)
+
+    def remember(self, member):
+        """Caches a member we were handed anyway (reaction payload, interaction user, query result)."""
+        if member is None or getattr(member, "guild", None) is None:
+            return
+        key = (member.guild.id, member.id)
+        self._members[key] = member
+        self._members.move_to_end(key)
+        if len(self._members) > self.maxsize:
+            self._members.popitem(last=False)
+
+    def refresh(self, member):
+        """Swaps in a newer copy of a member that's already cached; others aren't added."""
+        key = (member.guild.id, member.id)
+        if key in self._members:
+            self._members[key] = member
+
+    def forget(self, guild_id: int, user_id: int):
+        self._members.pop((guild_id, user_id), None)
+
+    def get(self, guild, user_id: int):
+        """Returns a cached member without any network call, or None."""
+        key = (guild.id, user_id)
+        member = self._members.get(key)
+        if member is not None:
+            self._members.move_to_end(key)
+            self.hits += 1
+            return member
+        member = guild.get_member(user_id)
+        if member is not None:
+            self.remember(member)
+            self.hits += 1
+            return member
+        self.misses += 1
+        return None
+
+    async def fetch_many(self, guild, user_ids) -> dict:
+        """Resolves user IDs to members, querying the gateway (100 at a time) for any not cached."""
+        found = {}
+        missing = []
+        for user_id in set(user_ids):
+            member = self.get(guild, user_id)
+            if member is not None:
+                found[user_id] = member
+            else:
+                missing.append(user_id)
+
+        for i in range(0, len(missing), 100):
+            try:
+                queried = await guild.query_members(user_ids=missing[i:i + 100], limit=100, cache=False)
+            except Exception as e:
+                log.warning("⚠️ Member query failed: %s", e, extra={"guild_id": guild.id})
+                continue
+            for member in queried:
+                self.remember(member)
+                found[member.id] = member
+        return found
+
+    async def fetch(self, guild, user_id: int):
+        return (await self.fetch_many(guild, [user_id])).get(user_id)
@@ -0,0 +1,190 @@
+import bisect
+
+# ------------------ Member Name Index ------------------
+# Resolving a typed name used to scan every member of the guild. Each guild now
+# gets a case-insensitive index of usernames, global names and nicknames,
+# kept up to date from member join/leave/update events. Exact matches win;
+# otherwise a unique prefix match is accepted.
+
+FOUND = "found"
+AMBIGUOUS = "ambiguous"
+NOT_FOUND = "not_found"
+
+
+class MemberLookup:
+    """Result of resolving a typed name: a member, or why there isn't one."""
+
+    __slots__ = ("status", "member", "candidates")
+
+    def __init__(self, status: str, member=None, candidates: tuple = ()):
+        self.status = status
+        self.member = member
+        self.candidates = candidates  # Matching members when ambiguous
+
+    def __bool__(self):
+        return self.status == FOUND
+
+
+def member_keys(member) -> set:
+    """All lower-cased names a member can be looked up by."""
+    names = {member.name, member.display_name, getattr(member, "global_name", None)}
+    return {name.casefold() for name in names if name}
+
+
+class GuildMemberIndex:
+    """Name -> member ID index for one guild, with prefix lookup over sorted keys."""
+
+    def __init__(self):
+        self._ids_by_key = {}     # casefolded name -> set of member IDs
+        self._keys_by_id = {}     # member ID -> set of casefolded names
+        self._sorted_keys = []    # every key in `_ids_by_key`, sorted for prefix search
+
+    def __len__(self):
+        return len(self._keys_by_id)
+
+    def __contains__(self, member_id: int) -> bool:
+        return member_id in self._keys_by_id
+
+    @classmethod
+    def build(cls, members) -> "GuildMemberIndex":
+        """Indexes a whole member list at once: one sort at the end instead of an insort per name."""
+        index = cls()
+        ids_by_key, keys_by_id = index._ids_by_key, index._keys_by_id
+        for member in members:
+            keys = member_keys(member)
+            keys_by_id[member.id] = keys
+            for key in keys:
+                ids = ids_by_key.get(key)
+                if ids is None:
+                    ids_by_key[key] = {member.id}
+                else:
+                    ids.add(member.id)
+        index._sorted_keys = sorted(ids_by_key)
+        return index
+
+    def add(self, member):
+        self.remove(member.id)
+        keys = member_keys(member)
+        self._keys_by_id[member.id] = keys
+        for key in keys:
+            ids = self._ids_by_key.get(key)
+            if ids is None:
+                self._ids_by_key[key] = {member.id}
+                bisect.insort(self._sorted_keys, key)
+            else:
+                ids.add(member.id)
+
+    def remove(self, member_id: int):
+        for key in self._keys_by_id.pop(member_id, ()):
+            ids = self._ids_by_key[key]
+            ids.discard(member_id)
+            if not ids:
+                del self._ids_by_key[key]
+                del self._sorted_keys[bisect.bisect_left(self._sorted_keys, key)]
+
+    def exact(self, name: str) -> set:
+        return set(self._ids_by_key.get(name.casefold(), ()))
+
+    def prefix(self, name: str, limit: int = 10) -> set:
+        """Member IDs with any name starting with `name`, stopping after `limit` IDs."""
+        prefix = name.casefold()
+        found = set()
+        i = bisect.bisect_left(self._sorted_keys, prefix)
+        while i < len(self._sorted_keys) and self._sorted_keys[i].startswith(prefix):
+            found |= self._ids_by_key[self._sorted_keys[i]]
+            if len(found) >= limit:
+                break
+            i += 1
+        return found
+
+
+class MemberIndex:
+    """Per-guild member name indexes, built lazily from the member cache."""
+
+    def __init__(self, get_member=None, fetch_member=None, remember=None):
+        self._guilds = {}
+        # get_member(guild, user_id) -> member or None, without network calls
+        self.get_member = get_member or (lambda guild, user_id: guild.get_member(user_id))
+        # async fetch_member(guild, user_id) -> member or None, used for mentions that aren't cached
+        self.fetch_member = fetch_member
+        # remember(member), for members a name query returned; they're kept out of discord.py's cache
+        self.remember = remember or (lambda member: None)
+
+    def for_guild(self, guild) -> GuildMemberIndex:
+        index = self._guilds.get(guild.id)
+        if index is None:
+            index = self._guilds[guild.id] = GuildMemberIndex.build(guild.members)
+        return index
+
+    # -- incremental updates (only touch guilds that already have an index) --
+
+    def member_added(self, member):
+        index = self._guilds.get(member.guild.id)
+        if index is not None:
+            index.add(member)
+
+    def member_updated(self, member):
+        """Re-indexes a member whose names may have changed, if their guild's index already has them."""
+        index = self._guilds.get(member.guild.id)
+        if index is not None and member.id in index:
+            index.add(member)
+
+    def member_removed(self, guild_id: int, member_id: int):
+        index = self._guilds.get(guild_id)
+        if index is not None:
+            index.remove(member_id)
+
+    def user_renamed(self, user_id: int, guilds):
+        """Re-indexes a user whose username or global name changed in every guild they're in."""
+        for guild in guilds:
+            index = self._guilds.get(guild.id)
+            member = self.get_member(guild, user_id)
+            if index is not None and member is not None:
+                index.add(member)
+
+    def drop_guild(self, guild_id: int):
+        self._guilds.pop(guild_id, None)
+
+    async def resolve(self, guild, text: str) -> MemberLookup:
+        """Resolves a mention, exact name or unique name prefix to a member of `guild`.
+
+        Falls back to a gateway member query only when the name isn't cached.
+        """
+        text = text.strip()
+        if not text:
+            return MemberLookup(NOT_FOUND)
+
+        if text.startswith("<@") and text.endswith(">"):
+            try:
+                user_id = int(text.strip("<@!>"))
+            except ValueError:
+                return MemberLookup(NOT_FOUND)
+            member = self.get_member(guild, user_id)
+            if member is None and self.fetch_member is not None:
+                member = await self.fetch_member(guild, user_id)
+            return MemberLookup(FOUND, member) if member else MemberLookup(NOT_FOUND)
+
+        index = self.for_guild(guild)
+        lookup = self._match(guild, index, text)
+        if lookup.status != NOT_FOUND:
+            return lookup
+
+        # Not cached: ask the gateway and remember whatever comes back
+        try:
+            queried = await guild.query_members(query=text, limit=10, cache=False)
+        except Exception:
+            queried = []
+        for member in queried:
+            index.add(member)
+            self.remember(member)
+        by_id = {member.id: member for member in queried}
+        return self._match(guild, index, text, by_id)
+
+    def _match(self, guild, index: GuildMemberIndex, text: str, extra: dict | None = None) -> MemberLookup:
+        ids = index.exact(text) or index.prefix(text)
+        members = [m for m in ((extra or {}).get(i) or self.get_member(guild, i) for i in ids) if m]
+        if len(members) == 1:
+            return MemberLookup(FOUND, members[0])
+        if members:
+            return MemberLookup(AMBIGUOUS, candidates=tuple(members))
+        return MemberLookup(NOT_FOUND)
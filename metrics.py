@@ -0,0 +1,226 @@
+import functools
+import re
+import time
+
+import aiohttp
+from aiohttp import web
+
+# ------------------ Metrics ------------------
+# Opt-in telemetry in Prometheus text format. Handlers are timed with the
+# `timed` decorator, every Discord REST call is counted (and its 429s) through
+# discord.py's aiohttp trace hook, and gauges read live values such as the
+# number of active events when the endpoint is scraped. Nothing is served
+# unless DD_METRICS_PORT is set; recording is a couple of dict updates.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+INF_BUCKET = 'le="+Inf"'
+SNOWFLAKE = re.compile(r"/\d{15,21}")
+
+
+def route_template(path: str) -> str:
+    """Turns a REST path into a low-cardinality route, e.g. /channels/{id}/messages/{id}."""
+    path = SNOWFLAKE.sub("/{id}", path)
+    path = re.sub(r"^(/api/v\d+)", "", path)
+    path = re.sub(r"/(webhooks|interactions)/\{id\}/[^/]+", r"/\1/{id}/{token}", path)
+    return re.sub(r"/reactions/[^/]+", "/reactions/{emoji}", path)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value != value:
+        return "NaN"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label combination."""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple, buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series = {}   # label values -> [count per bucket..., sum, count]
+
+    def observe(self, labels: tuple, value: float):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            for bound, count in zip(self.buckets, series):
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {count}")
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, INF_BUCKET)} {series[-1]}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-2])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: tuple):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._values = {}   # label values -> count
+
+    def inc(self, labels: tuple, amount: int = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: tuple) -> int:
+        return self._values.get(labels, 0)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Gauge:
+    """A value read from `read()` at scrape time."""
+
+    def __init__(self, name: str, help_text: str, read):
+        self.name = name
+        self.help = help_text
+        self.read = read
+
+    def render(self) -> list:
+        try:
+            value = self.read()
+        except Exception:
+            value = float("nan")
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge", f"{self.name} {_number(value)}"]
+
+
+class LabelledGauge:
+    """Gauges per label combination, read from `read()` (a dict of label values -> value) at scrape time."""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple, read):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.read = read
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        try:
+            values = self.read()
+        except Exception:
+            return lines
+        for labels, value in sorted(values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Metrics:
+    """The bot's metric families plus the HTTP endpoint that serves them."""
+
+    def __init__(self):
+        self.handler_seconds = Histogram(
+            "dd_handler_seconds", "Time spent in slash commands, component callbacks and reaction handlers.",
+            ("kind", "name", "outcome"))
+        self.rest_requests = Counter(
+            "dd_rest_requests_total", "Discord REST requests sent, by route and status class.",
+            ("method", "route", "status"))
+        self.rest_rate_limited = Counter(
+            "dd_rest_rate_limited_total", "Discord REST requests answered with 429, by route and scope.",
+            ("method", "route", "scope"))
+        self.rest_errors = Counter(
+            "dd_rest_errors_total", "Discord REST requests that failed without a response.", ("method", "route"))
+        self.sweep_seconds = Histogram(
+            "dd_cleanup_sweep_seconds", "Duration of expired-event cleanup sweeps.", (),
+            buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0))
+        self.gauges = []
+        self._runner = None
+
+    def gauge(self, name: str, help_text: str, read):
+        self.gauges.append(Gauge(name, help_text, read))
+
+    def labelled_gauge(self, name: str, help_text: str, labelnames: tuple, read):
+        self.gauges.append(LabelledGauge(name, help_text, labelnames, read))
+
+    # -- recording --
+
+    def timed(self, kind: str, name: str | None = None):
+        """Decorator recording how long an async handler takes, labelled ok/error."""
+        def decorate(fn):
+            label = name or fn.__qualname__.split(".")[0]
+
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                outcome = "error"
+                try:
+                    result = await fn(*args, **kwargs)
+                    outcome = "ok"
+                    return result
+                finally:
+                    self.handler_seconds.observe((kind, label, outcome), time.perf_counter() - started)
+            return wrapper
+        return decorate
+
+    def http_trace(self):
+        """An aiohttp TraceConfig counting every request discord.py sends (pass as `http_trace`)."""
+        async def on_request_end(session, context, params):
+            method, route = params.method, route_template(params.url.path)
+            status = params.response.status
+            self.rest_requests.inc((method, route, f"{status // 100}xx"))
+            if status == 429:
+                scope = params.response.headers.get("X-RateLimit-Scope", "user")
+                if params.response.headers.get("X-RateLimit-Global"):
+                    scope = "global"
+                self.rest_rate_limited.inc((method, route, scope))
+
+        async def on_request_exception(session, context, params):
+            self.rest_errors.inc((params.method, route_template(params.url.path)))
+
+        trace = aiohttp.TraceConfig()
+        trace.on_request_end.append(on_request_end)
+        trace.on_request_exception.append(on_request_exception)
+        return trace
+
+    # -- exposition --
+
+    def render(self) -> str:
+        lines = []
+        for family in (self.handler_seconds, self.sweep_seconds, self.rest_requests, self.rest_rate_limited,
+                       self.rest_errors, *self.gauges):
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+    async def serve(self, host: str, port: int):
+        """Serves GET /metrics on host:port until `stop()`."""
+        async def handle(request):
+            return web.Response(body=self.render().encode(),
+                                headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+        app = web.Application()
+        app.router.add_get("/metrics", handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -1,8 +1,17 @@
-import discord
+import argparse
+import asyncio
 import os
-from discord.ext import commands
+import discord
 from dotenv import load_dotenv
 
+# Shows what would change between the slash commands defined in daddy.py and
+# the ones registered with Discord, and only touches Discord when asked to.
+#
+#   python reset_commands.py                 # plan: show the diff (default)
+#   python reset_commands.py apply           # push the local definitions
+#   python reset_commands.py clear           # remove every registered command
+#   python reset_commands.py plan --guild 123456789012345678
+
 # Load environment variables
 load_dotenv()
 TOKEN = os.getenv("DISCORD_BOT_TOKEN")
@@ -11,24 +20,64 @@ if not TOKEN:
     print("❌ ERROR: DISCORD_BOT_TOKEN is missing! Check your .env file.")
     exit()
 
-# Create bot instance
-intents = discord.Intents.default()
-bot = commands.Bot(command_prefix="!", intents=intents)
+import daddy  # noqa: E402  (needs the token check above; only builds the command tree, doesn't connect)
+from command_sync import tree_payload, payload_hash, plan, scope_key, save_hash  # noqa: E402
+
+
+def print_plan(changes: dict, scope: str):
+    print(f"📋 Plan for {scope} commands:")
+    for name in changes["create"]:
+        print(f"  + {name}")
+    for name, fields in changes["update"]:
+        print(f"  ~ {name} ({', '.join(fields)})")
+    for name in changes["delete"]:
+        print(f"  - {name}")
+    for name in changes["unchanged"]:
+        print(f"    {name} (unchanged)")
+    if not (changes["create"] or changes["update"] or changes["delete"]):
+        print("✅ Nothing to do.")
+
+
+async def main(action: str, guild_id: int | None, assume_yes: bool):
+    client = discord.Client(intents=discord.Intents.none())
+    async with client:
+        await client.login(TOKEN)  # REST only; no gateway connection
+        app_id = client.application_id
+        scope = f"guild {guild_id}" if guild_id else "global"
+
+        if guild_id:
+            remote = await client.http.get_guild_commands(app_id, guild_id)
+        else:
+            remote = await client.http.get_global_commands(app_id)
+
+        # Dev-guild syncs copy the global commands into the guild, so both scopes use the global definitions
+        local = [] if action == "clear" else tree_payload(daddy.bot.tree)
+        changes = plan(local, remote)
+        print_plan(changes, scope)
+
+        if action == "plan" or not (changes["create"] or changes["update"] or changes["delete"]):
+            return
+
+        if not assume_yes and input(f"🟡 Apply these changes to {scope} commands? [y/N] ").strip().lower() != "y":
+            print("Aborted.")
+            return
+
+        if guild_id:
+            await client.http.bulk_upsert_guild_commands(app_id, guild_id, local)
+        else:
+            await client.http.bulk_upsert_global_commands(app_id, local)
 
-@bot.event
-async def on_ready():
-    print(f"✅ Logged in as {bot.user}")
+        # Keep the bot's sync hash in step so it doesn't re-sync on its next start
+        save_hash(scope_key(app_id, guild_id), payload_hash(local))
+        print("✅ Commands updated.")
 
-    try:
-        print("🟡 Clearing all slash commands...")
-        bot.tree.clear_commands(guild=None)  # ✅ FIXED: Removed 'await'
-        await bot.tree.sync()
-        print("✅ All slash commands have been removed.")
-    except Exception as e:
-        print(f"❌ Failed to clear commands: {e}")
 
-    await bot.close()  # Closes the bot after clearing commands
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Plan and apply slash command changes.")
+    arg_parser.add_argument("action", nargs="?", choices=("plan", "apply", "clear"), default="plan")
+    arg_parser.add_argument("--guild", type=int, help="Work on one guild's commands instead of the global ones")
+    arg_parser.add_argument("--yes", action="store_true", help="Don't ask for confirmation")
+    args = arg_parser.parse_args()
 
-# Run the bot
-print("🟡 Starting bot...")
-bot.run(TOKEN)
+    print("🟡 Starting...")
+    asyncio.run(main(args.action, args.guild, args.yes))
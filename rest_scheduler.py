@@ -0,0 +1,184 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+# ------------------ Outbound REST Scheduler ------------------
+# Discord calls that hit the same rate-limit bucket (roughly: the same kind of
+# call in the same channel) are queued per route and sent one at a time,
+# highest priority first. Different routes run concurrently. Queued calls that
+# carry the same `collapse_key` (e.g. two embed edits for one message) are
+# merged, so only the latest one goes out.
+#
+# Stats are kept per route while it's in use and dropped once its queue has
+# drained and stayed idle for ROUTE_IDLE_SECONDS, so channels the bot posted in
+# once don't stay in memory. Totals per route kind ("messages", "reactions")
+# are kept for good; there are only a handful of kinds.
+
+HIGH = 0    # User-visible responses: reactions to sign up with, confirmation deletes
+NORMAL = 1  # Embed refreshes, open-spot pings
+LOW = 2     # Cosmetic cleanup: removing invalid reactions, deleting old pings
+
+ROUTE_IDLE_SECONDS = 600  # Drop a drained route's stats after this long without calls
+
+
+class RouteStats:
+    __slots__ = ("queued", "sent", "collapsed", "failed", "total_wait", "max_wait", "last_active")
+
+    def __init__(self):
+        self.queued = 0
+        self.sent = 0
+        self.collapsed = 0
+        self.failed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_active = time.monotonic()
+
+    def to_dict(self) -> dict:
+        return {
+            "queued": self.queued,
+            "sent": self.sent,
+            "collapsed": self.collapsed,
+            "failed": self.failed,
+            "avg_wait": self.total_wait / self.sent if self.sent else 0.0,
+            "max_wait": self.max_wait,
+        }
+
+
+class RestScheduler:
+    """Per-route priority queues in front of outbound Discord calls."""
+
+    def __init__(self):
+        self._queues = {}       # route -> heap of [priority, seq, job]
+        self._collapsible = {}  # collapse_key -> queued heap entry
+        self._stats = {}        # route -> RouteStats, for routes used in the last ROUTE_IDLE_SECONDS
+        self._kinds = {}        # route kind -> RouteStats over every route of that kind
+        self._last_prune = time.monotonic()
+        self._seq = itertools.count()
+        self._tasks = set()     # Running drain tasks; the loop only keeps weak references
+
+    def submit(self, route, fn, *args, priority: int = NORMAL, collapse_key=None) -> asyncio.Future:
+        """Queues `await fn(*args)` on `route` and returns a future for its result."""
+        stats = self._stats.get(route)
+        if stats is None:
+            stats = self._stats[route] = RouteStats()
+            self._prune_idle()
+        kind = self._kind_stats(route)
+        stats.last_active = time.monotonic()
+
+        if collapse_key is not None:
+            entry = self._collapsible.get(collapse_key)
+            if entry is not None:
+                # Still waiting: swap in the newer call, keep the older place in line
+                job = entry[2]
+                job["fn"], job["args"] = fn, args
+                if priority < entry[0]:
+                    entry[0] = priority
+                    heapq.heapify(self._queues[job["route"]])
+                stats.collapsed += 1
+                kind.collapsed += 1
+                return job["future"]
+
+        job = {
+            "route": route,
+            "fn": fn,
+            "args": args,
+            "future": asyncio.get_running_loop().create_future(),
+            "enqueued": time.monotonic(),
+            "collapse_key": collapse_key,
+        }
+        entry = [priority, next(self._seq), job]
+        if collapse_key is not None:
+            self._collapsible[collapse_key] = entry
+
+        heap = self._queues.get(route)
+        if heap is None:
+            heap = self._queues[route] = []
+            task = asyncio.create_task(self._drain(route, heap))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        heapq.heappush(heap, entry)
+        stats.queued += 1
+        kind.queued += 1
+        return job["future"]
+
+    async def _drain(self, route, heap: list):
+        stats = self._stats[route]
+        kind = self._kind_stats(route)
+        try:
+            while heap:
+                entry = heapq.heappop(heap)
+                job = entry[2]
+                stats.queued -= 1
+                kind.queued -= 1
+                if job["collapse_key"] is not None and self._collapsible.get(job["collapse_key"]) is entry:
+                    del self._collapsible[job["collapse_key"]]
+
+                future = job["future"]
+                if future.cancelled():
+                    continue
+                wait = time.monotonic() - job["enqueued"]
+                for totals in (stats, kind):
+                    totals.total_wait += wait
+                    totals.max_wait = max(totals.max_wait, wait)
+                try:
+                    result = await job["fn"](*job["args"])
+                except Exception as e:
+                    stats.failed += 1
+                    kind.failed += 1
+                    if not future.cancelled():
+                        future.set_exception(e)
+                else:
+                    if not future.cancelled():
+                        future.set_result(result)
+                stats.sent += 1
+                kind.sent += 1
+                stats.last_active = time.monotonic()
+        finally:
+            if self._queues.get(route) is heap:
+                del self._queues[route]
+
+    def _kind_stats(self, route) -> RouteStats:
+        kind = self.route_kind(route)
+        stats = self._kinds.get(kind)
+        if stats is None:
+            stats = self._kinds[kind] = RouteStats()
+        return stats
+
+    def _prune_idle(self):
+        """Drops stats of drained routes idle for ROUTE_IDLE_SECONDS (at most one scan per tenth of that)."""
+        now = time.monotonic()
+        if now - self._last_prune < ROUTE_IDLE_SECONDS / 10:
+            return
+        self._last_prune = now
+        idle = [route for route, stats in self._stats.items()
+                if not stats.queued and route not in self._queues and now - stats.last_active > ROUTE_IDLE_SECONDS]
+        for route in idle:
+            del self._stats[route]
+
+    def stats(self) -> dict:
+        """Queue depth, throughput and wait times per route kind (e.g. "messages" over every channel)."""
+        return {kind: stats.to_dict() for kind, stats in self._kinds.items()}
+
+    def queued(self) -> int:
+        return sum(stats.queued for stats in self._kinds.values())
+
+    def tracked_routes(self) -> int:
+        self._prune_idle()
+        return len(self._stats)
+
+    def busiest(self, limit: int = 3) -> list:
+        """(route name, stats dict) for the routes with the most calls waiting, deepest first."""
+        self._prune_idle()
+        waiting = [(route, stats) for route, stats in self._stats.items() if stats.queued]
+        waiting.sort(key=lambda item: item[1].queued, reverse=True)
+        return [(self.route_name(route), stats.to_dict()) for route, stats in waiting[:limit]]
+
+    @staticmethod
+    def route_kind(route) -> str:
+        """The low-cardinality part of a route: ("messages", channel_id) -> "messages"."""
+        return str(route[0]) if isinstance(route, tuple) else str(route)
+
+    @staticmethod
+    def route_name(route) -> str:
+        return ":".join(str(part) for part in route) if isinstance(route, tuple) else str(route)
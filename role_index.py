@@ -0,0 +1,48 @@
+# ------------------ Role Ping Index ------------------
+# Finding the Tank/Healer/DPS roles to ping used to scan `guild.roles` three
+# times per group. The lookup is now done once per guild and cached until a
+# role is created, updated or deleted. Admins can point a slot at any role by
+# ID, so guilds whose roles aren't literally named Tank/Healer/DPS still get pings.
+
+PING_SLOTS = ("Tank", "Healer", "DPS")
+
+
+class RoleIndex:
+    """Per-guild cache of which role to ping for each open slot."""
+
+    def __init__(self, overrides_for=None):
+        self.overrides_for = overrides_for or (lambda guild_id: {})  # guild_id -> {slot: role_id}
+        self._cache = {}  # guild_id -> {slot: role_id}
+
+    def ping_role_ids(self, guild) -> dict:
+        """Returns {slot: role_id} for the guild, building it on first use."""
+        cached = self._cache.get(guild.id)
+        if cached is None:
+            cached = self._build(guild)
+            self._cache[guild.id] = cached
+        return cached
+
+    def ping_roles(self, guild) -> dict:
+        """Returns {slot: discord.Role} for every slot that has a role in this guild."""
+        roles = {}
+        for slot, role_id in self.ping_role_ids(guild).items():
+            role = guild.get_role(role_id)
+            if role:
+                roles[slot] = role
+        return roles
+
+    def _build(self, guild) -> dict:
+        by_name = {}
+        for role in guild.roles:
+            by_name.setdefault(role.name.lower(), role.id)
+
+        guild_overrides = self.overrides_for(guild.id)
+        mapping = {}
+        for slot in PING_SLOTS:
+            role_id = guild_overrides.get(slot) or by_name.get(slot.lower())
+            if role_id:
+                mapping[slot] = role_id
+        return mapping
+
+    def invalidate(self, guild_id: int):
+        self._cache.pop(guild_id, None)
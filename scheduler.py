@@ -0,0 +1,105 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+
+log = logging.getLogger(__name__)
+
+# ------------------ Deadline Scheduler ------------------
+# One min-heap and one sleeping task own every timed action in the bot (event
+# expiry, ping deletion, ...). Each action has a key, so rescheduling an event
+# simply replaces its old deadline. Cancelled entries are dropped lazily when
+# they reach the top of the heap.
+
+
+class DeadlineScheduler:
+    """Runs coroutine callbacks at unix-timestamp deadlines from a single task."""
+
+    def __init__(self):
+        self._heap = []        # [when, seq, key, callback, args, cancelled]
+        self._entries = {}     # key -> live heap entry
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._cancelled = 0
+        self._running = set()  # Callbacks in flight; the loop only keeps weak references
+        self.fired = 0
+        self.last_lateness = 0.0
+        self.max_lateness = 0.0
+
+    def schedule(self, key, when: float, callback, *args):
+        """Schedules `callback(*args)` to run at `when`, replacing any earlier entry for `key`."""
+        self.cancel(key)
+        entry = [when, next(self._seq), key, callback, args, False]
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry:
+            self._wakeup.set()  # New earliest deadline, re-arm the sleep
+
+    def cancel(self, key) -> bool:
+        """Cancels the pending entry for `key`. Returns True if something was cancelled."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        entry[5] = True
+        self._cancelled += 1
+        if self._cancelled > 64 and self._cancelled > len(self._heap) // 2:
+            self._compact()
+        return True
+
+    def deadline(self, key) -> float | None:
+        entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if not entry[5]]
+        heapq.heapify(self._heap)
+        self._cancelled = 0
+
+    def _pop_cancelled(self):
+        while self._heap and self._heap[0][5]:
+            heapq.heappop(self._heap)
+            self._cancelled -= 1
+
+    def stats(self) -> dict:
+        """Queue depth and how late the scheduler has been firing."""
+        return {
+            "queued": len(self._entries),
+            "fired": self.fired,
+            "last_lateness": self.last_lateness,
+            "max_lateness": self.max_lateness,
+        }
+
+    async def run(self):
+        """The timer loop; run it under the supervisor."""
+        while True:
+            self._wakeup.clear()
+            self._pop_cancelled()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            delay = self._heap[0][0] - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            when, _, key, callback, args, _ = heapq.heappop(self._heap)
+            self._entries.pop(key, None)
+            lateness = time.time() - when
+            self.fired += 1
+            self.last_lateness = lateness
+            self.max_lateness = max(self.max_lateness, lateness)
+            task = asyncio.create_task(self._fire(key, callback, args))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    @staticmethod
+    async def _fire(key, callback, args):
+        try:
+            await callback(*args)
+        except Exception as e:
+            log.warning("⚠️ Scheduled task %s failed: %s", key, e, exc_info=e)
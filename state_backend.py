@@ -0,0 +1,323 @@
+import asyncio
+import json
+import logging
+import sqlite3
+from urllib.parse import urlparse
+
+from event_store import EventStore, EVENT_DB_FILE
+
+log = logging.getLogger(__name__)
+
+# ------------------ Shared State Backends ------------------
+# Stored events and guild settings sit behind one small async API so several
+# shard processes can share them. Every backend speaks the `EventStore` API for
+# event rows (open/save/save_many/delete/delete_many/get/by_channel/by_guild/
+# expiring_before/load_all/close) plus `load_guild_settings` and
+# `save_guild_settings` for per-guild config and `get_user_timezone` and
+# `save_user_timezone` for the zones set with /timezone:
+#
+#   memory                  in-process dicts (tests, one process)
+#   sqlite:events.db        one SQLite file in WAL mode, safe to share between processes
+#   tcp://127.0.0.1:8765    a `StateServer` on loopback, usually started by cluster.py
+#
+# Rows are plain dicts of primitives, so they cross a socket unchanged.
+
+DEFAULT_BACKEND = f"sqlite:{EVENT_DB_FILE}"
+
+STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS guild_settings (
+    guild_id INTEGER PRIMARY KEY,
+    data     TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS user_timezones (
+    user_id INTEGER PRIMARY KEY,
+    zone    TEXT NOT NULL
+);
+"""
+
+
+class MemoryBackend:
+    """Keeps everything in this process. Same API as the shared backends."""
+
+    def __init__(self):
+        self._events = {}   # message_id -> row
+        self._guilds = {}   # guild_id -> settings dict
+        self._timezones = {}   # user_id -> IANA zone name
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def save(self, row: dict):
+        self._events[row["message_id"]] = dict(row, dps_ids=list(row.get("dps_ids") or []))
+
+    async def save_many(self, rows: list):
+        for row in rows:
+            await self.save(row)
+
+    async def delete(self, message_id: int):
+        self._events.pop(message_id, None)
+
+    async def delete_many(self, message_ids: list):
+        for message_id in message_ids:
+            self._events.pop(message_id, None)
+
+    async def get(self, message_id: int) -> dict | None:
+        row = self._events.get(message_id)
+        return dict(row) if row else None
+
+    async def by_channel(self, channel_id: int) -> list:
+        return [dict(row) for row in self._events.values() if row["channel_id"] == channel_id]
+
+    async def by_guild(self, guild_id: int) -> list:
+        return [dict(row) for row in self._events.values() if row["guild_id"] == guild_id]
+
+    async def expiring_before(self, timestamp: float) -> list:
+        rows = [dict(row) for row in self._events.values() if row["expires_at"] <= timestamp]
+        return sorted(rows, key=lambda row: row["expires_at"])
+
+    async def load_all(self) -> list:
+        return [dict(row) for row in self._events.values()]
+
+    async def load_guild_settings(self) -> dict:
+        return {guild_id: dict(data) for guild_id, data in self._guilds.items()}
+
+    async def save_guild_settings(self, guild_id: int, data: dict | None):
+        """Stores one guild's settings; None removes them."""
+        if data is None:
+            self._guilds.pop(guild_id, None)
+        else:
+            self._guilds[guild_id] = dict(data)
+
+    async def get_user_timezone(self, user_id: int) -> str | None:
+        return self._timezones.get(user_id)
+
+    async def save_user_timezone(self, user_id: int, zone: str | None):
+        """Stores one user's timezone name; None removes it."""
+        if zone is None:
+            self._timezones.pop(user_id, None)
+        else:
+            self._timezones[user_id] = zone
+
+
+class SQLiteBackend(EventStore):
+    """The event store plus guild settings and user timezone tables, in one file several processes can open."""
+
+    def _connect(self):
+        if self._conn is None:
+            # sqlite3 waits up to 5s for another process's write lock by default
+            super()._connect().executescript(STATE_SCHEMA)
+        return self._conn
+
+    def _load_guilds_sync(self) -> dict:
+        cur = self._connect().execute("SELECT guild_id, data FROM guild_settings")
+        return {guild_id: json.loads(data) for guild_id, data in cur.fetchall()}
+
+    def _save_guild_sync(self, guild_id: int, data: dict | None):
+        conn = self._connect()
+        with conn:
+            if data is None:
+                conn.execute("DELETE FROM guild_settings WHERE guild_id = ?", (guild_id,))
+            else:
+                conn.execute("INSERT OR REPLACE INTO guild_settings (guild_id, data) VALUES (?, ?)",
+                             (guild_id, json.dumps(data)))
+
+    def _get_timezone_sync(self, user_id: int) -> str | None:
+        row = self._connect().execute("SELECT zone FROM user_timezones WHERE user_id = ?", (user_id,)).fetchone()
+        return row[0] if row else None
+
+    def _save_timezone_sync(self, user_id: int, zone: str | None):
+        conn = self._connect()
+        with conn:
+            if zone is None:
+                conn.execute("DELETE FROM user_timezones WHERE user_id = ?", (user_id,))
+            else:
+                conn.execute("INSERT OR REPLACE INTO user_timezones (user_id, zone) VALUES (?, ?)", (user_id, zone))
+
+    async def load_guild_settings(self) -> dict:
+        return await self._run(self._load_guilds_sync)
+
+    async def save_guild_settings(self, guild_id: int, data: dict | None):
+        await self._run(self._save_guild_sync, guild_id, data)
+
+    async def get_user_timezone(self, user_id: int) -> str | None:
+        return await self._run(self._get_timezone_sync, user_id)
+
+    async def save_user_timezone(self, user_id: int, zone: str | None):
+        await self._run(self._save_timezone_sync, user_id, zone)
+
+
+# ------------------ Loopback Socket Backend ------------------
+# One JSON object per line in each direction: {"id", "op", "args"} out and
+# {"id", "result"} or {"id", "error"} back. Requests are pipelined over a
+# single connection and matched to replies by ID.
+
+MAX_LINE_BYTES = 64 * 1024 * 1024   # `load_all` replies carry every stored event on one line
+
+SERVED_OPS = {
+    "save", "save_many", "delete", "delete_many", "get", "by_channel", "by_guild",
+    "expiring_before", "load_all", "load_guild_settings", "save_guild_settings",
+    "get_user_timezone", "save_user_timezone",
+}
+
+
+class BackendError(Exception):
+    """Raised by `SocketBackend` when the state server reports a failure."""
+
+
+class SocketBackend:
+    """Client for a `StateServer`; every call is one round trip over a persistent connection."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765):
+        self.host = host
+        self.port = port
+        self._reader = None
+        self._writer = None
+        self._pending = {}      # request id -> Future
+        self._next_id = 0
+        self._read_task = None
+        self._connect_lock = asyncio.Lock()
+
+    async def open(self):
+        async with self._connect_lock:
+            if self._writer is None or self._writer.is_closing():
+                self._reader, self._writer = await asyncio.open_connection(self.host, self.port, limit=MAX_LINE_BYTES)
+                self._read_task = asyncio.create_task(self._read_replies())
+
+    async def _read_replies(self):
+        try:
+            while line := await self._reader.readline():
+                reply = json.loads(line)
+                future = self._pending.pop(reply["id"], None)
+                if future is None or future.done():
+                    continue
+                if "error" in reply:
+                    future.set_exception(BackendError(reply["error"]))
+                else:
+                    future.set_result(reply["result"])
+        except ConnectionError:
+            pass
+        finally:
+            # Connection lost: fail whatever is still waiting, the next call reconnects
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("State server connection closed"))
+            self._pending.clear()
+            self._writer = None
+
+    async def _call(self, op: str, *args):
+        if self._writer is None:
+            await self.open()
+        self._next_id += 1
+        request_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._writer.write(json.dumps({"id": request_id, "op": op, "args": args}).encode() + b"\n")
+        await self._writer.drain()
+        return await future
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+        if self._read_task is not None:
+            await asyncio.gather(self._read_task, return_exceptions=True)
+
+    async def save(self, row: dict):
+        await self._call("save", row)
+
+    async def save_many(self, rows: list):
+        if rows:
+            await self._call("save_many", list(rows))
+
+    async def delete(self, message_id: int):
+        await self._call("delete", message_id)
+
+    async def delete_many(self, message_ids: list):
+        if message_ids:
+            await self._call("delete_many", list(message_ids))
+
+    async def get(self, message_id: int) -> dict | None:
+        return await self._call("get", message_id)
+
+    async def by_channel(self, channel_id: int) -> list:
+        return await self._call("by_channel", channel_id)
+
+    async def by_guild(self, guild_id: int) -> list:
+        return await self._call("by_guild", guild_id)
+
+    async def expiring_before(self, timestamp: float) -> list:
+        return await self._call("expiring_before", timestamp)
+
+    async def load_all(self) -> list:
+        return await self._call("load_all")
+
+    async def load_guild_settings(self) -> dict:
+        data = await self._call("load_guild_settings")
+        return {int(guild_id): settings for guild_id, settings in data.items()}  # JSON keys are strings
+
+    async def save_guild_settings(self, guild_id: int, data: dict | None):
+        await self._call("save_guild_settings", guild_id, data)
+
+    async def get_user_timezone(self, user_id: int) -> str | None:
+        return await self._call("get_user_timezone", user_id)
+
+    async def save_user_timezone(self, user_id: int, zone: str | None):
+        await self._call("save_user_timezone", user_id, zone)
+
+
+class StateServer:
+    """Serves a backend to shard processes over loopback TCP."""
+
+    def __init__(self, backend, host: str = "127.0.0.1", port: int = 8765):
+        self.backend = backend
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self._server = None
+
+    async def start(self):
+        await self.backend.open()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_LINE_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]  # In case port 0 picked a free one
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.backend.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while line := await reader.readline():
+                request = json.loads(line)
+                self.requests += 1
+                try:
+                    if request["op"] not in SERVED_OPS:
+                        raise ValueError(f"unknown op {request['op']!r}")
+                    result = await getattr(self.backend, request["op"])(*request["args"])
+                    reply = {"id": request["id"], "result": result}
+                except (ValueError, TypeError, KeyError, sqlite3.Error) as e:
+                    reply = {"id": request["id"], "error": f"{type(e).__name__}: {e}"}
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass  # Client went away
+        except ValueError as e:
+            log.warning("⚠️ Dropped state client after a bad request: %s", e)
+        finally:
+            writer.close()
+
+
+def make_backend(url: str = DEFAULT_BACKEND):
+    """Builds a backend from `memory`, `sqlite:<path>` or `tcp://<host>:<port>`."""
+    if url == "memory":
+        return MemoryBackend()
+    if url.startswith("sqlite:"):
+        return SQLiteBackend(url[len("sqlite:"):] or EVENT_DB_FILE)
+    if url.startswith("tcp://"):
+        parsed = urlparse(url)
+        return SocketBackend(parsed.hostname or "127.0.0.1", parsed.port or 8765)
+    raise ValueError(f"Unknown state backend: {url!r}")
@@ -0,0 +1,126 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+
+# ------------------ Structured Logging ------------------
+# Handlers never write to stdout themselves: `logging` calls only put the record
+# on a queue, and a background thread formats and writes it. A slow terminal or
+# a full log pipe then stalls that thread instead of the event loop.
+#
+# Records carry the IDs they're about through `extra=` (guild_id, channel_id,
+# event_id, user_id) and come out as JSON lines when shipped, or as the usual
+# emoji messages on a terminal. The same message logged over and over (say,
+# hundreds of failed reaction removals while Discord has an outage) is cut off
+# after a few copies per window, and the next copy reports how many were dropped.
+
+CONTEXT_FIELDS = ("guild_id", "channel_id", "event_id", "user_id")
+RATE_LIMIT_BURST = 5       # Copies of one message let through per window
+RATE_LIMIT_WINDOW = 60.0   # Seconds
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets `burst` records per (logger, level, message template) through every `window` seconds."""
+
+    def __init__(self, burst: int = RATE_LIMIT_BURST, window: float = RATE_LIMIT_WINDOW):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self._seen = {}   # key -> [window start, records let through, records suppressed]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # The unformatted template is the key, so "Failed to delete %s" with different IDs counts as one message
+        key = (record.name, record.levelno, record.msg)
+        now = time.monotonic()
+        entry = self._seen.get(key)
+        if entry is None or now - entry[0] >= self.window:
+            suppressed = entry[2] if entry else 0
+            self._seen[key] = [now, 1, 0]
+            if suppressed:
+                record.suppressed = suppressed
+            return True
+        if entry[1] < self.burst:
+            entry[1] += 1
+            return True
+        entry[2] += 1
+        return False
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """Queues records with their message merged but their context fields and traceback kept separate."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(record.__dict__)
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg, record.args, record.exc_info = record.message, None, None
+        return record
+
+
+def _context(record: logging.LogRecord) -> dict:
+    return {field: getattr(record, field) for field in CONTEXT_FIELDS if getattr(record, field, None) is not None}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, context IDs and traceback."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+            **_context(record),
+        }
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """The bot's plain console lines, with context IDs appended."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = record.getMessage()
+        context = _context(record)
+        if context:
+            line += " [" + " ".join(f"{key}={value}" for key, value in context.items()) + "]"
+        if getattr(record, "suppressed", 0):
+            line += f" (+{record.suppressed} similar messages suppressed)"
+        if record.exc_text:
+            line += "\n" + record.exc_text
+        return line
+
+
+def setup_logging(fmt: str | None = None, level: str | None = None, stream=None) -> logging.handlers.QueueListener:
+    """Routes all logging (the bot's and discord.py's) through a queue to a writer thread.
+
+    `fmt` is "json" or "text" (DD_LOG_FORMAT; defaults to text on a terminal and JSON otherwise),
+    `level` a level name (DD_LOG_LEVEL, default INFO). The writer thread is drained and stopped at exit.
+    """
+    stream = stream or sys.stdout
+    fmt = fmt or os.getenv("DD_LOG_FORMAT") or ("text" if stream.isatty() else "json")
+    writer = logging.StreamHandler(stream)
+    writer.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+    records = queue.SimpleQueue()
+    queue_handler = ContextQueueHandler(records)
+    queue_handler.addFilter(RateLimitFilter())
+    listener = logging.handlers.QueueListener(records, writer)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel((level or os.getenv("DD_LOG_LEVEL", "INFO")).upper())
+
+    listener.start()
+    atexit.register(listener.stop)  # Drains what's still queued on exit
+    return listener
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import time
+
+log = logging.getLogger(__name__)
+
+# ------------------ Background Task Supervisor ------------------
+# Background loops are started exactly once (from `setup_hook`, not `on_ready`,
+# which fires again on every reconnect). A loop that crashes is restarted with
+# exponential backoff instead of dying silently, and everything is cancelled
+# and drained on shutdown.
+
+
+class TaskStats:
+    __slots__ = ("runs", "crashes", "last_duration", "last_error", "last_error_at")
+
+    def __init__(self):
+        self.runs = 0
+        self.crashes = 0
+        self.last_duration = 0.0
+        self.last_error = None
+        self.last_error_at = None
+
+    def to_dict(self) -> dict:
+        return {
+            "runs": self.runs,
+            "crashes": self.crashes,
+            "last_duration": self.last_duration,
+            "last_error": self.last_error,
+            "last_error_at": self.last_error_at,
+        }
+
+
+class TaskSupervisor:
+    """Starts, restarts and stops the bot's background tasks."""
+
+    def __init__(self, base_backoff: float = 1.0, max_backoff: float = 300.0):
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._tasks = {}   # name -> asyncio.Task
+        self._stats = {}   # name -> TaskStats
+
+    def start(self, name: str, factory):
+        """Runs a long-lived coroutine (`await factory()`), restarting it if it crashes.
+
+        Does nothing if a task with this name is already running.
+        """
+        self._spawn(name, self._supervise(name, factory))
+
+    def start_periodic(self, name: str, fn, interval: float, wait=None):
+        """Runs `await fn()` every `interval` seconds (after `await wait()`, if given).
+
+        Each call counts as one run; a failing call is recorded and retried with backoff.
+        """
+        async def loop():
+            if wait is not None:
+                await wait()
+            while True:
+                await self._run_once(name, fn)
+                await asyncio.sleep(interval)
+
+        self._spawn(name, self._supervise(name, loop, count_runs=False))
+
+    def _spawn(self, name: str, coro):
+        task = self._tasks.get(name)
+        if task is not None and not task.done():
+            coro.close()
+            return
+        self._stats.setdefault(name, TaskStats())
+        self._tasks[name] = asyncio.create_task(coro, name=name)
+
+    async def _run_once(self, name: str, fn):
+        stats = self._stats[name]
+        stats.runs += 1
+        started = time.perf_counter()
+        try:
+            await fn()
+        finally:
+            stats.last_duration = time.perf_counter() - started
+
+    async def _supervise(self, name: str, factory, count_runs: bool = True):
+        stats = self._stats[name]
+        backoff = self.base_backoff
+        while True:
+            started = time.perf_counter()
+            try:
+                if count_runs:
+                    await self._run_once(name, factory)
+                else:
+                    await factory()
+                return  # Finished on its own
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                stats.crashes += 1
+                stats.last_error = f"{type(e).__name__}: {e}"
+                stats.last_error_at = time.time()
+                # A task that ran fine for a while before failing starts over with a short backoff
+                if time.perf_counter() - started > self.max_backoff:
+                    backoff = self.base_backoff
+                log.warning("⚠️ Background task '%s' crashed (%s); restarting in %.0fs", name, stats.last_error, backoff,
+                            exc_info=e)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+    def stats(self) -> dict:
+        """Per-task run count, last run duration and last error."""
+        return {name: stats.to_dict() for name, stats in self._stats.items()}
+
+    async def shutdown(self, timeout: float = 10.0):
+        """Cancels every task and waits (up to `timeout`) for them to finish."""
+        tasks = [task for task in self._tasks.values() if not task.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+        self._tasks.clear()
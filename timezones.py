@@ -0,0 +1,95 @@
+import asyncio
+import functools
+import re
+import zoneinfo
+from datetime import datetime
+
+from dateutil import parser, tz
+
+from state_backend import MemoryBackend
+
+# ------------------ Time Parsing & Timezones ------------------
+# Schedules are typed as DD/MM/YYYY HH:MM, so that shape is matched with one
+# pre-compiled regex and built straight into a datetime; ISO 8601 goes through
+# `datetime.fromisoformat`, and only other inputs reach dateutil's (much
+# slower, much looser) parser. Zone objects are built once and cached, so
+# reading a typed time never touches tzdata files after the first lookup of a
+# zone. Each user's zone name is read from the state backend when it's needed:
+# shard processes share that backend, so a /timezone set through one process
+# applies on every other one straight away. Events store the parsed instant;
+# Discord clients show it in each viewer's own timezone.
+
+SERVER_TZ = tz.tzoffset("GMT+1", 3600)   # Game server time
+DEFAULT_TZ = tz.UTC                      # Typed times are read in this zone for users without a /timezone
+DEFAULT_ZONE_NAME = "UTC"
+SCHEDULE_INPUT = re.compile(r"\s*(\d{1,2})/(\d{1,2})/(\d{4})\s+(\d{1,2})[:.](\d{2})\s*")
+
+
+def parse_schedule(text: str, default_tz) -> datetime:
+    """Parses a start time, reading times without a zone in `default_tz`. Raises ValueError if it can't."""
+    match = SCHEDULE_INPUT.fullmatch(text)
+    if match:
+        day, month, year, hour, minute = map(int, match.groups())
+        return datetime(year, month, day, hour, minute, tzinfo=default_tz)  # ValueError for 31/02 and such
+    try:
+        dt = datetime.fromisoformat(text.strip())  # dateutil with dayfirst would read 2031-03-05 as 3 May
+    except ValueError:
+        try:
+            dt = parser.parse(text, dayfirst=True)
+        except OverflowError as e:
+            raise ValueError(str(e)) from e
+    return dt if dt.tzinfo else dt.replace(tzinfo=default_tz)
+
+
+@functools.cache
+def _zone_names() -> dict:
+    """casefolded name -> canonical IANA name, for case-insensitive input and autocomplete."""
+    return {name.casefold(): name for name in zoneinfo.available_timezones()}
+
+
+def canonical_zone(name: str) -> str | None:
+    """The IANA spelling of a zone name (e.g. `europe/berlin` -> `Europe/Berlin`), or None if unknown."""
+    name = name.strip()
+    if not name:
+        return None
+    canonical = _zone_names().get(name.casefold())
+    if canonical:
+        return canonical
+    return name if get_zone(name) is not None else None  # System without tzdata; dateutil ships its own
+
+
+@functools.lru_cache(maxsize=512)
+def get_zone(name: str):
+    """The tzinfo for an IANA zone name, or None if unknown. Cached after the first lookup."""
+    return tz.gettz(name) if name else None
+
+
+def search_zones(query: str, limit: int = 25) -> list:
+    """Zone names containing `query` (for autocomplete), shortest first."""
+    query = query.strip().casefold().replace(" ", "_")
+    matches = [name for key, name in _zone_names().items() if query in key]
+    return sorted(matches, key=lambda name: (len(name), name))[:limit]
+
+
+class TimezoneStore:
+    """Per-user zone names, kept in the state backend (an in-process one until `attach`)."""
+
+    def __init__(self):
+        self.backend = MemoryBackend()
+
+    async def attach(self, backend):
+        """Reads and saves zones through `backend` from now on."""
+        self.backend = backend
+        await asyncio.to_thread(_zone_names)  # Reads tzdata off the loop instead of in the first autocomplete
+
+    async def name_for(self, user_id: int) -> str | None:
+        return await self.backend.get_user_timezone(user_id)
+
+    async def zone_for(self, user_id: int):
+        """The user's tzinfo, or DEFAULT_TZ if they haven't set one."""
+        name = await self.name_for(user_id)
+        return (get_zone(name) if name else None) or DEFAULT_TZ
+
+    async def set(self, user_id: int, name: str | None):
+        """Sets (or with None, clears) a user's zone. `name` must already be canonical."""
+        await self.backend.save_user_timezone(user_id, name)